@@ -0,0 +1,36 @@
+"""
+Gunicorn configuration for the Hostel Management System.
+
+The app is loaded and warmed up once in the master process (preload_app), so
+every forked worker starts with Django set up, URLs and templates compiled and
+caches primed, sharing that memory copy-on-write.
+"""
+
+import os
+
+preload_app = True
+# settings.py reads WEB_CONCURRENCY too, to size the admission control limits
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+
+def when_ready(server):
+    """Warm up in the master after the app is loaded and before workers fork."""
+    from django.db import connections
+    from hostel_app.warmup import warm_up
+
+    for step, (seconds, result) in warm_up().items():
+        server.log.info('Warm-up %s: %.0f ms (%s)', step, seconds * 1000, result)
+    # Database sockets must not be shared across the fork
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    """Give each worker its own database connection before it accepts requests."""
+    from django.db import connections
+
+    for connection in connections.all():
+        try:
+            connection.ensure_connection()
+        except Exception as exc:
+            server.log.warning('Worker %s could not pre-connect to %s: %s', worker.pid, connection.alias, exc)
@@ -3,15 +3,28 @@ Django Admin configuration for hostel_app.
 """
 
 from django.contrib import admin
-from .models import StudentProfile, Room, RoomAllocation, Complaint
+from .models import (
+    StudentProfile, Room, RoomAllocation, Complaint, Notification, Job, ArchivedRoomAllocation, ArchivedComplaint,
+    AuditEvent, RoomOccupancySpan, OccupancyDaily, Residency
+)
+
+
+# Searches are substring (icontains) matches. On PostgreSQL every searched
+# column has a pg_trgm GIN index (see trigram_indexes.py) that serves them;
+# elsewhere, or without pg_trgm, they scan. Changelists keep the rest of the
+# page cheap by joining their foreign keys up front and skipping the
+# unfiltered COUNT(*) via show_full_result_count.
 
 
 @admin.register(StudentProfile)
 class StudentProfileAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'user', 'department', 'year', 'phone_number', 'created_at')
+    list_select_related = ('user',)
     ordering = ('full_name',)
     list_filter = ('department', 'year', 'created_at')
     search_fields = ('full_name', 'user__username', 'phone_number')
+    show_full_result_count = False
+    autocomplete_fields = ('user',)
     readonly_fields = ('created_at', 'updated_at')
     fieldsets = (
         ('User Account', {'fields': ('user',)}),
@@ -27,6 +40,7 @@ class RoomAdmin(admin.ModelAdmin):
     list_display = ('room_number', 'block_name', 'floor', 'capacity', 'current_occupancy', 'room_type', 'status')
     list_filter = ('status', 'room_type', 'block_name', 'floor')
     search_fields = ('room_number', 'block_name')
+    show_full_result_count = False
     readonly_fields = ('created_at', 'updated_at', 'occupancy_percentage')
     fieldsets = (
         ('Room Details', {'fields': ('room_number', 'block_name', 'floor', 'room_type')}),
@@ -40,12 +54,15 @@ class RoomAdmin(admin.ModelAdmin):
 @admin.register(RoomAllocation)
 class RoomAllocationAdmin(admin.ModelAdmin):
     list_display = ('student', 'room', 'status', 'applied_date', 'allocated_date')
+    list_select_related = ('student', 'student__student_profile', 'room')
     list_filter = ('status', 'applied_date', 'room__block_name')
     search_fields = ('student__username', 'student__student_profile__full_name', 'room__room_number')
-    readonly_fields = ('applied_date', 'allocated_date')
+    show_full_result_count = False
+    autocomplete_fields = ('student', 'room')
+    readonly_fields = ('applied_date', 'allocated_date', 'ended_date')
     fieldsets = (
         ('Allocation Details', {'fields': ('student', 'room', 'status')}),
-        ('Dates', {'fields': ('applied_date', 'allocated_date')}),
+        ('Dates', {'fields': ('applied_date', 'allocated_date', 'ended_date')}),
         ('Rejection', {'fields': ('rejection_reason',)}),
     )
 
@@ -53,11 +70,103 @@ class RoomAllocationAdmin(admin.ModelAdmin):
 @admin.register(Complaint)
 class ComplaintAdmin(admin.ModelAdmin):
     list_display = ('subject', 'student', 'status', 'priority', 'created_at')
-    list_filter = ('status', 'priority', 'created_at', 'room')
+    list_select_related = ('student', 'student__student_profile')
+    list_filter = ('status', 'priority', 'created_at', 'room__block_name')
     search_fields = ('subject', 'description', 'student__username', 'student__student_profile__full_name')
+    show_full_result_count = False
+    autocomplete_fields = ('student', 'room')
     readonly_fields = ('created_at', 'updated_at', 'resolved_at')
     fieldsets = (
         ('Complaint Information', {'fields': ('subject', 'description', 'student', 'room')}),
         ('Status', {'fields': ('status', 'priority', 'resolution_notes')}),
         ('Timestamps', {'fields': ('created_at', 'updated_at', 'resolved_at'), 'classes': ('collapse',)}),
     )
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('student', 'message', 'is_read', 'created_at')
+    list_select_related = ('student',)
+    list_filter = ('is_read', 'created_at')
+    search_fields = ('student__username',)
+    show_full_result_count = False
+    autocomplete_fields = ('student',)
+    readonly_fields = ('created_at',)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'created_by', 'created_at', 'finished_at')
+    list_select_related = ('created_by',)
+    list_filter = ('status', 'name')
+    show_full_result_count = False
+    readonly_fields = ('created_at', 'started_at', 'heartbeat_at', 'finished_at')
+    raw_id_fields = ('created_by',)
+
+
+@admin.register(ArchivedRoomAllocation)
+class ArchivedRoomAllocationAdmin(admin.ModelAdmin):
+    list_display = ('student', 'room_number', 'block_name', 'status', 'semester', 'applied_date')
+    list_select_related = ('student',)
+    list_filter = ('semester', 'status')
+    search_fields = ('student__username', 'room_number')
+    show_full_result_count = False
+    raw_id_fields = ('student', 'room')
+
+
+@admin.register(ArchivedComplaint)
+class ArchivedComplaintAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'student', 'status', 'priority', 'semester', 'created_at')
+    list_select_related = ('student',)
+    list_filter = ('semester', 'priority')
+    search_fields = ('subject', 'student__username')
+    show_full_result_count = False
+    raw_id_fields = ('student', 'room')
+
+
+@admin.register(AuditEvent)
+class AuditEventAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'kind', 'object_id', 'username', 'room', 'old_status', 'new_status', 'actor')
+    list_select_related = ('room', 'actor')
+    list_filter = ('kind', 'new_status', 'created_at')
+    search_fields = ('username', 'room__room_number')
+    show_full_result_count = False
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RoomOccupancySpan)
+class RoomOccupancySpanAdmin(admin.ModelAdmin):
+    list_display = ('room', 'occupancy', 'capacity', 'status', 'start_date', 'end_date')
+    list_select_related = ('room',)
+    list_filter = ('status',)
+    search_fields = ('room__room_number',)
+    show_full_result_count = False
+    date_hierarchy = 'start_date'
+    raw_id_fields = ('room',)
+
+
+@admin.register(OccupancyDaily)
+class OccupancyDailyAdmin(admin.ModelAdmin):
+    list_display = ('date', 'block_name', 'floor', 'room_type', 'rooms', 'beds', 'occupied', 'closed_beds')
+    list_filter = ('block_name', 'room_type')
+    show_full_result_count = False
+    date_hierarchy = 'date'
+
+
+@admin.register(Residency)
+class ResidencyAdmin(admin.ModelAdmin):
+    list_display = ('username', 'room_number', 'block_name', 'started_at', 'ended_at')
+    list_filter = ('block_name',)
+    search_fields = ('username', 'room_number')
+    show_full_result_count = False
+    date_hierarchy = 'started_at'
+    raw_id_fields = ('student', 'room', 'allocation')
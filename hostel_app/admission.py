@@ -0,0 +1,174 @@
+"""
+Admission control for write-heavy student endpoints.
+
+Each controlled endpoint has a fixed number of slots (ADMISSION_LIMITS),
+derived by default from the number of gunicorn workers. A POST must hold a
+slot while the view runs. When all are taken it waits up to `max_wait`
+seconds for one, which covers two students applying at the same moment, and
+is then answered with 503 and Retry-After instead of piling onto the database
+connection limit. The wait stays a fraction of a second because a sync worker
+waiting for a slot is one more worker tied up.
+
+Slots are cache keys taken with the atomic `cache.add` and holding a token
+unique to the request, so the limit holds across every worker sharing the
+cache: with the default SQLite cache, that is the gunicorn workers of one web
+host, and each web host admits its own `concurrency` requests. A slot expires
+after `hold` seconds, so a worker killed mid-request cannot leak it, and it is
+released only by the request whose token it still holds.
+
+Queue depth, slots in use and admitted/rejected/wait-time counters are kept in
+the cache too and reported by `stats()`.
+"""
+
+import functools
+import logging
+import random
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between looks for a free slot while waiting
+POLL_INTERVAL = 0.025
+# Lifetime of the queue-depth and statistics counters
+COUNTER_TIMEOUT = 3600
+
+
+class Rejected(Exception):
+    """No slot became free within `max_wait`; `retry_after` is the suggested wait in seconds."""
+
+    def __init__(self, scope, retry_after):
+        super().__init__(f'{scope} is at capacity')
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+def limits(scope):
+    return settings.ADMISSION_LIMITS[scope]
+
+
+def _slot_keys(scope):
+    return [f'admission:{scope}:slot:{i}' for i in range(limits(scope)['concurrency'])]
+
+
+def _counter_key(scope, name):
+    return f'admission:{scope}:{name}'
+
+
+def _incr(scope, name, delta=1):
+    """Shift a counter, creating it if needed; counters are best effort."""
+    key = _counter_key(scope, name)
+    cache.add(key, 0, COUNTER_TIMEOUT)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Expired between add and incr
+        return 0
+
+
+def _try_take(scope, token):
+    """Take any free slot for `token`; return its key or None."""
+    keys = _slot_keys(scope)
+    taken = cache.get_many(keys)
+    free = [key for key in keys if key not in taken]
+    random.shuffle(free)
+    for key in free:
+        if cache.add(key, token, limits(scope)['hold']):
+            return key
+    return None
+
+
+def _wait_for_slot(scope, token):
+    """Poll for a free slot for up to the scope's `max_wait`; returns its key or None."""
+    max_wait = limits(scope).get('max_wait', 0)
+    if max_wait <= 0:
+        return None
+    started = time.monotonic()
+    deadline = started + max_wait
+    key = None
+    _incr(scope, 'waiting')
+    try:
+        while key is None and time.monotonic() < deadline:
+            time.sleep(min(POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+            key = _try_take(scope, token)
+    finally:
+        _incr(scope, 'waiting', -1)
+        _incr(scope, 'waited')
+        _incr(scope, 'wait_ms', int((time.monotonic() - started) * 1000))
+    return key
+
+
+def acquire(scope):
+    """Take a slot for `scope`, waiting up to its `max_wait` for one; raises Rejected if none frees up."""
+    token = uuid.uuid4().hex
+    key = _try_take(scope, token) or _wait_for_slot(scope, token)
+    if key is None:
+        _incr(scope, 'rejected')
+        raise Rejected(scope, limits(scope)['retry_after'])
+    _incr(scope, 'admitted')
+    return key, token
+
+
+def release(slot):
+    """Give a slot back, unless it already expired and was taken by another request."""
+    key, token = slot
+    delete_if_equal = getattr(cache, 'delete_if_equal', None)
+    if delete_if_equal is not None:
+        delete_if_equal(key, token)
+    # Backends without a compare-and-delete (CACHE_BACKEND) keep a small race here
+    elif cache.get(key) == token:
+        cache.delete(key)
+
+
+def stats(scope):
+    """Queue depth, slots in use and cumulative counters for `scope`."""
+    config = limits(scope)
+    counters = cache.get_many([
+        _counter_key(scope, name) for name in ('waiting', 'admitted', 'rejected', 'waited', 'wait_ms')
+    ])
+
+    def counter(name):
+        return max(counters.get(_counter_key(scope, name), 0), 0)
+
+    return {
+        'concurrency': config['concurrency'],
+        'max_wait': config.get('max_wait', 0),
+        'in_flight': len(cache.get_many(_slot_keys(scope))),
+        'waiting': counter('waiting'),
+        'admitted': counter('admitted'),
+        'rejected': counter('rejected'),
+        'waited': counter('waited'),
+        'mean_wait_ms': round(counter('wait_ms') / counter('waited'), 1) if counter('waited') else 0,
+    }
+
+
+def admission_controlled(scope, rejected_response):
+    """
+    Decorator running a view's POSTs under the `scope` admission limit.
+
+    Over capacity, `rejected_response(request, retry_after)` is returned
+    instead. Apply it outermost so a rejected request does no database work.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'POST' or not getattr(settings, 'ADMISSION_CONTROL_ENABLED', True):
+                return view(request, *args, **kwargs)
+            try:
+                slot = acquire(scope)
+            except Rejected as error:
+                logger.warning('Admission rejected for %s; retry in %ss', scope, error.retry_after)
+                return rejected_response(request, error.retry_after)
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                release(slot)
+
+        return wrapped
+
+    return decorator
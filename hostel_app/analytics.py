@@ -0,0 +1,305 @@
+"""
+Occupancy and complaint analytics for the admin reports page.
+
+Each report pulls only the columns it needs with `values_list`, chunk by chunk,
+into NumPy arrays: choice fields come back from the database as small integer
+codes and resolution times as hours, so no model instances are built.
+Chunks are primary-key ranges rather than a server-side cursor, which the
+transaction pooler in front of the production database does not allow.
+Grouped totals are then `np.unique`/`np.bincount` passes and percentiles are
+`np.percentile` over each group's slice, which keeps a million complaints to a
+few seconds of work.
+
+That is still too long for a request, so the tables are computed by the
+`compute_reports` background job and stored as JSON in the job's result,
+which the web and worker hosts both reach through the database. Each result
+carries a key derived from cheap (latest timestamp, row count) validators of
+the rooms, complaints, student profiles and allocation audit log; `reports()`
+returns the newest stored tables and queues a recomputation once one of those
+tables has changed.
+"""
+
+import hashlib
+import json
+import time
+
+import numpy as np
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, FloatField, Func, IntegerField, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import jobs
+from .conditional import latest, latest_audit
+from .models import Complaint, Job, Room, RoomAllocation, StudentProfile
+
+
+CHUNK_SIZE = 50_000
+PERCENTILES = (50, 90, 95)
+TOP_ROOMS = 20
+
+REPORTS_TASK = 'compute_reports'
+
+
+def _codes(field, choices):
+    """CASE expression returning the index of `field`'s value in `choices` (-1 if absent)."""
+    return Case(
+        *[When(**{field: value}, then=Value(code)) for code, (value, _) in enumerate(choices)],
+        default=Value(-1),
+        output_field=IntegerField(),
+    )
+
+
+class HoursBetween(Func):
+    """
+    Hours from the first datetime to the second as a float, NULL if either is NULL.
+
+    Computed with native SQL functions so the database returns plain floats;
+    Django's portable datetime subtraction would run a Python function per
+    row on SQLite and build a timedelta per row everywhere.
+    """
+
+    output_field = FloatField()
+
+    def __init__(self, start, end, **extra):
+        # Stored end first, so joining the two with a minus sign gives end - start
+        super().__init__(end, start, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection,
+            template='CAST(EXTRACT(EPOCH FROM (%(expressions)s)) AS double precision) / 3600', arg_joiner=' - ',
+            **extra_context,
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection,
+            template='(julianday(%(expressions)s)) * 24', arg_joiner=') - julianday(',
+            **extra_context,
+        )
+
+
+def _columns(queryset, fields, dtypes):
+    """Read `fields` of `queryset` in primary key order, CHUNK_SIZE rows per query, into one NumPy array each."""
+    columns = [[] for _ in dtypes]
+    queryset = queryset.order_by('pk')
+    last = None
+    while True:
+        page = queryset if last is None else queryset.filter(pk__gt=last)
+        chunk = list(page.values_list('pk', *fields)[:CHUNK_SIZE])
+        if not chunk:
+            break
+        last = chunk[-1][0]
+        for parts, values, dtype in zip(columns, list(zip(*chunk))[1:], dtypes):
+            parts.append(np.array(values, dtype=dtype))
+        if len(chunk) < CHUNK_SIZE:
+            break
+    return [
+        np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        for parts, dtype in zip(columns, dtypes)
+    ]
+
+
+def _percentage(part, whole):
+    """`part` as a percentage of `whole`, to one decimal place."""
+    return round(100 * float(part) / float(whole), 1) if whole else 0
+
+
+def occupancy_breakdown():
+    """Rooms, open beds, occupied beds and closed beds by block, floor and room type."""
+    blocks, floors, types, capacity, occupancy, maintenance = _columns(
+        Room.objects.annotate(
+            maintenance=Case(When(status='Maintenance', then=Value(1)), default=Value(0), output_field=IntegerField()),
+        ),
+        ['block_name', 'floor', 'room_type', 'capacity', 'current_occupancy', 'maintenance'],
+        [object, np.int32, object, np.int32, np.int32, np.bool_],
+    )
+    beds = np.where(maintenance, 0, capacity)
+    occupied = np.where(maintenance, 0, occupancy)
+    closed = np.where(maintenance, capacity, 0)
+
+    breakdown = {}
+    for name, keys in (('block', blocks), ('floor', floors), ('room_type', types)):
+        groups, inverse = np.unique(keys, return_inverse=True)
+        rooms = np.bincount(inverse, minlength=len(groups))
+        group_beds, group_occupied, group_closed = (
+            np.bincount(inverse, weights=values, minlength=len(groups)) for values in (beds, occupied, closed)
+        )
+        breakdown[name] = [
+            {
+                'group': group.item() if isinstance(group, np.generic) else group,
+                'rooms': int(rooms[i]),
+                'beds': int(group_beds[i]),
+                'occupied': int(group_occupied[i]),
+                'closed_beds': int(group_closed[i]),
+                'percentage': _percentage(group_occupied[i], group_beds[i]),
+            }
+            for i, group in enumerate(groups)
+        ]
+    return breakdown
+
+
+def department_breakdown():
+    """Residents with approved allocations per department, with their share of all residents."""
+    (departments,) = _columns(
+        RoomAllocation.objects.filter(status='Approved')
+        .annotate(department=Coalesce('student__student_profile__department', Value(''))),
+        ['department'],
+        [object],
+    )
+    groups, counts = np.unique(departments, return_counts=True)
+    labels = dict(StudentProfile.DEPARTMENT_CHOICES)
+    order = np.argsort(-counts, kind='stable')
+    return [
+        {
+            'department': labels.get(groups[i], groups[i] or 'No profile'),
+            'residents': int(counts[i]),
+            'percentage': _percentage(counts[i], len(departments)),
+        }
+        for i in order
+    ]
+
+
+def complaint_breakdown():
+    """
+    Complaint rates per room and block, and resolution-time percentiles by priority.
+
+    Returns a dict with `rooms` (the TOP_ROOMS rooms with most complaints),
+    `blocks` (complaints per bed), `resolution` (hours to resolve per
+    priority) and the overall `total`, `open` and `unassigned` counts.
+    """
+    status_codes = [value for value, _ in Complaint.STATUS_CHOICES]
+    room_ids, priorities, statuses, hours = _columns(
+        Complaint.objects.annotate(
+            room_key=Coalesce('room_id', Value(0)),
+            priority_code=_codes('priority', Complaint.PRIORITY_CHOICES),
+            status_code=_codes('status', Complaint.STATUS_CHOICES),
+            hours=HoursBetween('created_at', 'resolved_at'),
+        ),
+        ['room_key', 'priority_code', 'status_code', 'hours'],
+        [np.int64, np.int8, np.int8, np.float64],
+    )
+    is_open = statuses != status_codes.index('Resolved')
+
+    # Map complaint room ids onto positions in the room arrays, which are read in id order
+    ids, numbers, blocks, capacity = _columns(
+        Room.objects.all(),
+        ['id', 'room_number', 'block_name', 'capacity'],
+        [np.int64, object, object, np.int32],
+    )
+    position = np.searchsorted(ids, room_ids)
+    known = position < len(ids)
+    known[known] = ids[position[known]] == room_ids[known]
+    per_room = np.bincount(position[known], minlength=len(ids))
+    open_per_room = np.bincount(position[known], weights=is_open[known].astype(np.float64), minlength=len(ids))
+
+    top = [i for i in np.argsort(-per_room, kind='stable')[:TOP_ROOMS] if per_room[i]]
+    rooms = [
+        {
+            'room_number': numbers[i],
+            'block_name': blocks[i],
+            'complaints': int(per_room[i]),
+            'open': int(open_per_room[i]),
+            'per_bed': round(float(per_room[i]) / float(capacity[i]), 2) if capacity[i] else 0,
+        }
+        for i in top
+    ]
+
+    block_names, inverse = np.unique(blocks, return_inverse=True)
+    block_complaints = np.bincount(inverse, weights=per_room, minlength=len(block_names))
+    block_beds = np.bincount(inverse, weights=capacity, minlength=len(block_names))
+    block_rates = [
+        {
+            'block_name': name,
+            'complaints': int(block_complaints[i]),
+            'beds': int(block_beds[i]),
+            'per_bed': round(float(block_complaints[i]) / float(block_beds[i]), 2) if block_beds[i] else 0,
+        }
+        for i, name in enumerate(block_names)
+    ]
+
+    resolved = ~np.isnan(hours)
+    resolution = []
+    for code, (priority, _) in enumerate(Complaint.PRIORITY_CHOICES):
+        values = hours[resolved & (priorities == code)]
+        points = np.percentile(values, PERCENTILES) if len(values) else [None] * len(PERCENTILES)
+        resolution.append({
+            'priority': priority,
+            'resolved': int(len(values)),
+            'mean': round(float(values.mean()), 1) if len(values) else None,
+            'percentiles': [
+                (percentile, round(float(point), 1) if point is not None else None)
+                for percentile, point in zip(PERCENTILES, points)
+            ],
+        })
+
+    return {
+        'total': int(len(room_ids)),
+        'open': int(is_open.sum()),
+        'unassigned': int(len(room_ids) - known.sum()),
+        'rooms': rooms,
+        'blocks': block_rates,
+        'resolution': resolution,
+    }
+
+
+def compute_reports():
+    """Compute every report table from the database."""
+    started = time.perf_counter()
+    result = {
+        'occupancy': occupancy_breakdown(),
+        'departments': department_breakdown(),
+        'complaints': complaint_breakdown(),
+    }
+    result['generated_at'] = timezone.now()
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000)
+    return result
+
+
+def _validators():
+    """(latest timestamp, row count) of every table the reports read."""
+    return [
+        latest(Room.objects.all(), 'updated_at'),
+        latest(Complaint.objects.all(), 'updated_at'),
+        latest(StudentProfile.objects.all(), 'updated_at'),
+        latest_audit(kind='Allocation'),
+    ]
+
+
+def reports_key():
+    """Digest of the validators; it changes whenever a table the reports read changes."""
+    return hashlib.sha1(repr(_validators()).encode()).hexdigest()
+
+
+def dumps(result, key):
+    """Serialize computed report tables, tagged with the `reports_key()` they were computed for."""
+    return json.dumps(dict(result, key=key), cls=DjangoJSONEncoder)
+
+
+def loads(data):
+    """Report tables from `dumps()` output, with `generated_at` back as a datetime."""
+    result = json.loads(data)
+    result['generated_at'] = parse_datetime(result['generated_at'])
+    return result
+
+
+def reports(user=None):
+    """
+    The newest stored report tables and the job refreshing them, as (reports, job).
+
+    `job` is None when the stored tables are current; otherwise a queued or
+    running `compute_reports` job, queued here if there was none. `reports`
+    is None until the first job has finished.
+    """
+    key = reports_key()
+    done = Job.objects.filter(name=REPORTS_TASK, status='Succeeded').order_by('-finished_at', '-id').first()
+    stored = loads(done.result) if done is not None else None
+    if stored is not None and stored['key'] == key:
+        return stored, None
+
+    job = Job.objects.filter(name=REPORTS_TASK, status__in=('Queued', 'Running')).order_by('-created_at').first()
+    if job is None:
+        job = jobs.enqueue(REPORTS_TASK, user=user)
+    return stored, job
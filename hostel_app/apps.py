@@ -3,9 +3,50 @@ Application configuration for hostel_app.
 """
 
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_migrate, pre_delete
+from django.utils import timezone
+
+
+def prepare_residency(sender, using='default', **kwargs):
+    """Create the PostgreSQL range index and open stays for allocations approved before tracking."""
+    from . import residency
+
+    residency.create_range_index(using)
+    residency.backfill(using)
+
+
+def end_residency(sender, instance, **kwargs):
+    """End the stay of an approved allocation being deleted, directly or with its user or room."""
+    from .models import Residency
+
+    if instance._saved_status == 'Approved':
+        Residency.end([instance.id], timezone.now())
+
+
+def forget_pending(sender, instance, **kwargs):
+    """Take a deleted pending allocation off the cached count, however it was deleted."""
+    from .counters import adjust_pending_count
+
+    if instance._saved_status == 'Pending':
+        adjust_pending_count(-1)
+
+
+def create_search_indexes(sender, using='default', **kwargs):
+    """Create the indexes behind the typeahead's prefix lookups and the admin's substring searches."""
+    from .prefix_indexes import create_prefix_indexes
+    from .trigram_indexes import create_trigram_indexes
+
+    create_prefix_indexes(using)
+    create_trigram_indexes(using)
 
 
 class HostelAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hostel_app'
     verbose_name = 'Hostel Management System'
+
+    def ready(self):
+        post_migrate.connect(prepare_residency, sender=self)
+        post_migrate.connect(create_search_indexes, sender=self)
+        pre_delete.connect(end_residency, sender=self.get_model('RoomAllocation'))
+        post_delete.connect(forget_pending, sender=self.get_model('RoomAllocation'))
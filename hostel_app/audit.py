@@ -0,0 +1,83 @@
+"""
+Append-only audit log of allocation and complaint status changes.
+
+Models call `record()` whenever a status changes, and operations that change
+many rows at once call `record_many()`. Events are inserted straight away,
+inside the transaction making the change, so they commit or roll back with
+it: a committed change always has its event and a rolled-back one never
+does. `record_many()` writes its events with one bulk_create. Inside an
+`acting_as()` block (every request, via AuditMiddleware, and every
+background job) events name that user as the actor. Each event stores the
+student's username, so the trail survives the user.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_actor = ContextVar('audit_actor', default=None)
+
+
+def record(kind, object_id, student_id, room_id, old_status, new_status):
+    """Log a status transition in the current transaction."""
+    record_many([(kind, object_id, student_id, room_id, old_status, new_status)])
+
+
+def record_many(transitions):
+    """
+    Log several (kind, object_id, student_id, room_id, old_status, new_status) transitions.
+
+    One query looks up the students' usernames and one INSERT writes the events.
+    """
+    from django.contrib.auth.models import User
+
+    from .models import AuditEvent
+
+    if not transitions:
+        return
+    actor = _actor.get()
+    actor_id = actor.pk if actor is not None and actor.is_authenticated else None
+    usernames = dict(
+        User.objects.filter(pk__in={student_id for _, _, student_id, _, _, _ in transitions})
+        .values_list('pk', 'username')
+    )
+    AuditEvent.objects.bulk_create([
+        AuditEvent(
+            kind=kind,
+            object_id=object_id,
+            # A student already deleted can no longer be linked to
+            student_id=student_id if student_id in usernames else None,
+            username=usernames.get(student_id, ''),
+            room_id=room_id,
+            actor_id=actor_id,
+            old_status=old_status or '',
+            new_status=new_status,
+        )
+        for kind, object_id, student_id, room_id, old_status, new_status in transitions
+    ])
+
+
+@contextmanager
+def acting_as(actor=None):
+    """Attribute events recorded inside the block to `actor`."""
+    token = _actor.set(actor)
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def history(student=None, room=None, since=None, until=None):
+    """Audit events, newest first, optionally filtered by student, room and time range."""
+    from .models import AuditEvent
+
+    events = AuditEvent.objects.select_related('actor', 'room')
+    if student is not None:
+        events = events.filter(student=student)
+    if room is not None:
+        events = events.filter(room=room)
+    if since is not None:
+        events = events.filter(created_at__gte=since)
+    if until is not None:
+        events = events.filter(created_at__lt=until)
+    return events.order_by('-created_at', '-id')
@@ -0,0 +1,72 @@
+"""
+HTTP conditional GET for list pages.
+
+A view decorated with `@conditional_page(validators)` answers a repeat GET
+with 304 Not Modified when nothing it shows has changed. `validators` returns
+a few cheap (latest timestamp, row count) aggregates; they are combined with
+the user, the URL, the CSRF cookie and the navbar counter into an ETag, and the
+newest timestamp is sent as Last-Modified. The main queries and the template
+only run when the validators differ.
+"""
+
+import hashlib
+
+from django.contrib.messages.storage.session import SessionStorage
+from django.db.models import Count, Max
+from django.middleware.csrf import get_token
+from django.views.decorators.http import condition
+
+from .counters import get_pending_count
+from .models import AuditEvent
+
+
+def latest(queryset, field):
+    """(newest `field`, row count) for `queryset` in one aggregate query."""
+    result = queryset.order_by().aggregate(latest=Max(field), count=Count('pk'))
+    return result['latest'], result['count']
+
+
+def latest_audit(**filters):
+    """(newest, count) of audit events; covers status changes that leave no timestamp on the row."""
+    return latest(AuditEvent.objects.filter(**filters), 'created_at')
+
+
+def _validators(request, get_validators, args, kwargs):
+    """Compute the view's validators once per request, or None if the page must render."""
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    # A queued flash message must be shown (and consumed), so never answer 304
+    if request.session.get(SessionStorage.session_key):
+        return None
+    if not hasattr(request, '_conditional_validators'):
+        # get_validators returns None when the view will not render a cacheable page
+        request._conditional_validators = get_validators(request, *args, **kwargs)
+    return request._conditional_validators
+
+
+def conditional_page(get_validators):
+    """Decorator adding ETag/Last-Modified validators computed by `get_validators`."""
+
+    def etag(request, *args, **kwargs):
+        validators = _validators(request, get_validators, args, kwargs)
+        if validators is None:
+            return None
+        # Pages embed CSRF tokens, so a rotated CSRF secret must change the ETag
+        get_token(request)
+        parts = [
+            request.user.pk,
+            request.get_full_path(),
+            request.META['CSRF_COOKIE'],
+            get_pending_count() if request.user.is_staff else None,
+            *validators,
+        ]
+        return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        validators = _validators(request, get_validators, args, kwargs)
+        if validators is None:
+            return None
+        timestamps = [timestamp for timestamp, _ in validators if timestamp is not None]
+        return max(timestamps) if timestamps else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
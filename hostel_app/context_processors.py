@@ -0,0 +1,13 @@
+"""
+Template context processors for hostel_app.
+"""
+
+from .counters import get_pending_count
+
+
+def pending_count(request):
+    """Supply the pending-applications badge count to the admin navbar."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated or not user.is_staff:
+        return {}
+    return {'pending_count': get_pending_count()}
@@ -0,0 +1,53 @@
+"""
+Cached counters for values shown on every admin page.
+
+Counts are rebuilt lazily with one COUNT query on a cache miss and then kept
+current by incremental updates applied when the surrounding transaction commits.
+Deletes, including cascades from a deleted user or room, are counted by a
+post_delete receiver (see apps.py).
+
+Background jobs run on the worker host, whose cache is not this one (see
+settings.CACHES), so their updates never reach the web host's count. The
+job status page drops the count when it sees such a job finish, and
+PENDING_COUNT_CACHE_TIMEOUT bounds how long the count can lag otherwise.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+PENDING_APPLICATIONS_KEY = 'hostel:pending_applications'
+
+
+def get_pending_count():
+    """Return the number of pending room applications."""
+    count = cache.get(PENDING_APPLICATIONS_KEY)
+    if count is None:
+        from .models import RoomAllocation
+        count = RoomAllocation.objects.filter(status='Pending').count()
+        cache.add(PENDING_APPLICATIONS_KEY, count, settings.PENDING_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def adjust_pending_count(delta):
+    """Shift the cached pending count by `delta` once the current transaction commits."""
+    if not delta:
+        return
+
+    def apply():
+        try:
+            if delta > 0:
+                cache.incr(PENDING_APPLICATIONS_KEY, delta)
+            else:
+                cache.decr(PENDING_APPLICATIONS_KEY, -delta)
+        except ValueError:
+            # Not cached yet; the next read rebuilds it from the database.
+            pass
+
+    transaction.on_commit(apply)
+
+
+def invalidate_pending_count():
+    """Drop the cached pending count so the next read rebuilds it from the database."""
+    cache.delete(PENDING_APPLICATIONS_KEY)
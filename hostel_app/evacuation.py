@@ -0,0 +1,133 @@
+"""
+Evacuation planner for rooms, floors and blocks going into maintenance.
+
+`plan_evacuation()` reads every resident of the closing rooms and every other
+room with free places in two queries, then assigns beds in memory. Roommates
+stay together when one room can take them all; otherwise students are placed
+one by one. Candidates are ranked by same block and room type, then same
+block, then same room type, then anything, with the nearest floor first.
+
+`apply_evacuation()` carries out a (previewed) plan in one transaction: the
+rooms are set to Maintenance, the residents are moved with
+transfers.apply_moves(), which re-checks capacity, and pending or waitlisted
+applications for the closed rooms are rejected. Residents the plan could not
+place would be left in closed rooms, so that needs an explicit confirmation.
+"""
+
+from collections import namedtuple
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models.functions import Now
+
+from .models import Room, RoomAllocation
+from .occupancy import with_free_places
+from .transfers import TransferError, apply_moves, lock_allocations
+
+
+Relocation = namedtuple('Relocation', ['allocation', 'from_room', 'to_room'])
+Plan = namedtuple('Plan', ['rooms', 'relocations', 'unplaced'])
+
+CLOSED_REASON = 'Room closed for maintenance'
+
+
+class UnplacedResidents(TransferError):
+    """Applying the plan would leave residents in closed rooms, and that was not confirmed."""
+
+    def __init__(self, allocations):
+        self.allocations = allocations
+        super().__init__(f'No free bed for {describe(allocations)}.')
+
+
+def describe(allocations):
+    """'username (room), ...' for allocations with student and room loaded."""
+    return ', '.join(f'{allocation.student.username} ({allocation.room.room_number})' for allocation in allocations)
+
+
+def plan_evacuation(rooms):
+    """
+    Plan new beds for every approved resident of `rooms`.
+
+    Returns a Plan of the closing rooms, the Relocations found and the
+    allocations that could not be placed for lack of free places.
+    """
+    rooms = list(rooms)
+    room_ids = [room.id for room in rooms]
+    residents = list(
+        RoomAllocation.objects.filter(room_id__in=room_ids, status='Approved')
+        .select_related('room', 'student__student_profile')
+        .order_by('room__block_name', 'room__floor', 'room__room_number', 'id')
+    )
+    candidates = list(
+        with_free_places(Room.objects.exclude(id__in=room_ids).exclude(status='Maintenance'))
+        .filter(free__gt=0)
+        .order_by('block_name', 'floor', 'room_number')
+    )
+    free = {room.id: room.free for room in candidates}
+
+    relocations = []
+    unplaced = []
+    for source, group in groupby(residents, key=lambda allocation: allocation.room):
+        group = list(group)
+        # Keep roommates together when one room has space for all of them
+        target = _best_room(source, candidates, free, len(group))
+        for allocation in group:
+            room = target or _best_room(source, candidates, free, 1)
+            if room is None:
+                unplaced.append(allocation)
+                continue
+            free[room.id] -= 1
+            relocations.append(Relocation(allocation, source, room))
+    return Plan(rooms, relocations, unplaced)
+
+
+def _best_room(source, candidates, free, places):
+    """The closest match to `source` with at least `places` free, or None."""
+    fitting = [room for room in candidates if free[room.id] >= places]
+    if not fitting:
+        return None
+    return min(fitting, key=lambda room: (
+        room.block_name != source.block_name,
+        room.room_type != source.room_type,
+        abs(room.floor - source.floor),
+    ))
+
+
+def apply_evacuation(room_ids, moves, allow_unplaced=False):
+    """
+    Close `room_ids` for maintenance and apply `moves`, a list of (student_id, room_id).
+
+    Raises TransferError, changing nothing, if a move is not out of a closing
+    room, targets one, or no longer fits, and UnplacedResidents if residents
+    would stay in a closed room without `allow_unplaced`. Returns (students
+    moved, applications rejected, allocations left in closed rooms).
+    """
+    room_ids = set(room_ids)
+    if any(room_id in room_ids for _, room_id in moves):
+        raise TransferError('Students cannot be moved into a room that is being closed.')
+
+    with transaction.atomic():
+        # Lock the rooms before the movers' allocations, the order apply_moves uses
+        movers, _ = lock_allocations([student_id for student_id, _ in moves], room_ids | {room_id for _, room_id in moves})
+        if any(allocation.room_id not in room_ids for allocation in movers):
+            raise TransferError('Only residents of the closing rooms can be moved.')
+        unplaced = list(
+            RoomAllocation.objects.select_related('student', 'room')
+            .filter(room_id__in=room_ids, status='Approved')
+            .exclude(student_id__in=[student_id for student_id, _ in moves])
+            .order_by('room__room_number', 'student__username')
+        )
+        if unplaced and not allow_unplaced:
+            raise UnplacedResidents(unplaced)
+        # Closed first, so rooms emptied by the moves do not promote their waitlists
+        Room.objects.filter(id__in=room_ids).update(status='Maintenance', updated_at=Now())
+        moved = apply_moves(moves)
+
+        closed = list(
+            RoomAllocation.objects.select_related('room')
+            .filter(room_id__in=room_ids, status__in=['Pending', 'Waitlisted'])
+        )
+        for allocation in closed:
+            allocation.reject(CLOSED_REASON)
+
+    return len(moved), len(closed), unplaced
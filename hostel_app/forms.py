@@ -6,8 +6,11 @@ from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
 from .models import StudentProfile, Room, RoomAllocation, Complaint
 import re
+import string
 
 
 class StudentRegistrationForm(UserCreationForm):
@@ -120,10 +123,10 @@ class RoomAllocationForm(forms.ModelForm):
             # Check if student already has a pending or approved allocation
             existing = RoomAllocation.objects.filter(
                 student=self.student,
-                status__in=['Pending', 'Approved']
+                status__in=RoomAllocation.ACTIVE_STATUSES
             ).exists()
             if existing:
-                raise ValidationError('You already have a pending or approved room allocation.')
+                raise ValidationError('You already have a pending, approved or waitlisted room allocation.')
         
         return self.cleaned_data
 
@@ -223,3 +226,252 @@ class ComplaintResolutionForm(forms.ModelForm):
                 'rows': 3,
             }),
         }
+
+
+class BlockGeneratorForm(forms.Form):
+    """Form for generating every room of a new block at once (Admin)."""
+    
+    block_name = forms.CharField(max_length=50, widget=forms.TextInput(attrs={
+        'class': 'form-control',
+        'placeholder': 'Block Name (e.g., Block D)',
+    }))
+    prefix = forms.CharField(max_length=10, required=False, widget=forms.TextInput(attrs={
+        'class': 'form-control',
+        'placeholder': 'Room number prefix (e.g., D)',
+    }))
+    first_floor = forms.IntegerField(min_value=1, max_value=10, initial=1, widget=forms.NumberInput(attrs={
+        'class': 'form-control',
+    }))
+    last_floor = forms.IntegerField(min_value=1, max_value=10, initial=1, widget=forms.NumberInput(attrs={
+        'class': 'form-control',
+    }))
+    rooms_per_floor = forms.IntegerField(min_value=1, max_value=99, initial=10, widget=forms.NumberInput(attrs={
+        'class': 'form-control',
+    }))
+    numbering_pattern = forms.CharField(
+        max_length=50,
+        initial='{prefix}{floor}{room:02d}',
+        help_text='Placeholders: {prefix}, {floor} and {room}, with optional format specs such as {room:02d}.',
+        widget=forms.TextInput(attrs={'class': 'form-control'}),
+    )
+    capacity = forms.IntegerField(min_value=1, max_value=4, initial=2, widget=forms.NumberInput(attrs={
+        'class': 'form-control',
+    }))
+    room_type = forms.ChoiceField(choices=Room.ROOM_TYPE_CHOICES, widget=forms.Select(attrs={
+        'class': 'form-control',
+    }))
+    amenities = forms.CharField(required=False, widget=forms.Textarea(attrs={
+        'class': 'form-control',
+        'placeholder': 'Amenities (comma-separated)',
+        'rows': 2,
+    }))
+    
+    PATTERN_FIELDS = {'prefix', 'floor', 'room'}
+    MAX_PATTERN_WIDTH = 20
+    
+    def clean_numbering_pattern(self):
+        """Allow only the named placeholders, without indexing, attributes or oversized widths."""
+        pattern = self.cleaned_data['numbering_pattern']
+        try:
+            fields = list(string.Formatter().parse(pattern))
+        except ValueError as e:
+            raise ValidationError(f'Invalid numbering pattern: {e}')
+        
+        for _, field, spec, _ in fields:
+            if field is None:
+                continue
+            if field not in self.PATTERN_FIELDS:
+                raise ValidationError(f'Unknown placeholder {{{field}}}; use {{prefix}}, {{floor}} or {{room}}.')
+            # Nested placeholders could smuggle in a width, and a width beyond the
+            # room number limit would build a huge string before it is rejected
+            if '{' in spec or any(int(n) > self.MAX_PATTERN_WIDTH for n in re.findall(r'\d+', spec)):
+                raise ValidationError(f'Format spec too wide in {{{field}:{spec}}}.')
+        return pattern
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        
+        if cleaned_data['first_floor'] > cleaned_data['last_floor']:
+            raise ValidationError('First floor must not be above the last floor.')
+        
+        try:
+            numbers = self.room_numbers(cleaned_data)
+        except (KeyError, IndexError, ValueError, AttributeError, TypeError) as e:
+            raise ValidationError(f'Invalid numbering pattern: {e}')
+        
+        too_long = [n for n in numbers if not n or len(n) > 20]
+        if too_long:
+            raise ValidationError('Room numbers must be between 1 and 20 characters.')
+        
+        if len(set(numbers)) != len(numbers):
+            raise ValidationError('The numbering pattern produces duplicate room numbers.')
+        
+        existing = list(Room.objects.filter(room_number__in=numbers).values_list('room_number', flat=True)[:10])
+        if existing:
+            raise ValidationError(f'These room numbers already exist: {", ".join(sorted(existing))}')
+        
+        cleaned_data['room_numbers'] = numbers
+        return cleaned_data
+    
+    @staticmethod
+    def room_numbers(data):
+        """Expand the numbering pattern over every floor and room position."""
+        return [
+            data['numbering_pattern'].format(prefix=data.get('prefix', ''), floor=floor, room=room)
+            for floor in range(data['first_floor'], data['last_floor'] + 1)
+            for room in range(1, data['rooms_per_floor'] + 1)
+        ]
+    
+    def save(self):
+        """Create all rooms of the block in one transaction and return them."""
+        data = self.cleaned_data
+        rooms_per_floor = data['rooms_per_floor']
+        rooms = [
+            Room(
+                room_number=number,
+                block_name=data['block_name'],
+                floor=data['first_floor'] + index // rooms_per_floor,
+                capacity=data['capacity'],
+                room_type=data['room_type'],
+                status='Available',
+                amenities=data['amenities'],
+            )
+            for index, number in enumerate(data['room_numbers'])
+        ]
+        with transaction.atomic():
+            return Room.objects.bulk_create(rooms, batch_size=500)
+
+
+class RoomTransferForm(forms.Form):
+    """Form for moving a housed student to another room or swapping with another student (Admin)."""
+    
+    room_number = forms.CharField(max_length=20, required=False, widget=forms.TextInput(attrs={
+        'class': 'form-control',
+        'placeholder': 'Move to room (e.g., A101)',
+    }))
+    swap_with = forms.CharField(max_length=150, required=False, widget=forms.TextInput(attrs={
+        'class': 'form-control',
+        'placeholder': 'Or swap with student (username)',
+    }))
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        room_number = cleaned_data.get('room_number', '').strip()
+        swap_with = cleaned_data.get('swap_with', '').strip()
+        
+        if bool(room_number) == bool(swap_with):
+            raise ValidationError('Enter either a room to move to or a student to swap with.')
+        
+        if room_number:
+            # Case-insensitive, unless several rooms differ only by case
+            matches = list(Room.objects.filter(room_number__iexact=room_number))
+            exact = [room for room in matches if room.room_number == room_number]
+            if not matches:
+                raise ValidationError(f'Room {room_number} does not exist.')
+            if len(matches) > 1 and len(exact) != 1:
+                raise ValidationError(f'Several rooms match {room_number}; enter the room number exactly.')
+            cleaned_data['room'] = exact[0] if exact else matches[0]
+        else:
+            try:
+                cleaned_data['other_student'] = User.objects.get(username=swap_with, is_staff=False)
+            except User.DoesNotExist:
+                raise ValidationError(f'Student {swap_with} does not exist.')
+        return cleaned_data
+
+
+class EvacuationForm(forms.Form):
+    """Form selecting the blocks, floors and rooms going into maintenance (Admin)."""
+    
+    blocks = forms.MultipleChoiceField(required=False, widget=forms.SelectMultiple(attrs={
+        'class': 'form-control',
+        'size': 4,
+    }))
+    floors = forms.CharField(max_length=50, required=False, widget=forms.TextInput(attrs={
+        'class': 'form-control',
+        'placeholder': 'Floors, e.g. 2, 3 (all floors if blank)',
+    }))
+    room_numbers = forms.CharField(required=False, widget=forms.TextInput(attrs={
+        'class': 'form-control',
+        'placeholder': 'Individual rooms, e.g. A101, A102',
+    }))
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        block_names = Room.objects.order_by('block_name').values_list('block_name', flat=True).distinct()
+        self.fields['blocks'].choices = [(name, name) for name in block_names]
+    
+    def clean_floors(self):
+        floors = [part.strip() for part in self.cleaned_data['floors'].split(',') if part.strip()]
+        if not all(part.isdigit() for part in floors):
+            raise ValidationError('Floors must be numbers separated by commas.')
+        return [int(part) for part in floors]
+    
+    def clean_room_numbers(self):
+        return [part.strip() for part in self.cleaned_data['room_numbers'].split(',') if part.strip()]
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.errors:
+            return cleaned_data
+        
+        blocks, floors, room_numbers = cleaned_data['blocks'], cleaned_data['floors'], cleaned_data['room_numbers']
+        if not (blocks or floors or room_numbers):
+            raise ValidationError('Choose at least one block, floor or room.')
+        
+        selection = Q(pk__in=[])
+        if blocks or floors:
+            area = Q()
+            if blocks:
+                area &= Q(block_name__in=blocks)
+            if floors:
+                area &= Q(floor__in=floors)
+            selection |= area
+        if room_numbers:
+            unknown = set(room_numbers) - set(
+                Room.objects.filter(room_number__in=room_numbers).values_list('room_number', flat=True)
+            )
+            if unknown:
+                raise ValidationError(f'These rooms do not exist: {", ".join(sorted(unknown))}')
+            selection |= Q(room_number__in=room_numbers)
+        
+        cleaned_data['rooms'] = list(Room.objects.filter(selection).exclude(status='Maintenance'))
+        if not cleaned_data['rooms']:
+            raise ValidationError('No open rooms match this selection.')
+        return cleaned_data
+
+
+class OccupancyReportForm(forms.Form):
+    """Form choosing the date range, grouping and filters of the occupancy history report (Admin)."""
+    
+    GROUP_CHOICES = [('block', 'Block'), ('floor', 'Floor'), ('room_type', 'Room type')]
+    BUCKET_CHOICES = [('day', 'Day'), ('week', 'Week'), ('month', 'Month')]
+    
+    start = forms.DateField(widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    end = forms.DateField(widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    bucket = forms.ChoiceField(choices=BUCKET_CHOICES, initial='week', widget=forms.Select(attrs={
+        'class': 'form-control',
+    }))
+    group_by = forms.ChoiceField(choices=GROUP_CHOICES, initial='block', widget=forms.Select(attrs={
+        'class': 'form-control',
+    }))
+    block_name = forms.ChoiceField(required=False, widget=forms.Select(attrs={
+        'class': 'form-control',
+    }))
+    room_type = forms.ChoiceField(
+        required=False,
+        choices=[('', 'All room types')] + Room.ROOM_TYPE_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        block_names = Room.objects.order_by('block_name').values_list('block_name', flat=True).distinct()
+        self.fields['block_name'].choices = [('', 'All blocks')] + [(name, name) for name in block_names]
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if not self.errors and cleaned_data['start'] > cleaned_data['end']:
+            raise ValidationError('The start date must not be after the end date.')
+        return cleaned_data
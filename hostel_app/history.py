@@ -0,0 +1,163 @@
+"""
+Occupancy history: daily snapshots and time-range reports.
+
+`take_snapshot()` runs once a day (the `snapshot_occupancy` periodic job). It
+reads every room's approved-allocation count in one query and stores it two
+ways:
+
+- RoomOccupancySpan rows, run-length encoded per room: a room whose occupancy,
+  capacity and status did not change keeps its open span, so history grows
+  with the number of changes, not rooms x days.
+- OccupancyDaily rows, the day's totals per block, floor and room type. This
+  is a few dozen rows a day however large the hostel, so `occupancy_report()`
+  aggregates years of history with one indexed GROUP BY.
+
+Daily totals for days the job missed can be rebuilt from the spans with
+`rebuild_daily()`.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Room, RoomOccupancySpan, OccupancyDaily
+from .occupancy import with_free_places
+
+
+GROUPS = {
+    'block': 'block_name',
+    'floor': 'floor',
+    'room_type': 'room_type',
+}
+
+BUCKETS = {
+    'day': F('date'),
+    'week': TruncWeek('date'),
+    'month': TruncMonth('date'),
+}
+
+
+def _daily_rows(day, rooms):
+    """OccupancyDaily rows for `day` from (block, floor, type, capacity, status, occupancy) tuples."""
+    totals = defaultdict(lambda: {'rooms': 0, 'beds': 0, 'closed_beds': 0, 'occupied': 0})
+    for block_name, floor, room_type, capacity, status, occupancy in rooms:
+        group = totals[(block_name, floor, room_type)]
+        group['rooms'] += 1
+        if status == 'Maintenance':
+            group['closed_beds'] += capacity
+        else:
+            group['beds'] += capacity
+            group['occupied'] += occupancy
+    return [
+        OccupancyDaily(date=day, block_name=block_name, floor=floor, room_type=room_type, **values)
+        for (block_name, floor, room_type), values in totals.items()
+    ]
+
+
+def take_snapshot(day=None):
+    """
+    Record every room's occupancy for `day` (default today); safe to re-run.
+
+    Returns the number of rooms whose span changed.
+    """
+    day = day or timezone.localdate()
+    rooms = list(
+        with_free_places(Room.objects.all())
+        .values_list('id', 'block_name', 'floor', 'room_type', 'capacity', 'status', 'free')
+    )
+
+    with transaction.atomic():
+        open_spans = {
+            span.room_id: span
+            for span in RoomOccupancySpan.objects.select_for_update().filter(end_date__isnull=True)
+        }
+        if any(span.start_date > day for span in open_spans.values()):
+            raise ValueError(f'Occupancy has already been recorded after {day}.')
+
+        closed, rewritten, opened = [], [], []
+        for room_id, _, _, _, capacity, status, free in rooms:
+            occupancy = capacity - free
+            span = open_spans.get(room_id)
+            if span is not None and (span.occupancy, span.capacity, span.status) == (occupancy, capacity, status):
+                continue
+            if span is not None and span.start_date == day:
+                # A re-run on the same day corrects that day's span in place
+                span.occupancy, span.capacity, span.status = occupancy, capacity, status
+                rewritten.append(span)
+                continue
+            if span is not None:
+                closed.append(span.id)
+            opened.append(RoomOccupancySpan(
+                room_id=room_id, occupancy=occupancy, capacity=capacity, status=status, start_date=day,
+            ))
+
+        RoomOccupancySpan.objects.filter(id__in=closed).update(end_date=day)
+        RoomOccupancySpan.objects.bulk_update(rewritten, ['occupancy', 'capacity', 'status'])
+        RoomOccupancySpan.objects.bulk_create(opened)
+
+        OccupancyDaily.objects.filter(date=day).delete()
+        OccupancyDaily.objects.bulk_create(_daily_rows(day, [
+            (block_name, floor, room_type, capacity, status, capacity - free)
+            for _, block_name, floor, room_type, capacity, status, free in rooms
+        ]))
+
+    return len(closed) + len(rewritten) + len(opened)
+
+
+def rebuild_daily(start, end):
+    """Recompute OccupancyDaily for days in [start, end) from the recorded spans."""
+    spans = list(
+        RoomOccupancySpan.objects.filter(start_date__lt=end)
+        .filter(Q(end_date__isnull=True) | Q(end_date__gt=start))
+        .values_list('room__block_name', 'room__floor', 'room__room_type',
+                     'capacity', 'status', 'occupancy', 'start_date', 'end_date')
+    )
+    rows = []
+    day = start
+    while day < end:
+        rows.extend(_daily_rows(day, [
+            span[:6] for span in spans if span[6] <= day and (span[7] is None or day < span[7])
+        ]))
+        day += timedelta(days=1)
+
+    with transaction.atomic():
+        OccupancyDaily.objects.filter(date__gte=start, date__lt=end).delete()
+        OccupancyDaily.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def occupancy_report(start, end, group_by='block', bucket='week', block_name=None, room_type=None):
+    """
+    Occupancy per period and group for days in [start, end).
+
+    Returns dicts with `period`, `group`, `bed_days`, `occupied_bed_days` and
+    `percentage` (occupied share of open beds over the period), ordered by
+    period then group.
+    """
+    field = GROUPS[group_by]
+    days = OccupancyDaily.objects.filter(date__gte=start, date__lt=end)
+    if block_name:
+        days = days.filter(block_name=block_name)
+    if room_type:
+        days = days.filter(room_type=room_type)
+
+    rows = (
+        days.annotate(period=BUCKETS[bucket])
+        .values('period', field)
+        .annotate(bed_days=Sum('beds'), occupied_bed_days=Sum('occupied'))
+        .order_by('period', field)
+    )
+    return [
+        {
+            'period': row['period'],
+            'group': row[field],
+            'bed_days': row['bed_days'],
+            'occupied_bed_days': row['occupied_bed_days'],
+            'percentage': round(100 * row['occupied_bed_days'] / row['bed_days'], 1) if row['bed_days'] else 0,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,39 @@
+"""
+Jinja2 environment for the optional list-fragment templates in templates/jinja2/.
+
+Provides the few Django helpers those templates use: `url()`, `static()` and
+the `date`, `pluralize`, `truncatewords` and `full_name` filters.
+"""
+
+from django.template.defaultfilters import date as date_filter, pluralize, truncatewords
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils import timezone
+from jinja2 import Environment
+
+
+def url(name, *args):
+    """Reverse a URL name with positional arguments, like {% url %}."""
+    return reverse(name, args=args)
+
+
+def date(value, format_string=None):
+    """Django's date filter, with aware datetimes shown in the current time zone."""
+    if not value:
+        return ''
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return date_filter(value, format_string)
+
+
+def full_name(user):
+    """The user's profile name, or '' when there is no profile (as Django templates render it)."""
+    profile = getattr(user, 'student_profile', None)
+    return profile.full_name if profile else ''
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update(url=url, static=static)
+    env.filters.update(date=date, pluralize=pluralize, truncatewords=truncatewords, full_name=full_name)
+    return env
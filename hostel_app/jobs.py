@@ -0,0 +1,270 @@
+"""
+Database-backed background job queue for the Hostel Management System.
+
+Admin views enqueue long-running work with `enqueue()` and return at once;
+`python manage.py run_workers` claims queued jobs and runs the registered
+task functions, retrying failures with exponential backoff. While a job runs
+its worker refreshes the job's heartbeat; a job whose heartbeat stops is
+requeued as abandoned, however long it legitimately takes to run.
+"""
+
+import csv
+import io
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import audit
+from .models import RoomAllocation, Job
+
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+# Tasks that change pending applications; the web host's cached count must be
+# rebuilt after they finish
+PENDING_COUNT_TASKS = {'bulk_approve_applications'}
+
+
+def task(name):
+    """Register a function as a job task under `name`."""
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, user=None, max_attempts=None):
+    """Queue a registered task and return the created Job."""
+    if name not in TASKS:
+        raise ValueError(f'Unknown job task: {name}')
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=max_attempts or getattr(settings, 'JOB_MAX_ATTEMPTS', 3),
+    )
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: base * 2^(attempts - 1) seconds."""
+    base = getattr(settings, 'JOB_RETRY_BACKOFF', 5)
+    return timedelta(seconds=base * (2 ** max(attempts - 1, 0)))
+
+
+def claim_next_job(worker):
+    """
+    Claim the oldest runnable job for `worker`, or return None.
+
+    The claim is a conditional UPDATE on the job's status, so concurrent
+    workers never run the same job even on databases without row locks.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(status='Queued', run_after__lte=now).order_by('run_after', 'id')
+    for job_id in candidates.values_list('id', flat=True)[:5]:
+        claimed = Job.objects.filter(id=job_id, status='Queued').update(
+            status='Running', worker=worker, started_at=now, heartbeat_at=now,
+        )
+        if claimed:
+            return Job.objects.get(id=job_id)
+    return None
+
+
+@contextmanager
+def heartbeat(job, interval=None):
+    """Refresh `job.heartbeat_at` from a background thread every `interval` seconds while the block runs."""
+    interval = interval or getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 30)
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                try:
+                    Job.objects.filter(id=job.id, status='Running').update(heartbeat_at=timezone.now())
+                except DatabaseError:
+                    logger.exception('Heartbeat for job %s failed', job.pk)
+                    close_old_connections()
+        finally:
+            # This thread's own connection
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_job(job):
+    """Run a claimed job, recording its result or scheduling a retry."""
+    job.attempts += 1
+    try:
+        func = TASKS[job.name]
+        with heartbeat(job), audit.acting_as(job.created_by):
+            result = func(job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = 'Queued'
+            job.run_after = timezone.now() + retry_delay(job.attempts)
+        else:
+            job.status = 'Failed'
+            job.finished_at = timezone.now()
+        logger.warning('Job %s (%s) failed on attempt %s', job.pk, job.name, job.attempts)
+    else:
+        job.status = 'Succeeded'
+        job.result = '' if result is None else str(result)
+        job.error = ''
+        job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def requeue_stale_jobs(older_than):
+    """
+    Return Running jobs without a heartbeat for `older_than` (e.g. after a worker crash) to the queue.
+
+    The lost run counts as an attempt, so a job that keeps killing its worker
+    is marked Failed once it runs out of attempts. Returns (requeued, failed).
+    """
+    now = timezone.now()
+    stale = (
+        Job.objects.alias(last_seen=Coalesce('heartbeat_at', 'started_at'))
+        .filter(status='Running', last_seen__lt=now - older_than)
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts') - 1).update(
+        status='Failed', attempts=F('attempts') + 1, worker='', finished_at=now,
+        error='The worker running this job stopped responding.',
+    )
+    requeued = stale.update(status='Queued', attempts=F('attempts') + 1, worker='', run_after=now)
+    return requeued, failed
+
+
+def enqueue_due_periodic_jobs():
+    """
+    Queue each job in settings.PERIODIC_JOBS whose interval has elapsed.
+
+    A job is due when none with the same name was queued within its interval.
+    """
+    now = timezone.now()
+    queued = []
+    for name, interval in getattr(settings, 'PERIODIC_JOBS', {}).items():
+        recent = Job.objects.filter(name=name, created_at__gte=now - timedelta(seconds=interval))
+        if not recent.exists():
+            queued.append(enqueue(name))
+    return queued
+
+
+def work(worker, stop_event, poll_interval=1.0, burst=False):
+    """Worker loop: claim and run jobs until stopped (or the queue drains in burst mode)."""
+    try:
+        while not stop_event.is_set():
+            try:
+                close_old_connections()
+                job = claim_next_job(worker)
+                if job is None:
+                    if burst:
+                        break
+                    stop_event.wait(poll_interval)
+                    continue
+                run_job(job)
+            except Exception:
+                # A dropped connection or a failed claim must not end the thread and
+                # shrink the pool; a job left Running is requeued once its heartbeat stops
+                logger.exception('Worker %s failed; retrying after %ss', worker, poll_interval)
+                close_old_connections()
+                stop_event.wait(poll_interval)
+    finally:
+        close_old_connections()
+
+
+# ==================== Tasks ====================
+
+@task('recompute_occupancy')
+def recompute_occupancy(payload):
+    """Recompute occupancy and status for every room in one set-based pass."""
+    from .occupancy import reconcile_occupancy
+
+    drifted = reconcile_occupancy()
+    if not drifted:
+        return 'All rooms were already consistent.'
+    return f"Fixed {len(drifted)} drifted rooms: {', '.join(room['room_number'] for room in drifted)}"
+
+
+@task('snapshot_occupancy')
+def snapshot_occupancy(payload):
+    """Record today's per-room occupancy spans and per-block daily totals."""
+    from .history import take_snapshot
+
+    changed = take_snapshot()
+    return f'Recorded occupancy; {changed} rooms changed since the last snapshot.'
+
+
+@task('compute_reports')
+def compute_reports(payload):
+    """Compute the admin report tables and store them, as JSON, in the job's result."""
+    from . import analytics
+
+    # Keyed before computing, so changes made meanwhile trigger another run
+    key = analytics.reports_key()
+    return analytics.dumps(analytics.compute_reports(), key)
+
+
+@task('bulk_approve_applications')
+def bulk_approve_applications(payload):
+    """Approve pending applications matching the admin's search, oldest first."""
+    from .views import filter_applications
+
+    applications = filter_applications(
+        RoomAllocation.objects.filter(status='Pending'),
+        payload.get('search', ''),
+    ).order_by('applied_date')
+
+    # approve() locks and re-reads each room, so earlier approvals in this loop are seen
+    approved = skipped = 0
+    for allocation in applications.iterator():
+        if allocation.approve():
+            approved += 1
+        else:
+            skipped += 1
+    return f'Approved {approved} applications; {skipped} skipped because the room was full.'
+
+
+@task('export_applications')
+def export_applications(payload):
+    """Export applications matching the admin's filters as CSV."""
+    from .views import filter_applications
+
+    applications = filter_applications(
+        RoomAllocation.objects.all(),
+        payload.get('search', ''),
+        payload.get('status', ''),
+    ).select_related('student__student_profile', 'room').order_by('-applied_date')
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['Student', 'Username', 'Room', 'Block', 'Status', 'Applied Date', 'Allocated Date', 'Ended Date'])
+    for allocation in applications.iterator(chunk_size=2000):
+        profile = getattr(allocation.student, 'student_profile', None)
+        writer.writerow([
+            profile.full_name if profile else '',
+            allocation.student.username,
+            allocation.room.room_number,
+            allocation.room.block_name,
+            allocation.status,
+            allocation.applied_date.isoformat(),
+            allocation.allocated_date.isoformat() if allocation.allocated_date else '',
+            allocation.ended_date.isoformat() if allocation.ended_date else '',
+        ])
+    return output.getvalue()
@@ -0,0 +1,89 @@
+"""
+Management command to time the admin reports over a large synthetic complaint table.
+
+Inserts N complaints spread over the existing rooms inside a transaction,
+times the report computation and a read of the stored result, then rolls
+everything back.
+
+Usage: python manage.py benchmark_analytics [--complaints N]
+"""
+
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from hostel_app import analytics, jobs
+from hostel_app.models import Complaint, Room
+
+
+class Rollback(Exception):
+    """Raised to discard the synthetic complaints."""
+
+
+class Command(BaseCommand):
+    help = 'Time the occupancy and complaint reports over N synthetic complaints (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--complaints',
+            type=int,
+            default=1_000_000,
+            help='Synthetic complaints to insert (default: 1000000)',
+        )
+
+    def handle(self, *args, **options):
+        room_ids = list(Room.objects.values_list('id', flat=True))
+        student = User.objects.order_by('id').first()
+        if not room_ids or student is None:
+            raise CommandError('Needs at least one room and one user; run generate_sample_data first')
+
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                self.insert(options['complaints'], room_ids, student)
+                self.stdout.write(f"Inserted {options['complaints']} complaints in {time.perf_counter() - started:.1f} s")
+
+                started = time.perf_counter()
+                reports = analytics.compute_reports()
+                self.stdout.write(f'Computed reports in {time.perf_counter() - started:.2f} s')
+                for row in reports['complaints']['resolution']:
+                    self.stdout.write(f"  {row['priority']:<8}{row['resolved']:>9} resolved, "
+                                      + ', '.join(f'p{p} {hours} h' for p, hours in row['percentiles']))
+
+                _, job = analytics.reports()
+                if job is not None:
+                    jobs.run_job(job)
+                started = time.perf_counter()
+                analytics.reports()
+                self.stdout.write(f'Stored read in {(time.perf_counter() - started) * 1000:.0f} ms')
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete; synthetic complaints rolled back'))
+
+    def insert(self, count, room_ids, student):
+        """Bulk-insert `count` complaints, two thirds resolved after about two days on average."""
+        now = timezone.now()
+        priorities = [value for value, _ in Complaint.PRIORITY_CHOICES]
+        batch = []
+        for i in range(count):
+            resolved = i % 3 != 0
+            batch.append(Complaint(
+                student=student,
+                room_id=random.choice(room_ids),
+                subject='benchmark',
+                description='',
+                priority=random.choice(priorities),
+                status='Resolved' if resolved else 'Pending',
+                resolved_at=now + timedelta(minutes=random.expovariate(1 / 2880)) if resolved else None,
+            ))
+            if len(batch) == 10_000:
+                Complaint.objects.bulk_create(batch)
+                batch = []
+        Complaint.objects.bulk_create(batch)
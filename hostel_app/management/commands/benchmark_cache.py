@@ -0,0 +1,117 @@
+"""
+Management command to compare the shared SQLite cache with LocMem and the database cache.
+
+Usage: python manage.py benchmark_cache [--iterations N] [--processes N]
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from django.core.management.commands.createcachetable import Command as CreateCacheTable
+from django.db import connection
+
+from hostel_app.sqlite_cache import SQLiteCache
+
+
+BENCHMARK_TABLE = 'hostel_cache_benchmark'
+
+
+def _hammer_incr(location, key, iterations):
+    """Worker process: increment a shared counter `iterations` times."""
+    cache = SQLiteCache(location, {})
+    for _ in range(iterations):
+        cache.incr(key)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the shared SQLite cache backend against LocMem and the database cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=2000,
+            help='Operations per measurement (default: 2000)',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=4,
+            help='Processes incrementing one shared counter in the cross-process check (default: 4)',
+        )
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        params = {'OPTIONS': {'MAX_ENTRIES': iterations * 2}}
+
+        with tempfile.TemporaryDirectory() as directory:
+            location = os.path.join(directory, 'cache.sqlite3')
+            table_creator = CreateCacheTable()
+            table_creator.verbosity = 0
+            table_creator.create_table(connection.alias, BENCHMARK_TABLE, False)
+            try:
+                backends = [
+                    ('locmem', LocMemCache('benchmark', params)),
+                    ('database', DatabaseCache(BENCHMARK_TABLE, params)),
+                    ('sqlite', SQLiteCache(location, params)),
+                ]
+                self.stdout.write(f"{'backend':<10}{'set/s':>12}{'get/s':>12}{'miss/s':>12}{'incr/s':>12}")
+                for name, cache in backends:
+                    rates = self.measure(cache, iterations)
+                    self.stdout.write(f'{name:<10}' + ''.join(f'{rate:>12,.0f}' for rate in rates))
+            finally:
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DROP TABLE {connection.ops.quote_name(BENCHMARK_TABLE)}')
+
+            self.check_shared_incr(location, iterations, options['processes'])
+
+    def measure(self, cache, iterations):
+        """Return operations per second for set, get hit, get miss and incr."""
+        cache.clear()
+        keys = [f'key:{i}' for i in range(iterations)]
+        value = {'room_number': 'A101', 'occupancy': 2, 'amenities': ['WiFi', 'AC']}
+        cache.set('counter', 0)
+
+        operations = [
+            lambda: [cache.set(key, value) for key in keys],
+            lambda: [cache.get(key) for key in keys],
+            lambda: [cache.get(f'missing:{key}') for key in keys],
+            lambda: [cache.incr('counter') for _ in keys],
+        ]
+        rates = []
+        for operation in operations:
+            started = time.perf_counter()
+            operation()
+            rates.append(iterations / (time.perf_counter() - started))
+        return rates
+
+    def check_shared_incr(self, location, iterations, processes):
+        """Increment one counter from several processes and verify no update was lost."""
+        cache = SQLiteCache(location, {})
+        cache.set('shared', 0)
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=_hammer_incr, args=(location, 'shared', iterations))
+            for _ in range(processes)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+
+        expected = processes * iterations
+        total = cache.get('shared')
+        rate = expected / elapsed
+        if total == expected:
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ {processes} processes incremented a shared counter to {total} ({rate:,.0f} incr/s)'
+            ))
+        else:
+            self.stdout.write(self.style.ERROR(f'✗ Shared counter is {total}, expected {expected}'))
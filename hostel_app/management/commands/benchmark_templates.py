@@ -0,0 +1,168 @@
+"""
+Management command to compare Django-only and Jinja2-fragment rendering of the list pages.
+
+Renders the applications, complaints and room list pages with 15, 50 and 200
+in-memory rows, first with the Django loops and then with the Jinja2 list
+fragments, and reports the mean time per page. No database rows are created.
+
+Usage: python manage.py benchmark_templates [--repeat N]
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from hostel_app.models import StudentProfile, Room, RoomAllocation, Complaint
+from hostel_app.views import render_fragments
+
+
+ROW_COUNTS = (15, 50, 200)
+
+
+def _students(count):
+    users = []
+    for i in range(count):
+        user = User(id=i + 1, username=f'student{i}')
+        StudentProfile(user=user, full_name=f'Student {i}')
+        users.append(user)
+    return users
+
+
+def _rooms(count):
+    return [
+        Room(
+            id=i + 1, room_number=f'A{i:03d}', block_name='Block A', floor=1 + i % 4,
+            capacity=3, current_occupancy=i % 4, room_type='Triple',
+            status='Full' if i % 4 == 3 else 'Available', amenities='WiFi, Desk',
+        )
+        for i in range(count)
+    ]
+
+
+def _page(objects):
+    return Paginator(objects, len(objects)).get_page(1)
+
+
+def application_page(count):
+    now = timezone.now()
+    statuses = ['Pending', 'Approved', 'Rejected', 'Waitlisted']
+    page = _page([
+        RoomAllocation(id=i + 1, student=student, room=room, status=statuses[i % 4], applied_date=now)
+        for i, (student, room) in enumerate(zip(_students(count), _rooms(count)))
+    ])
+    context = {
+        'page_obj': page,
+        'applications': page.object_list,
+        'search_query': '',
+        'status_filter': '',
+        'status_choices': RoomAllocation.STATUS_CHOICES,
+    }
+    return 'admin_manage_applications.html', context, {
+        'rows': 'admin_application_rows.html', 'modals': 'admin_application_reject_modals.html',
+    }
+
+
+def complaint_page(count):
+    now = timezone.now()
+    page = _page([
+        Complaint(
+            id=i + 1, student=student, subject=f'Issue {i}', created_at=now,
+            description='The ceiling fan makes a loud noise at night and the switch sparks when used.',
+            priority=['Low', 'Medium', 'High'][i % 3], status=['Pending', 'In Progress', 'Resolved'][i % 3],
+        )
+        for i, student in enumerate(_students(count))
+    ])
+    context = {
+        'page_obj': page,
+        'complaints': page.object_list,
+        'search_query': '',
+        'status_filter': '',
+        'priority_filter': '',
+        'status_choices': Complaint.STATUS_CHOICES,
+        'priority_choices': Complaint.PRIORITY_CHOICES,
+    }
+    return 'admin_manage_complaints.html', context, {'rows': 'admin_complaint_rows.html'}
+
+
+def room_page(count):
+    page = _page(_rooms(count))
+    context = {
+        'page_obj': page,
+        'rooms': page.object_list,
+        'search_query': '',
+        'room_type_filter': '',
+        'room_types': Room.ROOM_TYPE_CHOICES,
+        'student_application': None,
+    }
+    return 'room_list.html', context, {'cards': 'room_cards.html'}
+
+
+PAGES = [
+    ('applications', application_page),
+    ('complaints', complaint_page),
+    ('rooms', room_page),
+]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark Django templates against the Jinja2 list fragments on 15-, 50- and 200-row pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Renders per measurement (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            import jinja2  # noqa: F401
+        except ImportError:
+            raise CommandError('Jinja2 is not installed (pip install Jinja2).')
+
+        request = RequestFactory().get('/')
+        request.user = User(id=0, username='admin', is_staff=True, is_superuser=True)
+        request._messages = CookieStorage(request)
+
+        jinja_engine = {
+            'NAME': 'jinja2',
+            'BACKEND': 'django.template.backends.jinja2.Jinja2',
+            'DIRS': [settings.BASE_DIR / 'templates' / 'jinja2'],
+            'OPTIONS': {'environment': 'hostel_app.jinja2_env.environment', 'autoescape': True},
+        }
+        templates = [engine for engine in settings.TEMPLATES if engine.get('NAME') != 'jinja2']
+
+        self.stdout.write(f"{'page':<14}{'rows':>6}{'django ms':>12}{'jinja2 ms':>12}{'speedup':>10}")
+        for name, build in PAGES:
+            for count in ROW_COUNTS:
+                template, context, fragments = build(count)
+                with override_settings(JINJA2_LIST_TEMPLATES=False):
+                    django_ms = self.measure(request, template, context, fragments, options['repeat'])
+                with override_settings(JINJA2_LIST_TEMPLATES=True, TEMPLATES=templates + [jinja_engine]):
+                    jinja_ms = self.measure(request, template, context, fragments, options['repeat'])
+                self.stdout.write(
+                    f'{name:<14}{count:>6}{django_ms:>12.2f}{jinja_ms:>12.2f}{django_ms / jinja_ms:>9.1f}x'
+                )
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete'))
+
+    def measure(self, request, template, context, fragments, repeat):
+        """Mean milliseconds to render the page, after one warm-up render."""
+        def render():
+            page_context = render_fragments(request, dict(context), **fragments)
+            return render_to_string(template, page_context, request=request)
+
+        render()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            render()
+        return (time.perf_counter() - started) * 1000 / repeat
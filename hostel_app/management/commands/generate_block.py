@@ -0,0 +1,73 @@
+"""
+Management command to create every room of a new block in one transaction.
+
+Usage: python manage.py generate_block "Block D" --prefix D --floors 1 6 --rooms-per-floor 40
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from hostel_app.forms import BlockGeneratorForm
+from hostel_app.models import Room
+
+
+class Command(BaseCommand):
+    help = 'Generate all rooms of a block from a floor range and numbering pattern'
+
+    def add_arguments(self, parser):
+        parser.add_argument('block_name', help='Block name, e.g. "Block D"')
+        parser.add_argument('--prefix', default='', help='Room number prefix, e.g. D')
+        parser.add_argument(
+            '--floors',
+            nargs=2,
+            type=int,
+            metavar=('FIRST', 'LAST'),
+            default=[1, 1],
+            help='First and last floor (inclusive)',
+        )
+        parser.add_argument('--rooms-per-floor', type=int, default=10)
+        parser.add_argument('--pattern', default='{prefix}{floor}{room:02d}', help='Room number pattern')
+        parser.add_argument('--capacity', type=int, default=2)
+        parser.add_argument(
+            '--room-type',
+            default='Double',
+            choices=[value for value, label in Room.ROOM_TYPE_CHOICES],
+        )
+        parser.add_argument('--amenities', default='', help='Comma-separated amenities')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and list the room numbers without creating anything',
+        )
+
+    def handle(self, *args, **options):
+        form = BlockGeneratorForm(data={
+            'block_name': options['block_name'],
+            'prefix': options['prefix'],
+            'first_floor': options['floors'][0],
+            'last_floor': options['floors'][1],
+            'rooms_per_floor': options['rooms_per_floor'],
+            'numbering_pattern': options['pattern'],
+            'capacity': options['capacity'],
+            'room_type': options['room_type'],
+            'amenities': options['amenities'],
+        })
+        if not form.is_valid():
+            errors = '; '.join(
+                error if field == '__all__' else f'{field}: {error}'
+                for field, field_errors in form.errors.items()
+                for error in field_errors
+            )
+            raise CommandError(errors)
+
+        numbers = form.cleaned_data['room_numbers']
+        if options['dry_run']:
+            self.stdout.write(f'Would create {len(numbers)} rooms: {", ".join(numbers)}')
+            return
+
+        try:
+            rooms = form.save()
+        except IntegrityError as e:
+            raise CommandError(f'Error creating rooms: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Created {len(rooms)} rooms in {options["block_name"]}'))
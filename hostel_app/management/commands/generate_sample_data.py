@@ -184,14 +184,13 @@ class Command(BaseCommand):
         rooms = Room.objects.all()[:len(students)]
 
         for student, room in zip(students, rooms):
-            allocation = RoomAllocation.objects.create(
+            RoomAllocation.objects.create(
                 student=student,
                 room=room,
                 status='Approved',
-                applied_date=timezone.now() - timedelta(days=5)
+                applied_date=timezone.now() - timedelta(days=5),
+                allocated_date=timezone.now() - timedelta(days=3),
             )
-            allocation.allocated_date = timezone.now() - timedelta(days=3)
-            allocation.save()
 
             room.current_occupancy += 1
             if room.current_occupancy >= room.capacity:
@@ -0,0 +1,384 @@
+"""
+Management command to load test the app with a simulated intake-day rush.
+
+Seeds throwaway students, admins and rooms, then runs one thread per seeded
+user against the in-process WSGI handler (no server or external services).
+Each user logs in through the login form and replays a mix of requests:
+students browse rooms, apply and file complaints; admins review and approve
+applications. Reports throughput, latency percentiles, error rate and query
+counts per route, writes them to a JSON file and removes the seeded data.
+
+The seeding and clean-up write to the configured database, so the command
+names it and asks for confirmation first; --noinput skips the prompt for
+scripted runs against a staging copy. Never point it at production.
+
+Usage: python manage.py load_test [--students N] [--admins N] [--duration S] [--output FILE] [--noinput]
+"""
+
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+from collections import defaultdict
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from hostel_app.models import StudentProfile, Room, RoomAllocation
+
+
+PREFIX = 'loadtest'
+PASSWORD = 'loadtest-password'
+BLOCK_NAME = 'Load Test Block'
+
+# Relative weights of the actions each kind of user picks from
+STUDENT_MIX = [
+    ('room_list', 60),
+    ('apply_room', 15),
+    ('complaints', 10),
+    ('file_complaint', 15),
+]
+ADMIN_MIX = [
+    ('manage_applications', 40),
+    ('approve_application', 60),
+]
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def git_revision():
+    """Current commit hash, so reports from different builds can be told apart."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class Recorder:
+    """Latencies, errors and query counts of one virtual user, keyed by route."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.queries = defaultdict(int)
+        self.route = None
+
+    def count_query(self, execute, sql, params, many, context):
+        self.queries[self.route] += 1
+        return execute(sql, params, many, context)
+
+    def request(self, route, send, ok_statuses=(200, 302)):
+        """Time `send()` (a test client call) and record it under `route`."""
+        self.route = route
+        started = time.perf_counter()
+        try:
+            response = send()
+        except Exception:
+            response = None
+        self.latencies[route].append((time.perf_counter() - started) * 1000)
+        if response is None or response.status_code not in ok_statuses:
+            self.errors[route] += 1
+        return response
+
+
+class Command(BaseCommand):
+    help = 'Replay an intake-day mix of student and admin requests and report latency per route'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--students',
+            type=int,
+            default=40,
+            help='Concurrent students (default: 40)',
+        )
+        parser.add_argument(
+            '--admins',
+            type=int,
+            default=2,
+            help='Concurrent admins (default: 2)',
+        )
+        parser.add_argument(
+            '--rooms',
+            type=int,
+            default=30,
+            help='Rooms to seed (default: 30)',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='Seconds to run after everyone has logged in (default: 30)',
+        )
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            default=0,
+            help='Mean seconds each user waits between requests (default: 0)',
+        )
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='JSON report path (default: load_test_<timestamp>.json)',
+        )
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Keep the seeded users and rooms instead of deleting them',
+        )
+        parser.add_argument(
+            '--noinput', '--no-input',
+            action='store_false',
+            dest='interactive',
+            help='Do not ask for confirmation before writing to the configured database',
+        )
+
+    def handle(self, *args, **options):
+        if options['interactive']:
+            self.confirm()
+        self.clear_data()
+        students, admins = self.seed(options['students'], options['admins'], options['rooms'])
+        room_ids = list(Room.objects.filter(block_name=BLOCK_NAME).values_list('id', flat=True))
+        self.stdout.write(
+            f'Seeded {len(students)} students, {len(admins)} admins and {len(room_ids)} rooms'
+        )
+
+        ready = threading.Barrier(len(students) + len(admins) + 1)
+        stop_event = threading.Event()
+        recorders = []
+        threads = []
+        for index, (username, mix) in enumerate(
+            [(name, STUDENT_MIX) for name in students] + [(name, ADMIN_MIX) for name in admins]
+        ):
+            recorder = Recorder()
+            recorders.append(recorder)
+            threads.append(threading.Thread(
+                target=self.virtual_user,
+                args=(index, username, mix, room_ids, recorder, ready, stop_event, options['think_time']),
+                daemon=True,
+            ))
+        for thread in threads:
+            thread.start()
+
+        ready.wait()
+        started = time.perf_counter()
+        time.sleep(options['duration'])
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        report = self.build_report(recorders, elapsed, options)
+        self.print_report(report)
+
+        output = options['output'] or f"load_test_{timezone.now():%Y%m%d_%H%M%S}.json"
+        with open(output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(f'Report written to {output}')
+
+        if not options['keep']:
+            self.clear_data()
+        self.stdout.write(self.style.SUCCESS('✓ Load test complete'))
+
+    def confirm(self):
+        """Ask before seeding and deleting data in the configured database."""
+        database = connection.settings_dict
+        target = f"{database['NAME']} on {database['HOST']}" if database['HOST'] else database['NAME']
+        self.stdout.write(
+            f"This creates and then deletes {PREFIX}_* users and the '{BLOCK_NAME}' rooms in the database "
+            f"{target}. Run it against a staging copy, never production."
+        )
+        try:
+            answer = input("Type 'yes' to continue, or 'no' to cancel: ")
+        except EOFError:
+            answer = ''
+        if answer != 'yes':
+            raise CommandError('Load test cancelled.')
+
+    def seed(self, student_count, admin_count, room_count):
+        """Create the load test users (one shared password hash) and rooms."""
+        password = make_password(PASSWORD)
+        students = [f'{PREFIX}_student{i}' for i in range(student_count)]
+        admins = [f'{PREFIX}_admin{i}' for i in range(admin_count)]
+        User.objects.bulk_create(
+            [User(username=name, password=password) for name in students]
+            + [User(username=name, password=password, is_staff=True, is_superuser=True) for name in admins]
+        )
+        StudentProfile.objects.bulk_create([
+            StudentProfile(
+                user=user, full_name=f'Load Student {i}', department='CSE', year=1 + i % 4,
+                phone_number='9876543210', address='Load Test Address', guardian_name='Load Guardian',
+            )
+            for i, user in enumerate(User.objects.filter(username__in=students).order_by('id'))
+        ])
+        # New rooms start empty, so the default Available status is right for all of them
+        Room.objects.bulk_create([
+            Room(
+                room_number=f'LT{i:03d}', block_name=BLOCK_NAME, floor=1 + i // 10,
+                capacity=random.choice([1, 2, 3]), room_type='Double', amenities='WiFi',
+            )
+            for i in range(room_count)
+        ])
+        return students, admins
+
+    def clear_data(self):
+        """
+        Delete load test users (cascading to their applications and complaints) and rooms.
+
+        Cascaded applications still leave the pending count and end their stays
+        through the delete signals (see apps.py); audit events and residency
+        history are kept, unlinked, under the load test usernames.
+        """
+        User.objects.filter(username__startswith=f'{PREFIX}_').delete()
+        Room.objects.filter(block_name=BLOCK_NAME).delete()
+
+    def virtual_user(self, index, username, mix, room_ids, recorder, ready, stop_event, think_time):
+        """Log in, wait for everyone else, then replay weighted actions until stopped."""
+        client = Client(REMOTE_ADDR=f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}',
+                        raise_request_exception=False)
+        rng = random.Random(index)
+        actions, weights = zip(*mix)
+        try:
+            with connection.execute_wrapper(recorder.count_query):
+                recorder.request('login', lambda: client.post(
+                    reverse('login'), {'username': username, 'password': PASSWORD}
+                ), ok_statuses=(302,))
+                ready.wait()
+                while not stop_event.is_set():
+                    action = rng.choices(actions, weights)[0]
+                    getattr(self, f'do_{action}')(client, rng, room_ids, recorder)
+                    if think_time:
+                        stop_event.wait(rng.expovariate(1 / think_time))
+        finally:
+            connections.close_all()
+
+    def do_room_list(self, client, rng, room_ids, recorder):
+        page = rng.choice([1, 1, 1, 2, 3])
+        recorder.request('room_list', lambda: client.get(reverse('room_list'), {'page': page}))
+
+    def do_apply_room(self, client, rng, room_ids, recorder):
+        url = reverse('apply_room', args=[rng.choice(room_ids)])
+        key = f'{rng.getrandbits(128):032x}'
+        recorder.request('apply_room', lambda: client.post(url, {'idempotency_key': key}))
+
+    def do_complaints(self, client, rng, room_ids, recorder):
+        recorder.request('complaints', lambda: client.get(reverse('complaints')))
+
+    def do_file_complaint(self, client, rng, room_ids, recorder):
+        data = {
+            'subject': rng.choice(['Fan not working', 'Leaking tap', 'No hot water', 'WiFi down']),
+            'description': 'Reported during intake week, please take a look.',
+            'priority': rng.choice(['Low', 'Medium', 'High']),
+        }
+        recorder.request('file_complaint', lambda: client.post(reverse('complaints'), data))
+
+    def do_manage_applications(self, client, rng, room_ids, recorder):
+        recorder.request('manage_applications', lambda: client.get(
+            reverse('manage_applications'), {'status': 'Pending'}
+        ))
+
+    def do_approve_application(self, client, rng, room_ids, recorder):
+        # Picking the application is the admin reading the list, so it is not timed
+        recorder.route = None
+        pending = list(RoomAllocation.objects.filter(
+            status='Pending', student__username__startswith=f'{PREFIX}_'
+        ).values_list('id', flat=True)[:20])
+        if not pending:
+            return self.do_manage_applications(client, rng, room_ids, recorder)
+        url = reverse('approve_application', args=[rng.choice(pending)])
+        recorder.request('approve_application', lambda: client.post(url))
+
+    def build_report(self, recorders, elapsed, options):
+        """Merge the per-user recorders into per-route and overall statistics."""
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        queries = defaultdict(int)
+        for recorder in recorders:
+            for route, values in recorder.latencies.items():
+                latencies[route].extend(values)
+            for route, count in recorder.errors.items():
+                errors[route] += count
+            for route, count in recorder.queries.items():
+                if route is not None:
+                    queries[route] += count
+
+        def summarize(values, error_count, query_count, seconds):
+            values = sorted(values)
+            return {
+                'requests': len(values),
+                'errors': error_count,
+                'error_rate': round(error_count / len(values), 4) if values else 0,
+                'throughput_rps': round(len(values) / seconds, 2) if seconds else None,
+                'mean_ms': round(sum(values) / len(values), 2) if values else None,
+                'p50_ms': round(percentile(values, 50), 2) if values else None,
+                'p95_ms': round(percentile(values, 95), 2) if values else None,
+                'p99_ms': round(percentile(values, 99), 2) if values else None,
+                'max_ms': round(values[-1], 2) if values else None,
+                'queries': query_count,
+                'queries_per_request': round(query_count / len(values), 2) if values else None,
+            }
+
+        # Logins happen before the clock starts, so they are left out of the totals
+        routes = {
+            route: summarize(values, errors[route], queries[route], None if route == 'login' else elapsed)
+            for route, values in sorted(latencies.items())
+        }
+        timed = [route for route in latencies if route != 'login']
+        total = summarize(
+            [value for route in timed for value in latencies[route]],
+            sum(errors[route] for route in timed),
+            sum(queries[route] for route in timed),
+            elapsed,
+        )
+        return {
+            'started_at': timezone.now().isoformat(),
+            'revision': git_revision(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'cache': settings.CACHES['default']['BACKEND'],
+                'debug': settings.DEBUG,
+            },
+            'config': {
+                'students': options['students'],
+                'admins': options['admins'],
+                'rooms': options['rooms'],
+                'duration': options['duration'],
+                'think_time': options['think_time'],
+            },
+            'elapsed_seconds': round(elapsed, 2),
+            'total': total,
+            'routes': routes,
+        }
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"{'route':<22}{'reqs':>7}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'err %':>8}{'q/req':>7}"
+        )
+        rows = list(report['routes'].items()) + [('TOTAL', report['total'])]
+        for route, stats in rows:
+            self.stdout.write(
+                f"{route:<22}{stats['requests']:>7}{stats['throughput_rps'] or 0:>8.1f}"
+                f"{stats['p50_ms'] or 0:>9.1f}{stats['p95_ms'] or 0:>9.1f}{stats['p99_ms'] or 0:>9.1f}"
+                f"{stats['error_rate']:>8.1%}{stats['queries_per_request'] or 0:>7.1f}"
+            )
@@ -0,0 +1,81 @@
+"""
+Management command to apply a batch of room moves in one transaction.
+
+The CSV file has one `username,room_number` row per student to move (a header
+row with those names is optional). Either every move is applied or none is.
+
+Usage: python manage.py move_students moves.csv [--dry-run]
+"""
+
+import csv
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from hostel_app.models import Room
+from hostel_app.transfers import TransferError, apply_moves
+
+
+class DryRun(Exception):
+    """Raised to roll back a dry run after the moves were applied."""
+
+
+class Command(BaseCommand):
+    help = 'Move students to new rooms atomically from a username,room_number CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV file of username,room_number rows')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Check and report the moves, then roll them back',
+        )
+
+    def handle(self, *args, **options):
+        rows = self.read_rows(options['file'])
+        students = User.objects.in_bulk([username for username, _ in rows], field_name='username')
+        rooms = Room.objects.in_bulk([number for _, number in rows], field_name='room_number')
+
+        unknown = [username for username, _ in rows if username not in students]
+        unknown += [number for _, number in rows if number not in rooms]
+        if unknown:
+            raise CommandError(f'Unknown students or rooms: {", ".join(sorted(set(unknown)))}')
+
+        try:
+            with transaction.atomic():
+                moves = apply_moves(
+                    [(students[username], rooms[number]) for username, number in rows],
+                    notify=not options['dry_run'],
+                )
+                if options['dry_run']:
+                    raise DryRun
+        except TransferError as e:
+            raise CommandError(f'No students were moved: {e}')
+        except DryRun:
+            pass
+
+        usernames = {student.pk: username for username, student in students.items()}
+        for move in moves:
+            self.stdout.write(
+                f'  {usernames[move.allocation.student_id]}: '
+                f'Room {move.from_room.room_number} -> Room {move.to_room.room_number}'
+            )
+
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        self.stdout.write(self.style.SUCCESS(f'✓ {verb} {len(moves)} students'))
+
+    def read_rows(self, path):
+        """(username, room_number) pairs from the CSV file, skipping blanks and a header."""
+        try:
+            with open(path, newline='') as handle:
+                rows = [
+                    (row[0].strip(), row[1].strip())
+                    for row in csv.reader(handle)
+                    if len(row) >= 2 and row[0].strip()
+                ]
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+        if rows and rows[0] == ('username', 'room_number'):
+            rows = rows[1:]
+        return rows
@@ -0,0 +1,36 @@
+"""
+Management command to recompute room occupancy from approved allocations.
+
+Usage: python manage.py reconcile_occupancy [--dry-run]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from hostel_app.occupancy import find_drifted_rooms, reconcile_occupancy
+
+
+class Command(BaseCommand):
+    help = 'Recompute occupancy and Full/Available status for all rooms and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted rooms without fixing them',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        drifted = find_drifted_rooms() if options['dry_run'] else reconcile_occupancy()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        for room in drifted:
+            self.stdout.write(
+                f"  Room {room['room_number']}: occupancy {room['current_occupancy']} -> {room['actual']}, "
+                f"status {room['status']} -> {room['expected_status']}"
+            )
+
+        verb = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'✓ {verb} {len(drifted)} drifted rooms in {elapsed_ms:.0f} ms'))
@@ -0,0 +1,60 @@
+"""
+Management command to list who lived in a room or block at a time or during a period.
+
+Usage: python manage.py residents --at "2026-03-03 02:00" [--until "2026-03-03 08:00"]
+       [--block "Block B"] [--room B101]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from hostel_app.models import Residency
+from hostel_app.residency import residents_at, residents_during
+
+
+def parse_moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        raise CommandError(f'Invalid time: {value} (expected YYYY-MM-DD HH:MM)')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+class Command(BaseCommand):
+    help = 'List the students living in a room or block at a moment or at any time during a period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--at', required=True, help='Moment, or start of the period with --until')
+        parser.add_argument('--until', default=None, help='End of the period (exclusive)')
+        parser.add_argument('--block', default=None, help='Only rooms in this block')
+        parser.add_argument('--room', default=None, help='Only this room number')
+
+    def handle(self, *args, **options):
+        start = parse_moment(options['at'])
+        end = parse_moment(options['until']) if options['until'] else None
+        if end is not None and end <= start:
+            raise CommandError('--until must be after --at')
+
+        # Stays keep their room number, so rooms deleted since are found too
+        if options['room'] and not Residency.objects.filter(room_number=options['room']).exists():
+            raise CommandError(f'Unknown room: {options["room"]}')
+
+        started = time.perf_counter()
+        if end is None:
+            stays = list(residents_at(start, block_name=options['block'], room_number=options['room']))
+        else:
+            stays = list(residents_during(start, end, block_name=options['block'], room_number=options['room']))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        for stay in stays:
+            until = timezone.localtime(stay.ended_at).strftime('%Y-%m-%d %H:%M') if stay.ended_at else 'now'
+            self.stdout.write(
+                f'  Room {stay.room_number} ({stay.block_name}): {stay.username}, '
+                f'{timezone.localtime(stay.started_at):%Y-%m-%d %H:%M} - {until}'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Found {len(stays)} stays in {elapsed_ms:.0f} ms'))
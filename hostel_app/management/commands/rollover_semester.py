@@ -0,0 +1,91 @@
+"""
+Management command to archive finished allocations and complaints at the end of a semester.
+
+Usage: python manage.py rollover_semester --semester "2026 Fall" [--batch-size 1000] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from hostel_app.models import RoomAllocation, Complaint, ArchivedRoomAllocation, ArchivedComplaint
+
+
+class Command(BaseCommand):
+    help = 'Move rejected/ended allocations and resolved complaints into archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--semester',
+            required=True,
+            help='Label stored on the archived rows, e.g. "2026 Fall"',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows moved per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be archived without changing anything',
+        )
+
+    def handle(self, *args, **options):
+        semester = options['semester'].strip()
+        batch_size = options['batch_size']
+        if not semester:
+            raise CommandError('--semester must not be empty')
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        allocations = RoomAllocation.objects.filter(status='Rejected')
+        complaints = Complaint.objects.filter(status='Resolved')
+
+        if options['dry_run']:
+            self.stdout.write(f'Would archive {allocations.count()} allocations and {complaints.count()} complaints.')
+            return
+
+        moved_allocations = self.archive(
+            allocations.select_related('room'),
+            lambda allocation: ArchivedRoomAllocation.from_allocation(allocation, semester),
+            ArchivedRoomAllocation,
+            batch_size,
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Archived {moved_allocations} allocations'))
+
+        moved_complaints = self.archive(
+            complaints,
+            lambda complaint: ArchivedComplaint.from_complaint(complaint, semester),
+            ArchivedComplaint,
+            batch_size,
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Archived {moved_complaints} complaints'))
+
+    def archive(self, queryset, to_archive, archive_model, batch_size):
+        """
+        Copy rows into the archive table and delete them, one short transaction per batch.
+
+        Batches are keyed on primary key so each transaction only locks the rows it moves.
+        A row already in the archive aborts its batch rather than being deleted uncopied.
+        """
+        moved = 0
+        last_id = 0
+        while True:
+            try:
+                with transaction.atomic():
+                    batch = list(queryset.filter(id__gt=last_id).order_by('id')[:batch_size])
+                    if not batch:
+                        break
+                    ids = [row.id for row in batch]
+                    archive_model.objects.bulk_create([to_archive(row) for row in batch])
+                    queryset.model.objects.filter(id__in=ids).delete()
+            except IntegrityError as error:
+                raise CommandError(
+                    f'Could not archive {queryset.model._meta.verbose_name_plural} '
+                    f'{ids[0]}-{ids[-1]}, nothing in that batch was moved: {error}'
+                )
+            moved += len(batch)
+            last_id = ids[-1]
+            self.stdout.write(f'  ...moved {moved} {queryset.model._meta.verbose_name_plural}')
+        return moved
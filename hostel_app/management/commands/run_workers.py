@@ -0,0 +1,114 @@
+"""
+Management command to run background job workers.
+
+Usage: python manage.py run_workers [--workers N] [--burst]
+"""
+
+import logging
+import os
+import signal
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from hostel_app import jobs
+
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run a pool of workers that process queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'JOB_WORKERS', 2),
+            help='Number of worker threads (default: JOB_WORKERS setting)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the queue is empty',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help='Requeue running jobs whose heartbeat is older than this many seconds',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def request_stop(signum, frame):
+            self.stdout.write('Stopping workers after their current job...')
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        stale_after = timedelta(seconds=options['stale_after'])
+        self.requeue_stale(stale_after)
+
+        if not options['burst']:
+            scheduler = threading.Thread(
+                target=self.schedule,
+                args=(stop_event, options['poll_interval'] * 10, stale_after),
+                daemon=True,
+            )
+            scheduler.start()
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        threads = [
+            threading.Thread(
+                target=jobs.work,
+                args=(f'{prefix}:{i}', stop_event, options['poll_interval'], options['burst']),
+                daemon=True,
+            )
+            for i in range(max(options['workers'], 1))
+        ]
+        for thread in threads:
+            thread.start()
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Started {len(threads)} workers'))
+
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+
+        self.stdout.write(self.style.SUCCESS('✓ Workers stopped'))
+
+    def requeue_stale(self, stale_after):
+        """Requeue (or fail) jobs whose worker stopped responding, and report them."""
+        requeued, failed = jobs.requeue_stale_jobs(stale_after)
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'⚠ Requeued {requeued} stale jobs'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'⚠ Failed {failed} stale jobs out of attempts'))
+
+    def schedule(self, stop_event, interval, stale_after):
+        """Queue periodic jobs (settings.PERIODIC_JOBS) as they fall due and requeue stale ones."""
+        while not stop_event.is_set():
+            try:
+                close_old_connections()
+                self.requeue_stale(stale_after)
+                for job in jobs.enqueue_due_periodic_jobs():
+                    self.stdout.write(f'Queued periodic job #{job.id} {job.name}')
+            except Exception:
+                # Keep scheduling through a dropped connection, as the workers do
+                logger.exception('Job scheduler failed; retrying in %ss', interval)
+                close_old_connections()
+            stop_event.wait(interval)
+        close_old_connections()
@@ -0,0 +1,54 @@
+"""
+Management command to record today's occupancy snapshot or rebuild daily totals.
+
+Usage: python manage.py snapshot_occupancy [--date YYYY-MM-DD] [--rebuild START END]
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hostel_app.history import rebuild_daily, take_snapshot
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Invalid date: {value} (expected YYYY-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = 'Record per-room occupancy for a day, or rebuild daily totals from the recorded spans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            default=None,
+            help='Day to record (default: today); must not be before the last snapshot',
+        )
+        parser.add_argument(
+            '--rebuild',
+            nargs=2,
+            metavar=('START', 'END'),
+            help='Recompute daily totals for START <= day < END from the spans instead',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        if options['rebuild']:
+            start, end = (parse_date(value) for value in options['rebuild'])
+            rows = rebuild_daily(start, end)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {rows} daily rows in {elapsed_ms:.0f} ms'))
+            return
+
+        day = parse_date(options['date']) if options['date'] else None
+        try:
+            changed = take_snapshot(day)
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(f'✓ Snapshot recorded; {changed} rooms changed ({elapsed_ms:.0f} ms)'))
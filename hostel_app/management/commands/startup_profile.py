@@ -0,0 +1,92 @@
+"""
+Management command to profile a cold start.
+
+Starts a fresh Python process with `-X importtime`, sets Django up and runs
+the warm-up steps, then reports the slowest imports and the time to each
+stage of startup.
+
+Usage: python manage.py startup_profile [--top N]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in the child process; prints one JSON line with stage timings.
+PROFILE_SCRIPT = """
+import json, os, time
+started = time.perf_counter()
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+django.setup()
+stages = {{'apps_ready': time.perf_counter() - started}}
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+stages['wsgi_loaded'] = time.perf_counter() - started
+from hostel_app.warmup import warm_up
+for name, (seconds, result) in warm_up().items():
+    stages['warm_up.' + name] = seconds
+    if isinstance(result, Exception):
+        stages['warm_up.' + name + '.error'] = repr(result)
+print(json.dumps(stages))
+"""
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into (module, self_us, cumulative_us) tuples."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Report import time per module and time to app-ready for a cold start'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of slowest modules to list (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        script = PROFILE_SCRIPT.format(settings_module=os.environ.get('DJANGO_SETTINGS_MODULE'))
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            raise CommandError(f'Startup failed:\n{process.stderr[-2000:]}')
+
+        stages = json.loads(process.stdout.strip().splitlines()[-1])
+        imports = parse_importtime(process.stderr)
+
+        self.stdout.write(f'Slowest imports (top {options["top"]} by cumulative time):')
+        self.stdout.write(f"  {'cumulative ms':>13}  {'self ms':>8}  module")
+        for module, self_us, cumulative_us in sorted(imports, key=lambda row: -row[2])[:options['top']]:
+            self.stdout.write(f'  {cumulative_us / 1000:>13.1f}  {self_us / 1000:>8.1f}  {module}')
+
+        total_import_ms = sum(row[1] for row in imports) / 1000
+        self.stdout.write(f'\n{len(imports)} modules imported in {total_import_ms:.0f} ms')
+        self.stdout.write('Startup stages (ms; apps_ready and wsgi_loaded are measured from `import django`):')
+        for stage, value in stages.items():
+            if stage.endswith('.error'):
+                self.stdout.write(self.style.WARNING(f'  ⚠ {stage[:-6]} failed: {value}'))
+            elif stage.startswith('warm_up.'):
+                self.stdout.write(f'  {stage:<22}{value * 1000:>9.1f} (step)')
+            else:
+                self.stdout.write(f'  {stage:<22}{value * 1000:>9.1f}')
+
+        self.stdout.write(self.style.SUCCESS('✓ Startup profile complete'))
@@ -0,0 +1,17 @@
+"""
+Middleware for the Hostel Management System.
+"""
+
+from . import audit
+
+
+class AuditMiddleware:
+    """Attribute audit events recorded during the request to the requesting user."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # request.user is lazy, so requests that change nothing never load it
+        with audit.acting_as(getattr(request, 'user', None)):
+            return self.get_response(request)
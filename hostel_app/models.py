@@ -2,11 +2,14 @@
 Models for the Hostel Management System.
 """
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
+from . import audit
+from .counters import adjust_pending_count
+
 
 class StudentProfile(models.Model):
     """Student profile information linked to Django User model."""
@@ -45,6 +48,9 @@ class StudentProfile(models.Model):
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'Student Profiles'
+        indexes = [
+            models.Index(fields=['full_name'], name='profile_full_name_idx'),
+        ]
     
     def __str__(self):
         return f"{self.full_name} ({self.user.username})"
@@ -61,6 +67,19 @@ class StudentProfile(models.Model):
         return allocation.room if allocation else None
 
 
+def student_display_name(user):
+    """
+    Return the student's full name, falling back to the username.
+
+    Uses the reverse one-to-one accessor so callers that
+    select_related('student__student_profile') pay no extra query.
+    """
+    try:
+        return user.student_profile.full_name
+    except StudentProfile.DoesNotExist:
+        return user.username
+
+
 class Room(models.Model):
     """Model for hostel rooms."""
     
@@ -90,6 +109,9 @@ class Room(models.Model):
     class Meta:
         ordering = ['block_name', 'floor', 'room_number']
         verbose_name_plural = 'Rooms'
+        indexes = [
+            models.Index(fields=['block_name', 'floor', 'room_number'], name='room_block_floor_idx'),
+        ]
     
     def __str__(self):
         return f"Room {self.room_number} - Block {self.block_name}"
@@ -112,15 +134,60 @@ class Room(models.Model):
         return self.current_occupancy >= self.capacity
     
     def update_occupancy(self):
-        """Update occupancy based on approved allocations."""
+        """Update occupancy based on approved allocations; a room under maintenance stays closed."""
         approved_count = self.room_allocations.filter(status='Approved').count()
         self.current_occupancy = approved_count
-        if self.current_occupancy >= self.capacity:
-            self.status = 'Full'
-        elif self.status == 'Full' and self.current_occupancy < self.capacity:
-            self.status = 'Available'
+        if self.status != 'Maintenance':
+            if self.current_occupancy >= self.capacity:
+                self.status = 'Full'
+            elif self.status == 'Full':
+                self.status = 'Available'
         self.save()
 
+    def promote_waitlist(self):
+        """
+        Promote the oldest waitlisted applications into free slots.
+
+        Free slots are those not already covered by a pending application.
+        Promoted applications become pending and their students are notified.
+        Returns the list of promoted allocations.
+        """
+        if self.status == 'Maintenance':
+            return []
+
+        with transaction.atomic():
+            pending_count = self.room_allocations.filter(status='Pending').count()
+            open_slots = self.available_slots - pending_count
+            if open_slots <= 0:
+                return []
+
+            promoted = list(
+                self.room_allocations.select_for_update()
+                .filter(status='Waitlisted')
+                .order_by('applied_date')[:open_slots]
+            )
+            if not promoted:
+                return []
+
+            RoomAllocation.objects.filter(id__in=[a.id for a in promoted]).update(status='Pending')
+            adjust_pending_count(len(promoted))
+            audit.record_many([
+                ('Allocation', allocation.id, allocation.student_id, self.id, 'Waitlisted', 'Pending')
+                for allocation in promoted
+            ])
+            Notification.objects.bulk_create([
+                Notification(
+                    student_id=allocation.student_id,
+                    message=f'A place opened in Room {self.room_number}. '
+                            f'Your waitlisted application is now pending approval.',
+                )
+                for allocation in promoted
+            ])
+
+        for allocation in promoted:
+            allocation.status = 'Pending'
+        return promoted
+
 
 class RoomAllocation(models.Model):
     """Model for room allocation requests and approvals."""
@@ -129,39 +196,114 @@ class RoomAllocation(models.Model):
         ('Pending', 'Pending'),
         ('Approved', 'Approved'),
         ('Rejected', 'Rejected'),
+        ('Waitlisted', 'Waitlisted'),
     ]
     
+    # Statuses that count as a student's current application.
+    ACTIVE_STATUSES = ['Pending', 'Approved', 'Waitlisted']
+    
     student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='room_allocations')
     room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='room_allocations')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
     applied_date = models.DateTimeField(auto_now_add=True)
     allocated_date = models.DateTimeField(null=True, blank=True)
+    # When an approved allocation stopped being approved (removed, rejected)
+    ended_date = models.DateTimeField(null=True, blank=True)
     rejection_reason = models.TextField(blank=True)
+    idempotency_key = models.CharField(max_length=64, blank=True)
     
     class Meta:
         ordering = ['-applied_date']
         unique_together = ('student', 'room')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student'],
+                condition=models.Q(status__in=['Pending', 'Approved', 'Waitlisted']),
+                name='one_active_application_per_student',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', '-applied_date'], name='alloc_status_applied_idx'),
+            models.Index(fields=['room', 'status', 'applied_date'], name='alloc_room_queue_idx'),
+        ]
+    
+    # Status as last loaded from or written to the database.
+    _saved_status = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_status = instance.__dict__.get('status')
+        return instance
     
     def __str__(self):
-        student_profile = StudentProfile.objects.filter(user=self.student).first()
-        student_name = student_profile.full_name if student_profile else self.student.username
-        return f"{student_name} - Room {self.room.room_number}"
+        return f"{student_display_name(self.student)} - Room {self.room.room_number}"
+    
+    def save(self, *args, **kwargs):
+        """Save, keeping the cached pending count, residency history and audit log in step."""
+        moving_in = self.status == 'Approved' and self._saved_status != 'Approved'
+        moving_out = self._saved_status == 'Approved' and self.status != 'Approved'
+        if moving_in:
+            self.ended_date = None
+        elif moving_out:
+            self.ended_date = timezone.now()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if moving_out:
+                Residency.end([self.id], self.ended_date)
+            elif moving_in:
+                Residency.begin([self], self.allocated_date or timezone.now())
+            if self.status != self._saved_status:
+                audit.record('Allocation', self.id, self.student_id, self.room_id, self._saved_status, self.status)
+        adjust_pending_count((self.status == 'Pending') - (self._saved_status == 'Pending'))
+        self._saved_status = self.status
+    
+    def delete(self, *args, **kwargs):
+        """Delete, auditing the removal; the pending count and residency follow via signals (apps.py)."""
+        allocation_id = self.id
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            audit.record('Allocation', allocation_id, self.student_id, self.room_id, self._saved_status, 'Deleted')
+        self._saved_status = None
+        return result
     
     def approve(self):
-        """Approve the room allocation."""
-        if not self.room.is_full:
+        """Approve the room allocation if its room, locked and re-read, still has a free place."""
+        with transaction.atomic():
+            # A room loaded earlier (select_related, a loop over many approvals) may be
+            # stale: lock its row, then re-read it in place so callers see the update too
+            list(Room.objects.select_for_update().filter(pk=self.room_id).values_list('pk', flat=True))
+            self.room.refresh_from_db(fields=['capacity', 'current_occupancy', 'status'])
+            if self.room.is_full:
+                return False
             self.status = 'Approved'
             self.allocated_date = timezone.now()
             self.save()
             self.room.update_occupancy()
-            return True
-        return False
+        return True
+    
+    @property
+    def waitlist_position(self):
+        """1-based position in the room's waitlist, or None if not waitlisted."""
+        if self.status != 'Waitlisted':
+            return None
+        return RoomAllocation.objects.filter(
+            room_id=self.room_id,
+            status='Waitlisted',
+            applied_date__lt=self.applied_date,
+        ).count() + 1
     
     def reject(self, reason=""):
-        """Reject the room allocation."""
-        self.status = 'Rejected'
-        self.rejection_reason = reason
-        self.save()
+        """Reject the room allocation and promote the room's waitlist."""
+        previous_status = self.status
+        with transaction.atomic():
+            self.status = 'Rejected'
+            self.rejection_reason = reason
+            self.save()
+            if previous_status == 'Approved':
+                self.room.update_occupancy()
+            if previous_status in ('Pending', 'Approved'):
+                self.room.promote_waitlist()
 
 
 class Complaint(models.Model):
@@ -193,14 +335,354 @@ class Complaint(models.Model):
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'Complaints'
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='complaint_status_created_idx'),
+        ]
+    
+    # Status as last loaded from or written to the database.
+    _saved_status = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_status = instance.__dict__.get('status')
+        return instance
     
     def __str__(self):
-        student_profile = StudentProfile.objects.filter(user=self.student).first()
-        student_name = student_profile.full_name if student_profile else self.student.username
-        return f"{self.subject} - {student_name}"
+        return f"{self.subject} - {student_display_name(self.student)}"
+    
+    def save(self, *args, **kwargs):
+        """Save and audit status changes, in one transaction."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self.status != self._saved_status:
+                audit.record('Complaint', self.id, self.student_id, self.room_id, self._saved_status, self.status)
+        self._saved_status = self.status
     
     def resolve(self):
         """Mark complaint as resolved."""
         self.status = 'Resolved'
         self.resolved_at = timezone.now()
         self.save()
+
+
+class Notification(models.Model):
+    """In-app notification shown to a student on their dashboard."""
+    
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    message = models.CharField(max_length=255)
+    is_read = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', 'is_read'], name='notification_unread_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.username}: {self.message}"
+
+
+class Job(models.Model):
+    """Background job queued by an admin action and run by `manage.py run_workers`."""
+    
+    STATUS_CHOICES = [
+        ('Queued', 'Queued'),
+        ('Running', 'Running'),
+        ('Succeeded', 'Succeeded'),
+        ('Failed', 'Failed'),
+    ]
+    
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    result = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while the job runs; a stale heartbeat means the worker died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Job #{self.pk} {self.name} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        """Check if the job has reached a terminal state."""
+        return self.status in ('Succeeded', 'Failed')
+
+
+class ArchivedRoomAllocation(models.Model):
+    """Ended room allocation moved out of RoomAllocation by `rollover_semester`."""
+    
+    original_id = models.BigIntegerField(unique=True)
+    semester = models.CharField(max_length=50)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_allocations')
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_allocations')
+    room_number = models.CharField(max_length=20)
+    block_name = models.CharField(max_length=50)
+    status = models.CharField(max_length=20, choices=RoomAllocation.STATUS_CHOICES)
+    applied_date = models.DateTimeField()
+    allocated_date = models.DateTimeField(null=True, blank=True)
+    ended_date = models.DateTimeField(null=True, blank=True)
+    rejection_reason = models.TextField(blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-applied_date']
+        indexes = [
+            models.Index(fields=['student', '-applied_date'], name='archived_alloc_student_idx'),
+            models.Index(fields=['semester'], name='archived_alloc_semester_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.student.username} - Room {self.room_number} ({self.semester})"
+    
+    @classmethod
+    def from_allocation(cls, allocation, semester):
+        """Build an archive row from a RoomAllocation with its room selected."""
+        return cls(
+            original_id=allocation.id,
+            semester=semester,
+            student_id=allocation.student_id,
+            room_id=allocation.room_id,
+            room_number=allocation.room.room_number,
+            block_name=allocation.room.block_name,
+            status=allocation.status,
+            applied_date=allocation.applied_date,
+            allocated_date=allocation.allocated_date,
+            ended_date=allocation.ended_date,
+            rejection_reason=allocation.rejection_reason,
+        )
+
+
+class ArchivedComplaint(models.Model):
+    """Resolved complaint moved out of Complaint by `rollover_semester`."""
+    
+    original_id = models.BigIntegerField(unique=True)
+    semester = models.CharField(max_length=50)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_complaints')
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_complaints')
+    subject = models.CharField(max_length=200)
+    description = models.TextField()
+    status = models.CharField(max_length=20, choices=Complaint.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Complaint.PRIORITY_CHOICES)
+    resolution_notes = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', '-created_at'], name='archived_complaint_student_idx'),
+            models.Index(fields=['semester'], name='archived_complaint_sem_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} - {self.student.username} ({self.semester})"
+    
+    @classmethod
+    def from_complaint(cls, complaint, semester):
+        """Build an archive row from a Complaint."""
+        return cls(
+            original_id=complaint.id,
+            semester=semester,
+            student_id=complaint.student_id,
+            room_id=complaint.room_id,
+            subject=complaint.subject,
+            description=complaint.description,
+            status=complaint.status,
+            priority=complaint.priority,
+            resolution_notes=complaint.resolution_notes,
+            created_at=complaint.created_at,
+            resolved_at=complaint.resolved_at,
+        )
+
+
+class AuditEvent(models.Model):
+    """
+    Append-only record of an allocation or complaint status change.
+
+    Events outlive the student they are about: deleting the user clears
+    `student` but keeps the row, along with the username stored on it.
+    """
+    
+    KIND_CHOICES = [
+        ('Allocation', 'Allocation'),
+        ('Complaint', 'Complaint'),
+    ]
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    student = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='audit_events')
+    username = models.CharField(max_length=150, blank=True)
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='audit_events')
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='audit_actions')
+    old_status = models.CharField(max_length=20, blank=True)
+    new_status = models.CharField(max_length=20)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['student', '-created_at'], name='audit_student_idx'),
+            models.Index(fields=['room', '-created_at'], name='audit_room_idx'),
+            models.Index(fields=['-created_at'], name='audit_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}: {self.old_status or '-'} -> {self.new_status}"
+    
+    def save(self, *args, **kwargs):
+        """Insert only; audit events are never edited."""
+        if not self._state.adding:
+            raise ValueError('Audit events are append-only.')
+        super().save(*args, **kwargs)
+
+
+class RoomOccupancySpan(models.Model):
+    """
+    Run of days over which a room's occupancy, capacity and status did not change.
+
+    Written by the daily occupancy snapshot (see hostel_app/history.py): a new
+    span starts only when something changed, so a stable room costs one row
+    per change rather than one per day. `end_date` is exclusive and NULL on
+    the room's current span.
+    """
+    
+    room = models.ForeignKey(Room, on_delete=models.CASCADE, related_name='occupancy_spans')
+    occupancy = models.PositiveSmallIntegerField()
+    capacity = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=20, choices=Room.STATUS_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['room', 'start_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['room'],
+                condition=models.Q(end_date__isnull=True),
+                name='one_open_span_per_room',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['room', 'start_date'], name='span_room_start_idx'),
+            models.Index(fields=['start_date', 'end_date'], name='span_range_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Room #{self.room_id}: {self.occupancy}/{self.capacity} from {self.start_date}"
+
+
+class OccupancyDaily(models.Model):
+    """Per-day occupancy totals for one block, floor and room type, for fast time-range reports."""
+    
+    date = models.DateField()
+    block_name = models.CharField(max_length=50)
+    floor = models.IntegerField()
+    room_type = models.CharField(max_length=20, choices=Room.ROOM_TYPE_CHOICES)
+    rooms = models.PositiveIntegerField()
+    # Beds and residents in rooms open that day; beds closed for maintenance
+    beds = models.PositiveIntegerField()
+    occupied = models.PositiveIntegerField()
+    closed_beds = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['date', 'block_name', 'floor', 'room_type']
+        verbose_name_plural = 'Daily occupancy'
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'block_name', 'floor', 'room_type'], name='occupancy_daily_unique'),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.block_name} floor {self.floor} {self.room_type}: {self.occupied}/{self.beds}"
+
+
+class Residency(models.Model):
+    """
+    One stretch of a student living in a room, kept after the allocation ends.
+
+    A stay starts when an allocation is approved and ends when it is removed,
+    rejected or deleted; a transfer ends one stay and starts another. The
+    period is [started_at, ended_at), with `ended_at` NULL while the student
+    still lives there. Rows are never deleted with allocations, rooms or users,
+    nor archived by the semester rollover: the username, room number and block
+    are stored on the row, so past residents can still be looked up by room
+    and time after either side is gone (see hostel_app/residency.py).
+    """
+    
+    student = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='residencies')
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name='residencies')
+    allocation = models.ForeignKey(
+        RoomAllocation, on_delete=models.SET_NULL, null=True, blank=True, related_name='residencies'
+    )
+    username = models.CharField(max_length=150)
+    room_number = models.CharField(max_length=20)
+    block_name = models.CharField(max_length=50)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-started_at']
+        verbose_name_plural = 'Residencies'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student'],
+                condition=models.Q(ended_at__isnull=True),
+                name='one_open_residency_per_student',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['room', 'started_at', 'ended_at'], name='residency_room_period_idx'),
+            models.Index(fields=['room_number', 'started_at'], name='residency_number_period_idx'),
+            models.Index(fields=['started_at', 'ended_at'], name='residency_period_idx'),
+            models.Index(fields=['student', 'started_at'], name='residency_student_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.username} - Room {self.room_number} from {self.started_at:%Y-%m-%d}"
+    
+    @classmethod
+    def for_allocations(cls, allocations, when, using='default'):
+        """Unsaved stays in each allocation's current room from `when`, labelled with two queries."""
+        usernames = dict(
+            User.objects.using(using).filter(pk__in={a.student_id for a in allocations}).values_list('pk', 'username')
+        )
+        rooms = Room.objects.using(using).only('room_number', 'block_name').in_bulk({a.room_id for a in allocations})
+        return [
+            cls(
+                student_id=allocation.student_id,
+                room_id=allocation.room_id,
+                allocation=allocation,
+                username=usernames[allocation.student_id],
+                room_number=rooms[allocation.room_id].room_number,
+                block_name=rooms[allocation.room_id].block_name,
+                started_at=when,
+            )
+            for allocation in allocations
+        ]
+    
+    @classmethod
+    def begin(cls, allocations, when):
+        """Start a stay in each allocation's current room at `when`."""
+        cls.objects.bulk_create(cls.for_allocations(allocations, when))
+    
+    @classmethod
+    def end(cls, allocation_ids, when):
+        """End the open stays of the given allocations at `when`."""
+        return cls.objects.filter(allocation_id__in=allocation_ids, ended_at__isnull=True).update(ended_at=when)
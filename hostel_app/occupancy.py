@@ -0,0 +1,130 @@
+"""
+Set-based maintenance of the denormalized Room.current_occupancy counter.
+
+Room.update_occupancy() fixes one room at a time. The helpers here recompute
+every room (or a given set of rooms) from approved allocations in a constant
+number of statements.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Now
+
+from .models import Room, RoomAllocation
+
+
+def _approved_count():
+    """Correlated subquery counting a room's approved allocations."""
+    return Coalesce(
+        Subquery(
+            RoomAllocation.objects.filter(room_id=OuterRef('pk'), status='Approved')
+            .order_by()
+            .values('room_id')
+            .annotate(count=Count('id'))
+            .values('count'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def _expected_status(occupancy):
+    """Mirror of the status rule in Room.update_occupancy(); Maintenance is left alone."""
+    return Case(
+        When(status='Maintenance', then=F('status')),
+        When(Q(capacity__lte=occupancy), then=Value('Full')),
+        When(status='Full', then=Value('Available')),
+        default=F('status'),
+    )
+
+
+def with_free_places(rooms):
+    """Annotate `rooms` with `free`: capacity minus approved allocations, counted from the rows."""
+    return rooms.annotate(free=F('capacity') - _approved_count())
+
+
+def find_drifted_rooms():
+    """Return rooms whose stored occupancy or status disagrees with their allocations."""
+    return list(
+        Room.objects.annotate(actual=_approved_count())
+        .annotate(expected_status=_expected_status(F('actual')))
+        .exclude(current_occupancy=F('actual'), status=F('expected_status'))
+        .order_by('block_name', 'floor', 'room_number')
+        .values('id', 'room_number', 'current_occupancy', 'actual', 'status', 'expected_status')
+    )
+
+
+_POSTGRES_RECONCILE_SQL = """
+    UPDATE {room} AS r
+    SET current_occupancy = a.actual,
+        status = CASE
+            WHEN r.status = 'Maintenance' THEN r.status
+            WHEN a.actual >= r.capacity THEN 'Full'
+            WHEN r.status = 'Full' THEN 'Available'
+            ELSE r.status
+        END,
+        updated_at = NOW()
+    FROM (
+        SELECT room.id, room.current_occupancy AS old_occupancy, room.status AS old_status,
+               COUNT(alloc.id) AS actual
+        FROM {room} AS room
+        LEFT JOIN {allocation} AS alloc
+            ON alloc.room_id = room.id AND alloc.status = 'Approved'
+        GROUP BY room.id
+    ) AS a
+    WHERE r.id = a.id
+      AND (r.current_occupancy <> a.actual
+           OR r.status <> CASE
+                WHEN r.status = 'Maintenance' THEN r.status
+                WHEN a.actual >= r.capacity THEN 'Full'
+                WHEN r.status = 'Full' THEN 'Available'
+                ELSE r.status
+              END)
+    RETURNING r.id, r.room_number, a.old_occupancy, r.current_occupancy, a.old_status, r.status
+"""
+
+
+def reconcile_occupancy():
+    """
+    Recompute occupancy and Full/Available status for every room.
+
+    On PostgreSQL this is a single UPDATE ... FROM (SELECT ... GROUP BY room_id)
+    that also returns the drifted rooms. Other databases use one SELECT to find
+    drifted rooms and one correlated UPDATE to fix them.
+
+    Returns a list of dicts describing each corrected room.
+    """
+    if connection.vendor == 'postgresql':
+        sql = _POSTGRES_RECONCILE_SQL.format(
+            room=connection.ops.quote_name(Room._meta.db_table),
+            allocation=connection.ops.quote_name(RoomAllocation._meta.db_table),
+        )
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql)
+            rows = cursor.fetchall()
+        return [
+            {
+                'id': row[0],
+                'room_number': row[1],
+                'current_occupancy': row[2],
+                'actual': row[3],
+                'status': row[4],
+                'expected_status': row[5],
+            }
+            for row in sorted(rows, key=lambda row: row[1])
+        ]
+
+    with transaction.atomic():
+        drifted = find_drifted_rooms()
+        if drifted:
+            recompute_rooms([room['id'] for room in drifted])
+    return drifted
+
+
+def recompute_rooms(room_ids):
+    """Recompute occupancy and status of the given rooms with one UPDATE; returns rows changed."""
+    return Room.objects.filter(id__in=room_ids).update(
+        current_occupancy=_approved_count(),
+        status=_expected_status(_approved_count()),
+        updated_at=Now(),
+    )
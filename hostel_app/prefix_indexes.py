@@ -0,0 +1,53 @@
+"""
+Indexes for the typeahead's case-insensitive prefix lookups.
+
+Django compiles `istartswith` to `UPPER(col::text) LIKE UPPER(%s)` on
+PostgreSQL and to `col LIKE %s ESCAPE '\\'` on SQLite, and neither can use a
+plain B-tree index on the column. `create_prefix_indexes()` (run after
+migrate) adds indexes they can use:
+
+- PostgreSQL: an expression index on `UPPER(col::text)` with
+  `text_pattern_ops`, which serves `LIKE 'ABC%'` whatever the database locale;
+- SQLite: an index on the column with `COLLATE NOCASE`, which SQLite's LIKE
+  optimisation picks up because LIKE is case-insensitive there.
+
+Meta.indexes cannot declare either one portably, so like the residency GiST
+index they are created here. Other databases get no extra indexes.
+"""
+
+from django.contrib.auth.models import User
+from django.db import connections
+
+from .models import Room, StudentProfile
+
+
+# (index name, model, column) for every column the typeahead matches with istartswith
+PREFIX_INDEXES = [
+    ('room_number_prefix_idx', Room, 'room_number'),
+    ('room_block_prefix_idx', Room, 'block_name'),
+    ('profile_name_prefix_idx', StudentProfile, 'full_name'),
+    ('profile_phone_prefix_idx', StudentProfile, 'phone_number'),
+    ('user_username_prefix_idx', User, 'username'),
+]
+
+_INDEX_SQL = {
+    'postgresql': 'CREATE INDEX IF NOT EXISTS {index} ON {table} (UPPER({column}::text) text_pattern_ops)',
+    'sqlite': 'CREATE INDEX IF NOT EXISTS {index} ON {table} ({column} COLLATE NOCASE)',
+}
+
+
+def create_prefix_indexes(using='default'):
+    """Create the prefix search indexes on PostgreSQL and SQLite; returns how many were ensured."""
+    connection = connections[using]
+    template = _INDEX_SQL.get(connection.vendor)
+    if template is None:
+        return 0
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for index, model, column in PREFIX_INDEXES:
+            cursor.execute(template.format(
+                index=quote(index),
+                table=quote(model._meta.db_table),
+                column=quote(column),
+            ))
+    return len(PREFIX_INDEXES)
@@ -0,0 +1,93 @@
+"""
+Who lived where, and when: point-in-time and overlap queries over Residency.
+
+Each stay is the half-open period [started_at, ended_at), open-ended while
+the student still lives there. On PostgreSQL the period is indexed as a
+`tstzrange` with a GiST index (created after migrate by
+`create_range_index()`), so "who was in Block B at 02:00 on 3 March" is one
+index scan however many years of stays are kept; an open stay's NULL
+`ended_at` is simply an unbounded range. Other databases use the portable
+(room, started_at, ended_at) and (started_at, ended_at) B-tree indexes.
+Blocks and room numbers are matched on the labels stored with each stay, so
+stays in rooms deleted since are still found.
+"""
+
+from django.db import connections
+from django.db.models import BooleanField, Exists, OuterRef, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import RoomAllocation, Residency
+
+
+RANGE_INDEX_NAME = 'residency_period_gist'
+
+_RANGE_INDEX_SQL = 'CREATE INDEX IF NOT EXISTS {index} ON {table} USING gist (tstzrange(started_at, ended_at))'
+
+
+def _period(connection):
+    """SQL for a stay's period as a range, matching the GiST index expression."""
+    table = connection.ops.quote_name(Residency._meta.db_table)
+    return f'tstzrange({table}.started_at, {table}.ended_at)'
+
+
+def _overlapping(stays, start, end):
+    """Filter `stays` to those overlapping [start, end), or covering `start` when `end` is None."""
+    connection = connections[stays.db]
+    if connection.vendor == 'postgresql':
+        if end is None:
+            return stays.filter(RawSQL(f'{_period(connection)} @> %s', [start], output_field=BooleanField()))
+        return stays.filter(RawSQL(f'{_period(connection)} && tstzrange(%s, %s)', [start, end], output_field=BooleanField()))
+
+    stays = stays.filter(started_at__lte=start) if end is None else stays.filter(started_at__lt=end)
+    return stays.filter(Q(ended_at__isnull=True) | Q(ended_at__gt=start))
+
+
+def _stays(rooms=None, block_name=None, room_number=None):
+    """Stays with their student and room, optionally limited to `rooms`, a block or a room number."""
+    stays = Residency.objects.select_related('student__student_profile', 'room')
+    if rooms is not None:
+        stays = stays.filter(room__in=rooms)
+    if block_name:
+        stays = stays.filter(block_name=block_name)
+    if room_number:
+        stays = stays.filter(room_number=room_number)
+    return stays
+
+
+def residents_at(when, rooms=None, block_name=None, room_number=None):
+    """Stays covering the instant `when`, optionally limited to `rooms`, a block or a room number."""
+    return _overlapping(_stays(rooms, block_name, room_number), when, None).order_by('room_number', 'started_at')
+
+
+def residents_during(start, end, rooms=None, block_name=None, room_number=None):
+    """Stays overlapping [start, end), e.g. everyone in a block at any time during one night."""
+    return _overlapping(_stays(rooms, block_name, room_number), start, end).order_by('room_number', 'started_at')
+
+
+def create_range_index(using='default'):
+    """Create the GiST index on the stays' period on PostgreSQL; a no-op elsewhere."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(_RANGE_INDEX_SQL.format(
+            index=connection.ops.quote_name(RANGE_INDEX_NAME),
+            table=connection.ops.quote_name(Residency._meta.db_table),
+        ))
+    return True
+
+
+def backfill(using='default'):
+    """Open stays for approved allocations that predate residency tracking; returns how many."""
+    missing = list(
+        RoomAllocation.objects.using(using)
+        .filter(status='Approved')
+        .exclude(Exists(Residency.objects.filter(student_id=OuterRef('student_id'), ended_at__isnull=True)))
+    )
+    now = timezone.now()
+    stays = Residency.for_allocations(missing, now, using)
+    for stay in stays:
+        stay.started_at = stay.allocation.allocated_date or now
+    Residency.objects.using(using).bulk_create(stays)
+    return len(missing)
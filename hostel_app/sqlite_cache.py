@@ -0,0 +1,207 @@
+"""
+Cache backend shared by every worker process on one host.
+
+Entries live in a single SQLite file opened in WAL mode, so the gunicorn
+workers of a host, and any job worker started on the same host, see the same
+values (and they survive restarts) without a separate cache server. Processes
+on other hosts, such as the separate run_workers service on Render, open a
+file of their own and never see these entries. Integers are stored as native SQLite integers, which
+lets `incr()` run as one atomic UPDATE. When the entry count passes
+MAX_ENTRIES, expired entries are dropped first and then the least recently
+used ones. The count is only checked every CULL_INTERVAL writes on a
+connection (default: MAX_ENTRIES / 50, at most 100), so most writes skip the
+index scan and the table can briefly overshoot by that many entries per
+connection.
+
+Requires SQLite 3.35+ (UPSERT and RETURNING).
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'hostel_app.sqlite_cache.SQLiteCache',
+            'LOCATION': '/tmp/hostel_cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 5000, 'CULL_FREQUENCY': 3, 'CULL_INTERVAL': 100},
+        }
+    }
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+# Reads refresh an entry's LRU timestamp at most this often (seconds), so
+# hot keys don't turn every read into a write.
+LRU_RESOLUTION = 1.0
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache_entry (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires REAL,
+        accessed REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS cache_entry_accessed ON cache_entry (accessed);
+    CREATE INDEX IF NOT EXISTS cache_entry_expires ON cache_entry (expires);
+"""
+
+# Entries with a NULL expiry never expire.
+_LIVE = '(expires IS NULL OR expires > ?)'
+
+
+class SQLiteCache(BaseCache):
+    """Django cache backend storing entries in a shared SQLite file."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        options = params.get('OPTIONS', {})
+        self._cull_interval = max(int(options.get('CULL_INTERVAL', min(100, self._max_entries // 50))), 1)
+
+    # ==================== Connection ====================
+
+    def _connection(self):
+        """Per-thread connection, reopened after a fork (e.g. gunicorn preload)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.writes = 0
+        return conn
+
+    # ==================== Encoding ====================
+
+    @staticmethod
+    def _encode(value):
+        # bool is an int subclass but must round-trip as bool
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        return value if isinstance(value, int) else pickle.loads(value)
+
+    # ==================== Cache API ====================
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._connection().execute(
+            """
+            INSERT INTO cache_entry (key, value, expires, accessed) VALUES (?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE
+                SET value = excluded.value, expires = excluded.expires, accessed = excluded.accessed
+                WHERE cache_entry.expires <= excluded.accessed
+            """,
+            (key, self._encode(value), self.get_backend_timeout(timeout), now),
+        )
+        added = cursor.rowcount == 1
+        if added:
+            self._cull()
+        return added
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            f'SELECT value, accessed FROM cache_entry WHERE key = ? AND {_LIVE}', (key, now)
+        ).fetchone()
+        if row is None:
+            return default
+        if now - row[1] > LRU_RESOLUTION:
+            conn.execute('UPDATE cache_entry SET accessed = ? WHERE key = ?', (now, key))
+        return self._decode(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cache_entry (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+            (key, self._encode(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        self._cull()
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._connection().execute(
+            f'UPDATE cache_entry SET expires = ?, accessed = ? WHERE key = ? AND {_LIVE}',
+            (self.get_backend_timeout(timeout), now, key, now),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute('DELETE FROM cache_entry WHERE key = ?', (key,))
+        return cursor.rowcount == 1
+
+    def delete_if_equal(self, key, value, version=None):
+        """Atomically delete `key` only while it still holds `value`; returns whether it did."""
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute(
+            'DELETE FROM cache_entry WHERE key = ? AND value = ?', (key, self._encode(value))
+        )
+        return cursor.rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            f'SELECT 1 FROM cache_entry WHERE key = ? AND {_LIVE}', (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def incr(self, key, delta=1, version=None):
+        """Atomically add `delta` to an integer entry; raise ValueError if it is missing."""
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        # fetchall() steps the statement to completion so the write lock is released
+        rows = self._connection().execute(
+            f"""
+            UPDATE cache_entry SET value = value + ?, accessed = ?
+            WHERE key = ? AND typeof(value) = 'integer' AND {_LIVE}
+            RETURNING value
+            """,
+            (delta, now, key, now),
+        ).fetchall()
+        if not rows:
+            raise ValueError("Key '%s' not found" % key)
+        return rows[0][0]
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entry')
+
+    # ==================== Eviction ====================
+
+    def _cull(self):
+        """Drop expired entries, then least recently used ones, once over MAX_ENTRIES."""
+        conn = self._connection()
+        self._local.writes += 1
+        if self._local.writes % self._cull_interval:
+            return
+        count = conn.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        conn.execute('DELETE FROM cache_entry WHERE expires <= ?', (time.time(),))
+        count = conn.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            self.clear()
+            return
+        conn.execute(
+            'DELETE FROM cache_entry WHERE key IN '
+            '(SELECT key FROM cache_entry ORDER BY accessed LIMIT ?)',
+            (count // self._cull_frequency,),
+        )
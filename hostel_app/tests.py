@@ -2,10 +2,20 @@
 Tests for the Hostel Management System models and views.
 """
 
-from django.test import TestCase, Client
+from datetime import date, timedelta
+from unittest import skipUnless
+
+from django.test import TestCase, TransactionTestCase, Client
 from django.contrib.auth.models import User
+from django.db import connection
 from django.urls import reverse
-from hostel_app.models import StudentProfile, Room, RoomAllocation, Complaint
+from django.utils import timezone
+from hostel_app import admission, analytics, audit, evacuation, history, jobs, residency, transfers
+from hostel_app.occupancy import find_drifted_rooms, reconcile_occupancy
+from hostel_app.models import (
+    StudentProfile, Room, RoomAllocation, Complaint, Notification, Job,
+    ArchivedRoomAllocation, ArchivedComplaint, AuditEvent, RoomOccupancySpan, OccupancyDaily, Residency
+)
 
 
 class StudentProfileTests(TestCase):
@@ -226,7 +236,9 @@ class AuthenticationTests(TestCase):
     """Tests for authentication views."""
 
     def setUp(self):
-        """Setup test client."""
+        """Setup test client with empty throttle buckets."""
+        from django.core.cache import cache
+        cache.clear()
         self.client = Client()
         self.register_url = reverse('register')
         self.login_url = reverse('login')
@@ -274,3 +286,1705 @@ class AuthenticationTests(TestCase):
         response = self.client.get(self.dashboard_url)
 
         self.assertEqual(response.status_code, 200)
+
+
+class AdminChangelistTests(TestCase):
+    """Tests for the Django admin changelists."""
+
+    def setUp(self):
+        """Create an admin user and log in."""
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.login(username='admin', password='adminpass123')
+
+    def _create_allocations(self, count):
+        for i in range(count):
+            user = User.objects.create_user(username=f'student{Room.objects.count()}', password='testpass123')
+            StudentProfile.objects.create(
+                user=user, full_name=f'Student {user.pk}', department='CSE', year=1,
+                phone_number='9876543210', address='Test Address', guardian_name='Guardian'
+            )
+            room = Room.objects.create(
+                room_number=f'R{user.pk}', block_name='Block A', floor=1, capacity=2, room_type='Double'
+            )
+            RoomAllocation.objects.create(student=user, room=room)
+            Complaint.objects.create(student=user, room=room, subject='Fan', description='Broken')
+
+    def _count_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelist_query_count_is_constant(self):
+        """Test changelist queries do not grow with the number of rows."""
+        urls = [
+            reverse('admin:hostel_app_roomallocation_changelist'),
+            reverse('admin:hostel_app_complaint_changelist'),
+            reverse('admin:hostel_app_studentprofile_changelist'),
+        ]
+        self._create_allocations(2)
+        self.client.get(urls[0])  # warm the cached navbar count
+        small = [self._count_queries(url) for url in urls]
+        self._create_allocations(10)
+        large = [self._count_queries(url) for url in urls]
+        self.assertEqual(small, large)
+
+    def test_allocation_str_uses_profile_name(self):
+        """Test string representation of RoomAllocation."""
+        self._create_allocations(1)
+        allocation = RoomAllocation.objects.select_related('student__student_profile', 'room').get()
+        self.assertTrue(str(allocation).startswith('Student '))
+
+    def test_search_matches_substrings_and_descriptions(self):
+        """Test admin search finds text anywhere in a field, including complaint descriptions."""
+        self._create_allocations(1)
+        url = reverse('admin:hostel_app_complaint_changelist')
+        for term in ('roke', 'an', 'udent'):
+            response = self.client.get(url, {'q': term})
+            self.assertEqual(response.context['cl'].result_count, 1, term)
+        response = self.client.get(reverse('admin:hostel_app_room_changelist'), {'q': 'lock'})
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_every_search_field_has_a_trigram_index(self):
+        """Test each column reached by an admin search is listed for a trigram index, and created where pg_trgm is."""
+        from django.contrib import admin
+        from hostel_app.trigram_indexes import TRIGRAM_INDEXES, enable_trigrams
+        indexed = {(model._meta.db_table, column) for _, model, column in TRIGRAM_INDEXES}
+        for model, model_admin in admin.site._registry.items():
+            if model._meta.app_label != 'hostel_app':
+                continue
+            for path in model_admin.search_fields:
+                *relations, column = path.split('__')
+                target = model
+                for name in relations:
+                    target = target._meta.get_field(name).related_model
+                self.assertIn((target._meta.db_table, column), indexed, f'{model.__name__}: {path}')
+
+        if enable_trigrams():
+            with connection.cursor() as cursor:
+                for index, model, _ in TRIGRAM_INDEXES:
+                    self.assertIn(index, connection.introspection.get_constraints(cursor, model._meta.db_table))
+
+
+class WaitlistTests(TestCase):
+    """Tests for the per-room waitlist."""
+
+    def setUp(self):
+        """Create a full single room and two students."""
+        self.room = Room.objects.create(
+            room_number='A101', block_name='Block A', floor=1, capacity=1, room_type='Single'
+        )
+        self.resident = User.objects.create_user(username='resident', password='testpass123')
+        self.waiting = User.objects.create_user(username='waiting', password='testpass123')
+        self.allocation = RoomAllocation.objects.create(student=self.resident, room=self.room)
+        self.allocation.approve()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+
+    def test_apply_to_full_room_joins_waitlist(self):
+        """Test applying to a full room creates a waitlisted application."""
+        self.client.login(username='waiting', password='testpass123')
+        self.client.post(reverse('apply_room', args=[self.room.id]))
+
+        allocation = RoomAllocation.objects.get(student=self.waiting)
+        self.assertEqual(allocation.status, 'Waitlisted')
+        self.assertEqual(allocation.waitlist_position, 1)
+
+    def test_remove_allocation_promotes_waitlist(self):
+        """Test freeing a slot promotes the oldest waitlisted application."""
+        waitlisted = RoomAllocation.objects.create(student=self.waiting, room=self.room, status='Waitlisted')
+        self.client.login(username='admin', password='adminpass123')
+        self.client.post(reverse('remove_allocation', args=[self.allocation.id]))
+
+        waitlisted.refresh_from_db()
+        self.assertEqual(waitlisted.status, 'Pending')
+        self.assertTrue(Notification.objects.filter(student=self.waiting, is_read=False).exists())
+
+    def test_no_promotion_while_room_is_full(self):
+        """Test waitlisted applications stay queued while the room is full."""
+        waitlisted = RoomAllocation.objects.create(student=self.waiting, room=self.room, status='Waitlisted')
+        self.assertEqual(self.room.promote_waitlist(), [])
+        waitlisted.refresh_from_db()
+        self.assertEqual(waitlisted.status, 'Waitlisted')
+
+
+class JobQueueTests(TestCase):
+    """Tests for the background job queue."""
+
+    def setUp(self):
+        """Create an admin user and a room."""
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.room = Room.objects.create(
+            room_number='A101', block_name='Block A', floor=1, capacity=2,
+            current_occupancy=2, room_type='Double', status='Full'
+        )
+
+    def test_admin_action_returns_job(self):
+        """Test queuing a job from an admin view redirects to its status page."""
+        self.client.login(username='admin', password='adminpass123')
+        response = self.client.post(reverse('recompute_occupancy'))
+
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse('job_status', args=[job.id]))
+        self.assertEqual(job.status, 'Queued')
+
+    def test_worker_runs_job(self):
+        """Test a claimed job runs and records its result."""
+        job = jobs.enqueue('recompute_occupancy')
+        claimed = jobs.claim_next_job('test')
+        self.assertEqual(claimed.id, job.id)
+        self.assertIsNone(jobs.claim_next_job('other'))
+
+        jobs.run_job(claimed)
+        self.room.refresh_from_db()
+        self.assertEqual(claimed.status, 'Succeeded')
+        self.assertEqual(self.room.current_occupancy, 0)
+        self.assertEqual(self.room.status, 'Available')
+
+    def test_failed_job_is_retried_with_backoff(self):
+        """Test a failing job is requeued until it runs out of attempts."""
+        jobs.TASKS['always_fails'] = lambda payload: 1 / 0
+        self.addCleanup(jobs.TASKS.pop, 'always_fails')
+        job = jobs.enqueue('always_fails', max_attempts=2)
+
+        jobs.run_job(jobs.claim_next_job('test'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'Queued')
+        self.assertGreater(job.run_after, job.created_at)
+
+        Job.objects.filter(id=job.id).update(run_after=job.created_at)
+        jobs.run_job(jobs.claim_next_job('test'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'Failed')
+        self.assertIn('ZeroDivisionError', job.error)
+
+    def test_bulk_approve_respects_capacity(self):
+        """Test bulk approval stops at the room's capacity instead of reading a stale room."""
+        room = Room.objects.create(room_number='B101', block_name='Block B', floor=1, capacity=1, room_type='Single')
+        for name in ('alice', 'bob', 'carol'):
+            student = User.objects.create_user(username=name, password='testpass123')
+            RoomAllocation.objects.create(student=student, room=room)
+
+        result = jobs.bulk_approve_applications({'search': 'B101'})
+
+        room.refresh_from_db()
+        self.assertEqual((room.current_occupancy, room.status), (1, 'Full'))
+        self.assertEqual(RoomAllocation.objects.filter(room=room, status='Approved').count(), 1)
+        self.assertIn('2 skipped', result)
+
+    def test_stale_job_requeue_counts_attempt(self):
+        """Test a job whose worker died is requeued once per lost run, then failed."""
+        job = jobs.enqueue('recompute_occupancy', max_attempts=2)
+        long_ago = timezone.now() - timedelta(hours=1)
+
+        for expected in ((1, 0), (0, 1)):
+            Job.objects.filter(id=job.id).update(status='Running', started_at=long_ago, heartbeat_at=long_ago)
+            self.assertEqual(jobs.requeue_stale_jobs(timedelta(minutes=10)), expected)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('Failed', 2))
+
+    def test_long_job_with_heartbeat_is_not_requeued(self):
+        """Test a job running longer than the stale limit stays put while its heartbeat is fresh."""
+        job = jobs.enqueue('recompute_occupancy')
+        Job.objects.filter(id=job.id).update(
+            status='Running', started_at=timezone.now() - timedelta(hours=1), heartbeat_at=timezone.now(),
+        )
+        self.assertEqual(jobs.requeue_stale_jobs(timedelta(minutes=10)), (0, 0))
+
+
+class JobWorkerTests(TransactionTestCase):
+    """Tests for the worker loop and job heartbeats (they open and close their own connections)."""
+
+    def test_heartbeat_refreshes_running_job(self):
+        """Test the heartbeat thread moves heartbeat_at forward while the block runs."""
+        import time
+        job = jobs.enqueue('recompute_occupancy')
+        long_ago = timezone.now() - timedelta(hours=1)
+        Job.objects.filter(id=job.id).update(status='Running', started_at=long_ago, heartbeat_at=long_ago)
+
+        beat = Job.objects.filter(id=job.id, heartbeat_at__gt=long_ago)
+        with jobs.heartbeat(job, interval=0.05):
+            deadline = time.monotonic() + 5
+            while not beat.exists() and time.monotonic() < deadline:
+                time.sleep(0.05)
+        self.assertTrue(beat.exists())
+        self.assertEqual(jobs.requeue_stale_jobs(timedelta(minutes=10)), (0, 0))
+
+    def test_worker_survives_database_errors(self):
+        """Test a failed claim is logged and the worker keeps looping instead of dying."""
+        import threading
+        from unittest import mock
+        from django.db import OperationalError
+        job = jobs.enqueue('recompute_occupancy')
+        claims = [OperationalError('connection lost'), jobs.claim_next_job('test'), None]
+
+        with mock.patch.object(jobs, 'claim_next_job', side_effect=claims), self.assertLogs('hostel_app.jobs', 'ERROR'):
+            jobs.work('test', threading.Event(), poll_interval=0, burst=True)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'Succeeded')
+
+
+class ApplyRoomTests(TestCase):
+    """Tests for the apply_room view."""
+
+    def setUp(self):
+        """Create a student and two rooms."""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.other_room = Room.objects.create(room_number='A102', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.client.login(username='testuser', password='testpass123')
+
+    def test_retry_with_same_key_is_idempotent(self):
+        """Test a resubmitted form returns the original application."""
+        url = reverse('apply_room', args=[self.room.id])
+        first = self.client.post(url, {'idempotency_key': 'abc123'})
+        second = self.client.post(url, {'idempotency_key': 'abc123'})
+
+        self.assertEqual(RoomAllocation.objects.filter(student=self.user).count(), 1)
+        self.assertRedirects(first, reverse('student_dashboard'), fetch_redirect_response=False)
+        self.assertRedirects(second, reverse('student_dashboard'), fetch_redirect_response=False)
+
+    def test_one_active_application_per_student(self):
+        """Test a second active application is refused."""
+        self.client.post(reverse('apply_room', args=[self.room.id]), {'idempotency_key': 'first'})
+        response = self.client.post(reverse('apply_room', args=[self.other_room.id]), {'idempotency_key': 'second'})
+
+        self.assertRedirects(response, reverse('room_list'), fetch_redirect_response=False)
+        self.assertEqual(RoomAllocation.objects.filter(student=self.user).count(), 1)
+
+    def test_active_application_constraint(self):
+        """Test the database rejects two active applications for one student."""
+        from django.db import IntegrityError
+        RoomAllocation.objects.create(student=self.user, room=self.room)
+        with self.assertRaises(IntegrityError):
+            RoomAllocation.objects.create(student=self.user, room=self.other_room)
+
+
+class SemesterRolloverTests(TestCase):
+    """Tests for the rollover_semester command."""
+
+    def setUp(self):
+        """Create live and finished records."""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.other_room = Room.objects.create(room_number='A102', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        RoomAllocation.objects.create(student=self.user, room=self.room, status='Rejected')
+        RoomAllocation.objects.create(student=self.user, room=self.other_room, status='Approved')
+        Complaint.objects.create(student=self.user, subject='Fan', description='Broken', status='Resolved')
+        Complaint.objects.create(student=self.user, subject='WiFi', description='Slow', status='Pending')
+
+    def test_rollover_moves_finished_rows(self):
+        """Test finished rows move to the archive tables in batches."""
+        from django.core.management import call_command
+        from io import StringIO
+        call_command('rollover_semester', semester='2026 Spring', batch_size=1, stdout=StringIO())
+
+        self.assertEqual(list(RoomAllocation.objects.values_list('status', flat=True)), ['Approved'])
+        self.assertEqual(list(Complaint.objects.values_list('status', flat=True)), ['Pending'])
+        archived = ArchivedRoomAllocation.objects.get()
+        self.assertEqual((archived.room_number, archived.semester), ('A101', '2026 Spring'))
+        self.assertEqual(ArchivedComplaint.objects.get().subject, 'Fan')
+
+    def test_archive_conflict_keeps_live_rows(self):
+        """Test a row already in the archive stops the rollover without deleting the live row."""
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from io import StringIO
+        complaint = Complaint.objects.get(status='Resolved')
+        ArchivedComplaint.from_complaint(complaint, '2025 Fall').save()
+
+        with self.assertRaises(CommandError):
+            call_command('rollover_semester', semester='2026 Spring', stdout=StringIO())
+        self.assertTrue(Complaint.objects.filter(id=complaint.id).exists())
+        self.assertEqual(ArchivedComplaint.objects.get().semester, '2025 Fall')
+
+    def test_student_detail_shows_archived_history(self):
+        """Test archived records are shown on request."""
+        from django.core.management import call_command
+        from io import StringIO
+        call_command('rollover_semester', semester='2026 Spring', stdout=StringIO())
+        StudentProfile.objects.create(
+            user=self.user, full_name='Test Student', department='CSE', year=1,
+            phone_number='9876543210', address='Test Address', guardian_name='Guardian'
+        )
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.login(username='admin', password='adminpass123')
+
+        url = reverse('student_detail', args=[self.user.id])
+        self.assertNotContains(self.client.get(url), '2026 Spring')
+        self.assertContains(self.client.get(url, {'history': '1'}), '2026 Spring')
+
+
+class PendingCountTests(TestCase):
+    """Tests for the cached navbar pending-applications count."""
+
+    def setUp(self):
+        """Create an admin, a student and a room with an empty cache."""
+        from django.core.cache import cache
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.client.login(username='admin', password='adminpass123')
+
+    def test_counter_follows_transitions(self):
+        """Test the counter is updated incrementally on create and approve."""
+        from hostel_app.counters import get_pending_count
+        self.assertEqual(get_pending_count(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            allocation = RoomAllocation.objects.create(student=self.user, room=self.room)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pending_count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RoomAllocation.objects.get(id=allocation.id).approve()
+        self.assertEqual(get_pending_count(), 0)
+
+    def test_navbar_badge(self):
+        """Test admin pages render the pending badge."""
+        RoomAllocation.objects.create(student=self.user, room=self.room)
+        response = self.client.get(reverse('manage_rooms'))
+        self.assertEqual(response.context['pending_count'], 1)
+
+    def test_counter_follows_cascade_deletes(self):
+        """Test pending applications removed with their user or room leave the count."""
+        from hostel_app.counters import get_pending_count
+        other = User.objects.create_user(username='other', password='testpass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            RoomAllocation.objects.create(student=self.user, room=self.room)
+            RoomAllocation.objects.create(student=other, room=self.room)
+        self.assertEqual(get_pending_count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(get_pending_count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.delete()
+        self.assertEqual(get_pending_count(), 0)
+
+    def test_finished_job_rebuilds_count(self):
+        """Test viewing a finished bulk approval drops a count the worker host could not update."""
+        from unittest import mock
+        from django.core.cache import cache
+        from hostel_app.counters import PENDING_APPLICATIONS_KEY, get_pending_count
+        RoomAllocation.objects.create(student=self.user, room=self.room)
+        self.assertEqual(get_pending_count(), 1)
+
+        # The worker's updates go to its own host's cache, not this one
+        job = jobs.enqueue('bulk_approve_applications', {'search': ''}, user=self.admin)
+        with mock.patch.object(cache, 'decr'), self.captureOnCommitCallbacks(execute=True):
+            jobs.run_job(job)
+        self.assertEqual(cache.get(PENDING_APPLICATIONS_KEY), 1)
+
+        self.client.get(reverse('job_status', args=[job.id]))
+        self.assertEqual(get_pending_count(), 0)
+
+
+class TypeaheadTests(TestCase):
+    """Tests for the typeahead search endpoint."""
+
+    def setUp(self):
+        """Create rooms, a student and an admin."""
+        from django.core.cache import cache
+        cache.clear()
+        for i in range(12):
+            Room.objects.create(room_number=f'B{100 + i}', block_name='Block B', floor=1, capacity=2, room_type='Double')
+        Room.objects.create(room_number='C101', block_name='Block C', floor=1, capacity=2, room_type='Double', status='Maintenance')
+        self.user = User.objects.create_user(username='jdoe', password='testpass123')
+        StudentProfile.objects.create(
+            user=self.user, full_name='John Doe', department='CSE', year=1,
+            phone_number='9876543210', address='Test Address', guardian_name='Guardian'
+        )
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+
+    def test_room_results_are_bounded_and_cached(self):
+        """Test room suggestions are limited and served from cache on repeat."""
+        self.client.login(username='jdoe', password='testpass123')
+        url = reverse('typeahead')
+        response = self.client.get(url, {'scope': 'rooms', 'q': 'b1'})
+        self.assertEqual(len(response.json()['results']), 8)
+
+        self.client.get(url, {'scope': 'rooms', 'q': 'B1'})
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, {'scope': 'rooms', 'q': 'b1'})
+        self.assertFalse([q for q in ctx.captured_queries if 'hostel_app_room' in q['sql']])
+
+    def test_students_hide_maintenance_rooms(self):
+        """Test students do not see rooms under maintenance."""
+        self.client.login(username='jdoe', password='testpass123')
+        response = self.client.get(reverse('typeahead'), {'scope': 'rooms', 'q': 'C'})
+        self.assertEqual(response.json()['results'], [])
+
+    def test_student_scope_is_admin_only(self):
+        """Test student search matches name, username and phone for admins only."""
+        self.client.login(username='jdoe', password='testpass123')
+        self.assertEqual(self.client.get(reverse('typeahead'), {'scope': 'students', 'q': 'jo'}).status_code, 400)
+
+        self.client.login(username='admin', password='adminpass123')
+        for query in ('Jo', 'jd', '98765'):
+            results = self.client.get(reverse('typeahead'), {'scope': 'students', 'q': query}).json()['results']
+            self.assertEqual([r['label'] for r in results], ['John Doe'])
+
+    def test_query_with_spaces_is_a_safe_cache_key(self):
+        """Test queries with spaces are cached without cache key warnings."""
+        import warnings
+        from django.core.cache.backends.base import CacheKeyWarning
+        self.client.login(username='admin', password='adminpass123')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            response = self.client.get(reverse('typeahead'), {'scope': 'rooms', 'q': 'Block C'})
+        self.assertEqual([r['label'] for r in response.json()['results']], ['Room C101'])
+
+    @skipUnless(connection.vendor in ('postgresql', 'sqlite'), 'Prefix indexes are created on PostgreSQL and SQLite only')
+    def test_prefix_indexes_exist(self):
+        """Test every column searched by prefix has its index after migrate."""
+        from hostel_app.prefix_indexes import PREFIX_INDEXES
+        with connection.cursor() as cursor:
+            for index, model, column in PREFIX_INDEXES:
+                self.assertIn(index, connection.introspection.get_constraints(cursor, model._meta.db_table))
+
+
+class AjaxActionTests(TestCase):
+    """Tests for XHR mode of the admin row actions."""
+
+    XHR = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+    def setUp(self):
+        """Create an admin, a student, a room and a pending application."""
+        from django.core.cache import cache
+        cache.clear()
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.allocation = RoomAllocation.objects.create(student=self.user, room=self.room)
+        self.client.login(username='admin', password='adminpass123')
+
+    def test_approve_returns_row_fragment(self):
+        """Test approving over XHR returns the updated row and counters."""
+        response = self.client.post(reverse('approve_application', args=[self.allocation.id]), **self.XHR)
+        data = response.json()
+
+        self.assertTrue(data['ok'])
+        self.assertIn(f'id="application-row-{self.allocation.id}"', data['html'])
+        self.assertIn('Approved', data['html'])
+        self.assertNotIn('<html', data['html'])
+        self.assertEqual(data['counters']['pending_count'], 0)
+
+    def test_reject_reads_json_body(self):
+        """Test the rejection reason is read from a JSON body."""
+        response = self.client.post(
+            reverse('reject_application', args=[self.allocation.id]),
+            data='{"reason": "Not eligible"}', content_type='application/json', **self.XHR
+        )
+        self.assertTrue(response.json()['ok'])
+        self.allocation.refresh_from_db()
+        self.assertEqual(self.allocation.rejection_reason, 'Not eligible')
+
+    def test_delete_room_reports_removal(self):
+        """Test deleting a room over XHR reports the row as removed."""
+        response = self.client.post(reverse('delete_room', args=[self.room.id]), **self.XHR)
+        self.assertTrue(response.json()['removed'])
+        self.assertFalse(Room.objects.exists())
+
+    def test_complaint_modal_and_update(self):
+        """Test complaint_detail serves a modal and returns the updated row."""
+        complaint = Complaint.objects.create(student=self.user, subject='Fan', description='Broken')
+        url = reverse('complaint_detail', args=[complaint.id])
+
+        self.assertIn(f'complaintModal{complaint.id}', self.client.get(url, **self.XHR).json()['modal'])
+
+        response = self.client.post(url, {'status': 'In Progress', 'resolution_notes': 'On it'}, **self.XHR)
+        self.assertIn('In Progress', response.json()['html'])
+
+    def test_plain_post_still_redirects(self):
+        """Test non-XHR actions keep the redirect flow."""
+        response = self.client.post(reverse('approve_application', args=[self.allocation.id]))
+        self.assertRedirects(response, reverse('manage_applications'), fetch_redirect_response=False)
+
+
+class AjaxCounterTests(TransactionTestCase):
+    """Tests for XHR counters after real commits (on_commit updates need committed transactions)."""
+
+    def test_remove_approved_allocation_counts_promotion(self):
+        """Test the counters sent back include the waitlisted application promoted to Pending."""
+        from django.core.cache import cache
+        cache.clear()
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        resident = User.objects.create_user(username='resident', password='testpass123')
+        waiting = User.objects.create_user(username='waiting', password='testpass123')
+        room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=1, room_type='Single')
+        allocation = RoomAllocation.objects.create(student=resident, room=room)
+        allocation.approve()
+        RoomAllocation.objects.create(student=waiting, room=room, status='Waitlisted')
+        self.client.login(username='admin', password='adminpass123')
+        self.assertEqual(self.client.get(reverse('admin_dashboard')).status_code, 200)
+
+        response = self.client.post(
+            reverse('remove_allocation', args=[allocation.id]), HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.json()['counters']['pending_count'], 1)
+
+
+class BlockGeneratorTests(TestCase):
+    """Tests for the bulk block generator."""
+
+    def _form(self, **overrides):
+        from hostel_app.forms import BlockGeneratorForm
+        data = {
+            'block_name': 'Block D', 'prefix': 'D', 'first_floor': 1, 'last_floor': 6,
+            'rooms_per_floor': 40, 'numbering_pattern': '{prefix}{floor}{room:02d}',
+            'capacity': 2, 'room_type': 'Double', 'amenities': 'WiFi, Fan',
+        }
+        data.update(overrides)
+        return BlockGeneratorForm(data=data)
+
+    def test_generates_whole_block(self):
+        """Test a 6-floor, 40-room block is created in one step."""
+        form = self._form()
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        self.assertEqual(Room.objects.filter(block_name='Block D').count(), 240)
+        room = Room.objects.get(room_number='D640')
+        self.assertEqual((room.floor, room.capacity, room.status), (6, 2, 'Available'))
+
+    def test_rejects_existing_room_numbers(self):
+        """Test room numbers are validated against existing rooms as a set."""
+        Room.objects.create(room_number='D105', block_name='Block D', floor=1, capacity=2, room_type='Double')
+        form = self._form()
+        self.assertFalse(form.is_valid())
+        self.assertIn('D105', str(form.errors))
+
+    def test_rejects_duplicate_pattern(self):
+        """Test a pattern that ignores the room position is rejected."""
+        self.assertFalse(self._form(numbering_pattern='{prefix}{floor}').is_valid())
+        self.assertFalse(self._form(numbering_pattern='{unknown}').is_valid())
+
+    def test_rejects_unsafe_pattern(self):
+        """Test indexing, attribute access, positional fields and huge widths are refused."""
+        for pattern in ('{room[0]}', '{room.real}', '{0}', '{}', '{room:>999999999}', '{room:{floor}}', '{room'):
+            form = self._form(numbering_pattern=pattern)
+            self.assertFalse(form.is_valid(), pattern)
+            self.assertIn('numbering_pattern', form.errors, pattern)
+
+
+class OccupancyReconcileTests(TestCase):
+    """Tests for set-based occupancy reconciliation."""
+
+    def setUp(self):
+        """Create a consistent room and a drifted one."""
+        self.student = User.objects.create_user(username='student1', password='testpass123')
+        self.ok_room = Room.objects.create(
+            room_number='A101', block_name='Block A', floor=1, capacity=2,
+            current_occupancy=1, room_type='Double', status='Available'
+        )
+        RoomAllocation.objects.create(student=self.student, room=self.ok_room, status='Approved')
+        self.drifted_room = Room.objects.create(
+            room_number='A102', block_name='Block A', floor=1, capacity=2,
+            current_occupancy=2, room_type='Double', status='Full'
+        )
+
+    def test_find_drifted_rooms(self):
+        """Test only rooms disagreeing with their allocations are reported."""
+        drifted = find_drifted_rooms()
+        self.assertEqual([room['room_number'] for room in drifted], ['A102'])
+        self.assertEqual(drifted[0]['actual'], 0)
+        self.assertEqual(drifted[0]['expected_status'], 'Available')
+
+    def test_reconcile_fixes_drift(self):
+        """Test reconciliation corrects occupancy and status in bulk."""
+        fixed = reconcile_occupancy()
+        self.drifted_room.refresh_from_db()
+        self.assertEqual(len(fixed), 1)
+        self.assertEqual(self.drifted_room.current_occupancy, 0)
+        self.assertEqual(self.drifted_room.status, 'Available')
+        self.assertEqual(find_drifted_rooms(), [])
+
+    def test_reconcile_keeps_maintenance_rooms_closed(self):
+        """Test a full room closed for maintenance is not reopened as Full or reported as drift."""
+        self.drifted_room.delete()
+        other = User.objects.create_user(username='student2', password='testpass123')
+        RoomAllocation.objects.create(student=other, room=self.ok_room, status='Approved')
+        Room.objects.filter(pk=self.ok_room.pk).update(current_occupancy=2, status='Maintenance')
+
+        self.assertEqual(find_drifted_rooms(), [])
+        self.assertEqual(reconcile_occupancy(), [])
+        self.ok_room.refresh_from_db()
+        self.assertEqual(self.ok_room.status, 'Maintenance')
+
+        self.ok_room.update_occupancy()
+        self.assertEqual(self.ok_room.status, 'Maintenance')
+
+    @skipUnless(connection.vendor == 'postgresql', 'UPDATE ... FROM ... RETURNING path is PostgreSQL-only')
+    def test_postgres_reconcile_matches_portable_rule(self):
+        """Test the single-statement PostgreSQL reconcile fixes exactly what the portable query reports."""
+        Room.objects.create(
+            room_number='A103', block_name='Block A', floor=1, capacity=1,
+            current_occupancy=0, room_type='Single', status='Maintenance'
+        )
+        expected = find_drifted_rooms()
+
+        self.assertEqual(reconcile_occupancy(), expected)
+        self.assertEqual(find_drifted_rooms(), [])
+        self.assertEqual(Room.objects.get(room_number='A103').status, 'Maintenance')
+
+    def test_periodic_job_enqueued_once_per_interval(self):
+        """Test the scheduler does not queue a periodic job twice within its interval."""
+        with self.settings(PERIODIC_JOBS={'recompute_occupancy': 3600}):
+            self.assertEqual(len(jobs.enqueue_due_periodic_jobs()), 1)
+            self.assertEqual(jobs.enqueue_due_periodic_jobs(), [])
+
+
+class AuditLogTests(TestCase):
+    """Tests for the allocation and complaint audit log."""
+
+    def setUp(self):
+        """Create an admin, a student, a room, an application and a complaint."""
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.allocation = RoomAllocation.objects.create(student=self.user, room=self.room)
+        self.complaint = Complaint.objects.create(student=self.user, subject='Leak', description='Tap leaks')
+
+    def test_events_written_with_the_change(self):
+        """Test each transition is written inside the transaction making it, so none waits for a commit."""
+        self.allocation.approve()
+        self.complaint.resolve()
+
+        self.assertEqual(
+            list(audit.history(student=self.user).exclude(old_status='').values_list('kind', 'old_status', 'new_status')),
+            [('Complaint', 'Pending', 'Resolved'), ('Allocation', 'Pending', 'Approved')],
+        )
+
+    def test_many_transitions_written_in_one_insert(self):
+        """Test record_many looks up usernames once and writes every event in one INSERT."""
+        transitions = [('Allocation', n, self.user.id, self.room.id, 'Waitlisted', 'Pending') for n in range(5)]
+        with self.assertNumQueries(2):
+            audit.record_many(transitions)
+        self.assertEqual(AuditEvent.objects.filter(username='testuser', old_status='Waitlisted').count(), 5)
+
+    def test_rolled_back_change_not_logged(self):
+        """Test a transition undone by a rollback leaves no event."""
+        from django.db import transaction
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.allocation.reject('Full')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertFalse(AuditEvent.objects.filter(new_status='Rejected').exists())
+
+    def test_admin_action_records_actor(self):
+        """Test an approval through the admin view records who made it."""
+        self.client.login(username='admin', password='adminpass123')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('approve_application', args=[self.allocation.id]))
+
+        event = AuditEvent.objects.get(room=self.room, old_status='Pending')
+        self.assertEqual(event.actor, self.admin)
+        self.assertEqual(event.new_status, 'Approved')
+
+    def test_events_survive_student_deletion(self):
+        """Test deleting a student keeps their audit trail under their username."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.allocation.approve()
+        self.user.delete()
+
+        event = AuditEvent.objects.get(new_status='Approved')
+        self.assertEqual((event.student, event.username, event.new_status), (None, 'testuser', 'Approved'))
+
+    def test_event_for_deleted_student(self):
+        """Test an event about a student who no longer exists is kept unlinked."""
+        student_id = self.user.id
+        self.user.delete()
+        audit.record('Allocation', self.allocation.id, student_id, self.room.id, 'Approved', 'Deleted')
+
+        event = AuditEvent.objects.get(new_status='Deleted')
+        self.assertEqual((event.student_id, event.username), (None, ''))
+
+
+class SQLiteCacheTests(TestCase):
+    """Tests for the shared SQLite cache backend."""
+
+    def setUp(self):
+        """Create a cache in a temporary file."""
+        import tempfile
+        from hostel_app.sqlite_cache import SQLiteCache
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = f'{directory.name}/cache.sqlite3'
+        self.cache = SQLiteCache(self.location, {'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_FREQUENCY': 3}})
+
+    def test_values_shared_between_instances(self):
+        """Test a second backend on the same file (another worker) sees the same entries."""
+        from hostel_app.sqlite_cache import SQLiteCache
+        self.cache.set('room', {'number': 'A101'})
+        self.cache.set('flag', True)
+        other = SQLiteCache(self.location, {})
+        self.assertEqual(other.get('room'), {'number': 'A101'})
+        self.assertIs(other.get('flag'), True)
+
+    def test_tests_use_their_own_cache_file(self):
+        """Test the suite's cache is not the file a running server on this host uses."""
+        import os
+        import tempfile
+        from django.conf import settings
+        self.assertNotEqual(
+            settings.CACHES['default']['LOCATION'],
+            os.path.join(tempfile.gettempdir(), 'hostel_cache.sqlite3'),
+        )
+
+    def test_incr_and_expiry(self):
+        """Test incr is applied in place and missing or expired keys behave as absent."""
+        self.cache.set('count', 5)
+        self.assertEqual(self.cache.incr('count', 2), 7)
+        self.assertEqual(self.cache.decr('count'), 6)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+        self.cache.set('old', 1, timeout=-1)
+        self.assertIsNone(self.cache.get('old'))
+        self.assertTrue(self.cache.add('old', 2))
+        self.assertFalse(self.cache.add('old', 3))
+        self.assertEqual(self.cache.get('old'), 2)
+
+    def test_least_recently_used_entry_evicted(self):
+        """Test exceeding MAX_ENTRIES evicts the entry read least recently."""
+        from unittest import mock
+        with mock.patch('hostel_app.sqlite_cache.time') as clock:
+            clock.time.side_effect = iter(range(100, 200))
+            for key in ('a', 'b', 'c'):
+                self.cache.set(key, key)
+            self.cache.get('a')
+            self.cache.set('d', 'd')
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 'a')
+
+    def test_entry_count_checked_every_cull_interval_writes(self):
+        """Test writes between cull checks do not count or evict entries."""
+        from hostel_app.sqlite_cache import SQLiteCache
+        cache = SQLiteCache(self.location, {'OPTIONS': {'MAX_ENTRIES': 3, 'CULL_INTERVAL': 5}})
+        for key in 'abcd':
+            cache.set(key, key)
+        self.assertEqual(len(cache.get_many('abcd')), 4)
+
+        cache.set('e', 'e')
+        self.assertLess(len(cache.get_many('abcde')), 5)
+
+
+class WarmUpTests(TestCase):
+    """Tests for cold-start warm-up and the startup profile parser."""
+
+    def test_warm_up_runs_every_step(self):
+        """Test every warm-up step succeeds and templates are compiled."""
+        from hostel_app.warmup import warm_up
+        timings = warm_up()
+        self.assertEqual(list(timings), ['urls', 'templates', 'database', 'caches'])
+        for seconds, result in timings.values():
+            self.assertNotIsInstance(result, Exception)
+        self.assertGreater(timings['templates'][1], 10)
+
+    def test_parse_importtime(self):
+        """Test -X importtime lines are parsed into module timings."""
+        from hostel_app.management.commands.startup_profile import parse_importtime
+        stderr = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        450 |   django.urls\n'
+        )
+        self.assertEqual(parse_importtime(stderr), [('django.urls', 120, 450)])
+
+
+class AuthThrottleTests(TestCase):
+    """Tests for the login and registration throttle."""
+
+    def setUp(self):
+        """Start with empty buckets."""
+        from django.core.cache import cache
+        cache.clear()
+        self.login_url = reverse('login')
+
+    def test_burst_rejected_without_queries(self):
+        """Test POSTs beyond the bucket capacity get 429 before any query runs."""
+        with self.settings(AUTH_THROTTLE_RATES={'login': {'capacity': 2, 'per_minute': 1}}):
+            for attempt in range(2):
+                response = self.client.post(self.login_url, {'username': f'bot{attempt}', 'password': 'x'})
+                self.assertEqual(response.status_code, 200)
+
+            self.client.cookies.clear()
+            with self.assertNumQueries(0):
+                response = self.client.post(self.login_url, {'username': 'bot9', 'password': 'x'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        self.assertContains(response, 'Too many attempts', status_code=429)
+
+    def test_username_bucket_shared_across_ips(self):
+        """Test one username is limited even when attempts come from different IPs."""
+        with self.settings(AUTH_THROTTLE_RATES={'login': {'capacity': 1, 'per_minute': 1}}):
+            self.client.post(self.login_url, {'username': 'victim', 'password': 'x'}, REMOTE_ADDR='10.0.0.1')
+            response = self.client.post(
+                self.login_url, {'username': 'Victim', 'password': 'x'}, REMOTE_ADDR='10.0.0.2'
+            )
+        self.assertEqual(response.status_code, 429)
+
+    def test_concurrent_requests_never_share_a_token(self):
+        """Test a burst of simultaneous requests gets exactly the bucket's capacity through."""
+        from concurrent.futures import ThreadPoolExecutor
+        from hostel_app import throttle
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            waits = list(pool.map(lambda _: throttle.take_token('throttle:test:burst', 5, 1), range(40)))
+        self.assertEqual(waits.count(0), 5)
+        self.assertTrue(all(wait > 0 for wait in waits if wait))
+
+
+class AdmissionControlTests(TestCase):
+    """Tests for admission control on write-heavy student endpoints."""
+
+    LIMITS = {'apply_room': {'concurrency': 1, 'retry_after': 7, 'hold': 60}}
+
+    def setUp(self):
+        """Start with free slots and log in a student."""
+        from django.core.cache import cache
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('apply_room', args=[self.room.id])
+
+    def test_full_endpoint_rejected_without_queries(self):
+        """Test a POST finding every slot taken gets 503 before any query runs."""
+        with self.settings(ADMISSION_LIMITS=self.LIMITS):
+            slot = admission.acquire('apply_room')
+            with self.assertNumQueries(0):
+                response = self.client.post(self.url)
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '7')
+            self.assertContains(response, 'try again in 7 seconds', status_code=503)
+            self.assertFalse(RoomAllocation.objects.exists())
+
+            admission.release(slot)
+            response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(RoomAllocation.objects.filter(student=self.user).exists())
+
+    def test_rejected_at_once_and_admitted_after_release(self):
+        """Test a request finding no free slot is rejected without waiting, and the next one gets the freed slot."""
+        import time
+        with self.settings(ADMISSION_LIMITS=self.LIMITS):
+            slot = admission.acquire('apply_room')
+            started = time.monotonic()
+            with self.assertRaises(admission.Rejected):
+                admission.acquire('apply_room')
+            self.assertLess(time.monotonic() - started, 0.05)
+            admission.release(slot)
+            admission.release(admission.acquire('apply_room'))
+            stats = admission.stats('apply_room')
+        self.assertEqual((stats['admitted'], stats['rejected'], stats['in_flight']), (2, 1, 0))
+
+    def test_waiting_request_takes_a_slot_freed_in_time(self):
+        """Test a request finding no free slot waits briefly and is admitted when one is released."""
+        import threading
+        limits = {'apply_room': dict(self.LIMITS['apply_room'], max_wait=5)}
+        with self.settings(ADMISSION_LIMITS=limits):
+            slot = admission.acquire('apply_room')
+            threading.Timer(0.1, admission.release, [slot]).start()
+            admission.release(admission.acquire('apply_room'))
+            stats = admission.stats('apply_room')
+        self.assertEqual((stats['admitted'], stats['rejected'], stats['waited'], stats['waiting']), (2, 0, 1, 0))
+        self.assertGreater(stats['mean_wait_ms'], 0)
+
+    def test_release_spares_a_slot_retaken_after_expiry(self):
+        """Test releasing a slot that expired and went to another request leaves that request's hold."""
+        from django.core.cache import cache
+        with self.settings(ADMISSION_LIMITS=self.LIMITS):
+            key, token = admission.acquire('apply_room')
+            cache.set(key, 'another-request', 60)
+            admission.release((key, token))
+            self.assertEqual(cache.get(key), 'another-request')
+            admission.release((key, 'another-request'))
+            self.assertIsNone(cache.get(key))
+
+    def test_default_limits_fit_the_workers(self):
+        """Test each endpoint by default leaves at least one of several gunicorn workers free."""
+        from django.conf import settings
+        for scope, config in settings.ADMISSION_LIMITS.items():
+            self.assertGreaterEqual(config['concurrency'], 1, scope)
+            if settings.WEB_CONCURRENCY > 1:
+                self.assertLess(config['concurrency'], settings.WEB_CONCURRENCY, scope)
+
+    def test_status_reports_limits_to_admins(self):
+        """Test the status endpoint shows slots in use and rejections, for admins only."""
+        self.assertEqual(self.client.get(reverse('admission_status')).status_code, 302)
+        with self.settings(ADMISSION_LIMITS=self.LIMITS):
+            slot = admission.acquire('apply_room')
+            self.client.post(self.url)
+            self.client.login(username='admin', password='adminpass123')
+            data = self.client.get(reverse('admission_status')).json()
+            admission.release(slot)
+        stats = data['endpoints']['apply_room']
+        self.assertEqual(stats['in_flight'], 1)
+        self.assertEqual(stats['rejected'], 1)
+
+
+class StudentDetailTests(TestCase):
+    """Tests for the paginated admin student detail page."""
+
+    def setUp(self):
+        """Create an admin and a student profile."""
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        StudentProfile.objects.create(
+            user=self.user, full_name='Test Student', department='CSE', year=2,
+            phone_number='9876543210', address='Test Address', guardian_name='Guardian'
+        )
+        self.client.login(username='admin', password='adminpass123')
+        self.url = reverse('student_detail', args=[self.user.id])
+
+    def add_history(self, count):
+        """Give the student `count` rejected allocations and complaints."""
+        start = Room.objects.count()
+        for i in range(start, start + count):
+            room = Room.objects.create(room_number=f'H{i}', block_name='Block H', floor=1, capacity=1, room_type='Single')
+            RoomAllocation.objects.create(student=self.user, room=room, status='Rejected')
+            Complaint.objects.create(student=self.user, subject=f'Issue {i}', description='...')
+
+    def test_query_count_independent_of_history(self):
+        """Test a long history costs no more queries than a single record."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.add_history(1)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url)
+
+        self.add_history(30)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url)
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(response.context['complaints']), 10)
+        self.assertEqual(response.context['student'].complaint_count, 31)
+
+    def test_sections_paginate_independently(self):
+        """Test paging one section keeps the other section's page."""
+        self.add_history(25)
+        response = self.client.get(self.url, {'alloc_page': 3, 'complaint_page': 2})
+        self.assertEqual(response.context['alloc_page'].number, 3)
+        self.assertEqual(response.context['complaint_page'].number, 2)
+        self.assertEqual(len(response.context['allocations']), 5)
+        self.assertContains(response, '?complaint_page=2&alloc_page=2')
+
+
+class ConditionalGetTests(TestCase):
+    """Tests for ETag/Last-Modified handling on list pages."""
+
+    def setUp(self):
+        """Create a student, an admin and a room."""
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.client.login(username='testuser', password='testpass123')
+        self.url = reverse('room_list')
+
+    def revalidate(self, url, response):
+        """Repeat a GET with the validators from an earlier response."""
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_page_not_modified(self):
+        """Test a repeat GET of an unchanged page returns 304 without rendering."""
+        first = self.client.get(self.url)
+        self.assertIn('Last-Modified', first)
+
+        second = self.revalidate(self.url, first)
+        self.assertEqual(second.status_code, 304)
+        self.assertIsNone(second.context)
+
+    def test_change_invalidates(self):
+        """Test a room update makes the page render again."""
+        first = self.client.get(self.url)
+        self.room.amenities = 'WiFi'
+        self.room.save()
+        self.assertEqual(self.revalidate(self.url, first).status_code, 200)
+
+    def test_room_list_carries_no_idempotency_key(self):
+        """Test apply forms leave their key to the browser, so cached copies cannot replay one."""
+        first = self.client.get(self.url)
+        second = self.client.get(self.url)
+
+        self.assertContains(first, 'name="idempotency_key" value="" data-idempotency-key')
+        self.assertNotRegex(first.content.decode(), r'name="idempotency_key" value="[^"]')
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_status_change_invalidates_admin_list(self):
+        """Test an approval (which changes no timestamp column on the row) is detected."""
+        allocation = RoomAllocation.objects.create(student=self.user, room=self.room)
+        self.client.login(username='admin', password='adminpass123')
+        url = reverse('manage_applications')
+        first = self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            RoomAllocation.objects.get(id=allocation.id).reject('Full')
+        self.assertEqual(self.revalidate(url, first).status_code, 200)
+
+
+class StaticPipelineTests(TestCase):
+    """Tests for the minified, hashed and precompressed static files pipeline."""
+
+    def test_collectstatic_output_served_immutable(self):
+        """Test collectstatic writes minified hashed assets with compressed variants served as immutable."""
+        import os
+        import tempfile
+        from django.contrib.staticfiles.storage import staticfiles_storage
+        from django.core.management import call_command
+        from django.test.utils import override_settings
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'hostel_app.storage.MinifiedManifestStaticFilesStorage'},
+        }
+        with override_settings(STATIC_ROOT=directory.name, STORAGES=storages):
+            call_command('collectstatic', '--noinput', verbosity=0)
+            hashed = staticfiles_storage.stored_name('css/style.css')
+            path = os.path.join(directory.name, hashed)
+            for suffix in ('', '.gz', '.br'):
+                self.assertTrue(os.path.exists(path + suffix))
+            source = os.path.join(os.path.dirname(__file__), '..', 'static', 'css', 'style.css')
+            self.assertLess(os.path.getsize(path), os.path.getsize(source))
+
+            response = Client().get(f'/static/{hashed}', HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertEqual(response['Content-Encoding'], 'br')
+
+
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+
+class Jinja2FragmentTests(TestCase):
+    """Tests for the optional Jinja2 list fragments."""
+
+    def setUp(self):
+        """Create an admin, a student with a pending application and a complaint."""
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        StudentProfile.objects.create(
+            user=self.user, full_name='Test <Student>', department='CSE', year=1,
+            phone_number='9876543210', address='Test Address', guardian_name='Test Guardian'
+        )
+        self.room = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.allocation = RoomAllocation.objects.create(student=self.user, room=self.room)
+        Complaint.objects.create(student=self.user, subject='Fan & light', description='Broken', priority='High')
+        self.client.login(username='admin', password='adminpass123')
+
+    def render(self, url, enabled):
+        """Body of `url` with the Jinja2 fragments on or off, minus CSRF tokens, comments and whitespace."""
+        import re
+        from django.conf import settings
+        from django.test.utils import override_settings
+
+        engines = [engine for engine in settings.TEMPLATES if engine.get('NAME') != 'jinja2']
+        engines.append({
+            'NAME': 'jinja2',
+            'BACKEND': 'django.template.backends.jinja2.Jinja2',
+            'DIRS': [settings.BASE_DIR / 'templates' / 'jinja2'],
+            'OPTIONS': {'environment': 'hostel_app.jinja2_env.environment', 'autoescape': True},
+        })
+        with override_settings(JINJA2_LIST_TEMPLATES=enabled, TEMPLATES=engines):
+            content = self.client.get(url).content.decode()
+        content = re.sub(r'name="csrfmiddlewaretoken" value="[^"]+"', '', content)
+        content = re.sub(r'<!--.*?-->', '', content)
+        return re.sub(r'\s+', '', content)
+
+    @skipUnless(jinja2, 'Jinja2 is not installed')
+    def test_fragments_match_django_templates(self):
+        """Test the Jinja2 rows render the same markup as the Django loops."""
+        for name in ('manage_applications', 'manage_complaints', 'room_list'):
+            url = reverse(name)
+            with self.subTest(page=name):
+                self.assertEqual(self.render(url, True), self.render(url, False))
+
+
+class LoadTestCommandTests(TransactionTestCase):
+    """Tests for the load_test management command (threads need committed data)."""
+
+    def test_short_run_writes_report_and_cleans_up(self):
+        """Test a short run logs everyone in, reports each route and removes the seeded data."""
+        import json
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, 'report.json')
+        call_command(
+            'load_test', students=2, admins=1, rooms=3, duration=0.5, output=output, interactive=False, stdout=StringIO(),
+        )
+
+        with open(output) as handle:
+            report = json.load(handle)
+        self.assertEqual(report['routes']['login']['requests'], 3)
+        self.assertEqual(report['routes']['login']['errors'], 0)
+        self.assertGreater(report['total']['requests'], 0)
+        self.assertGreater(report['total']['queries'], 0)
+        self.assertLessEqual(report['total']['p50_ms'], report['total']['p99_ms'])
+        self.assertFalse(User.objects.filter(username__startswith='loadtest_').exists())
+        self.assertFalse(Room.objects.filter(block_name='Load Test Block').exists())
+
+    def test_refuses_to_run_without_confirmation(self):
+        """Test the command names the target database and writes nothing unless told 'yes'."""
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+
+        stdout = StringIO()
+        with mock.patch('builtins.input', return_value='no'), self.assertRaises(CommandError):
+            call_command('load_test', students=1, admins=0, rooms=1, duration=0, stdout=stdout)
+        self.assertIn(connection.settings_dict['NAME'], stdout.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='loadtest_').exists())
+
+
+class TransferTests(TestCase):
+    """Tests for atomic room transfers, swaps and batch moves."""
+
+    def setUp(self):
+        """Create two full single rooms, a free double room and their residents."""
+        self.single_a = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=1, room_type='Single')
+        self.single_b = Room.objects.create(room_number='A102', block_name='Block A', floor=1, capacity=1, room_type='Single')
+        self.double = Room.objects.create(room_number='B201', block_name='Block B', floor=2, capacity=2, room_type='Double')
+        self.alice = User.objects.create_user(username='alice', password='testpass123')
+        self.bob = User.objects.create_user(username='bob', password='testpass123')
+        self.alloc_a = RoomAllocation.objects.create(student=self.alice, room=self.single_a)
+        self.alloc_a.approve()
+        self.alloc_b = RoomAllocation.objects.create(student=self.bob, room=self.single_b)
+        self.alloc_b.approve()
+
+    def occupancy(self, room):
+        """Stored (occupancy, status) of `room`."""
+        room.refresh_from_db()
+        return room.current_occupancy, room.status
+
+    def test_transfer_keeps_allocation_and_updates_both_rooms(self):
+        """Test a move changes the room of the same allocation row and both rooms' occupancy."""
+        with self.captureOnCommitCallbacks(execute=True):
+            move = transfers.transfer(self.alice, self.double)
+
+        self.assertEqual(move.from_room, self.single_a)
+        self.alloc_a.refresh_from_db()
+        self.assertEqual((self.alloc_a.room, self.alloc_a.status), (self.double, 'Approved'))
+        self.assertEqual(self.occupancy(self.single_a), (0, 'Available'))
+        self.assertEqual(self.occupancy(self.double), (1, 'Available'))
+        self.assertEqual(
+            list(AuditEvent.objects.filter(object_id=self.alloc_a.id, new_status__in=['Transferred', 'Approved'])
+                 .order_by('id').values_list('room_id', 'new_status'))[-2:],
+            [(self.single_a.id, 'Transferred'), (self.double.id, 'Approved')],
+        )
+        self.assertTrue(Notification.objects.filter(student=self.alice, message__contains='B201').exists())
+
+    def test_swap_between_full_rooms(self):
+        """Test two students in full single rooms can swap."""
+        transfers.swap(self.alice, self.bob)
+
+        self.alloc_a.refresh_from_db()
+        self.alloc_b.refresh_from_db()
+        self.assertEqual((self.alloc_a.room, self.alloc_b.room), (self.single_b, self.single_a))
+        self.assertEqual(self.occupancy(self.single_a), (1, 'Full'))
+        self.assertEqual(self.occupancy(self.single_b), (1, 'Full'))
+
+    def test_overfull_batch_changes_nothing(self):
+        """Test a batch that would overfill a room is refused as a whole."""
+        carol = User.objects.create_user(username='carol', password='testpass123')
+        RoomAllocation.objects.create(student=carol, room=self.double).approve()
+
+        with self.assertRaises(transfers.TransferError):
+            transfers.apply_moves([(self.alice, self.double), (self.bob, self.double)])
+        self.alloc_a.refresh_from_db()
+        self.assertEqual(self.alloc_a.room, self.single_a)
+        self.assertEqual(self.occupancy(self.double), (1, 'Available'))
+
+    def test_batch_move_promotes_waitlist_and_ignores_old_rejection(self):
+        """Test emptying a room promotes its waitlist, even when a mover was once rejected from the target."""
+        RoomAllocation.objects.create(student=self.alice, room=self.double, status='Rejected')
+        waiting = User.objects.create_user(username='waiting', password='testpass123')
+        waitlisted = RoomAllocation.objects.create(student=waiting, room=self.single_a, status='Waitlisted')
+
+        moves = transfers.apply_moves([(self.alice, self.double), (self.bob, self.double)])
+
+        self.assertEqual(len(moves), 2)
+        self.assertEqual(self.occupancy(self.double), (2, 'Full'))
+        waitlisted.refresh_from_db()
+        self.assertEqual(waitlisted.status, 'Pending')
+
+    def test_admin_transfer_view(self):
+        """Test an admin can move a student from the student detail page."""
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.login(username='admin', password='adminpass123')
+
+        response = self.client.post(reverse('transfer_student', args=[self.alice.id]), {'room_number': 'b201'})
+        self.assertRedirects(response, reverse('student_detail', args=[self.alice.id]), fetch_redirect_response=False)
+        self.alloc_a.refresh_from_db()
+        self.assertEqual(self.alloc_a.room, self.double)
+
+        self.client.post(reverse('transfer_student', args=[self.bob.id]), {'room_number': 'A101'})
+        self.alloc_b.refresh_from_db()
+        self.assertEqual(self.alloc_b.room, self.single_a)
+
+    def test_transfer_form_room_numbers_differing_by_case(self):
+        """Test an exact room number wins over case variants, and an ambiguous one is a form error."""
+        from hostel_app.forms import RoomTransferForm
+        lower = Room.objects.create(room_number='b201', block_name='Block B', floor=2, capacity=2, room_type='Double')
+        for number in ('Gx1', 'gX1'):
+            Room.objects.create(room_number=number, block_name='Block G', floor=1, capacity=2, room_type='Double')
+
+        form = RoomTransferForm(data={'room_number': 'b201'})
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['room'], lower)
+        self.assertFalse(RoomTransferForm(data={'room_number': 'gx1'}).is_valid())
+
+    def test_move_students_dry_run(self):
+        """Test the batch command reports moves on a dry run without applying them."""
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w') as moves:
+            moves.write('username,room_number\nalice,B201\nbob,B201\n')
+
+        out = StringIO()
+        call_command('move_students', path, '--dry-run', stdout=out)
+        self.assertIn('Would move 2 students', out.getvalue())
+        self.assertEqual(self.occupancy(self.double), (0, 'Available'))
+
+        call_command('move_students', path, stdout=StringIO())
+        self.assertEqual(self.occupancy(self.double), (2, 'Full'))
+
+
+class EvacuationTests(TestCase):
+    """Tests for the maintenance evacuation planner."""
+
+    def setUp(self):
+        """Create a closing double room with two residents and some free rooms."""
+        self.closing = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.same_block = Room.objects.create(room_number='A201', block_name='Block A', floor=2, capacity=2, room_type='Double')
+        self.same_block_single = Room.objects.create(room_number='A102', block_name='Block A', floor=1, capacity=1, room_type='Single')
+        self.other_block = Room.objects.create(room_number='B101', block_name='Block B', floor=1, capacity=2, room_type='Double')
+        self.students = []
+        for name in ('alice', 'bob'):
+            student = User.objects.create_user(username=name, password='testpass123')
+            RoomAllocation.objects.create(student=student, room=self.closing).approve()
+            self.students.append(student)
+
+    def test_plan_keeps_roommates_in_same_block_and_type(self):
+        """Test roommates move together to the same-block room of the same type."""
+        plan = evacuation.plan_evacuation([self.closing])
+
+        self.assertEqual([relocation.to_room for relocation in plan.relocations], [self.same_block, self.same_block])
+        self.assertEqual(plan.unplaced, [])
+
+    def test_plan_splits_and_reports_unplaced(self):
+        """Test students are split over rooms when needed and left unplaced when beds run out."""
+        self.same_block.status = 'Maintenance'
+        self.same_block.save()
+        self.other_block.status = 'Maintenance'
+        self.other_block.save()
+
+        plan = evacuation.plan_evacuation([self.closing])
+
+        self.assertEqual([relocation.to_room for relocation in plan.relocations], [self.same_block_single])
+        self.assertEqual(len(plan.unplaced), 1)
+
+    def test_apply_closes_rooms_moves_residents_and_rejects_applications(self):
+        """Test applying a plan closes the room, moves everyone and rejects its open applications."""
+        waiting = User.objects.create_user(username='waiting', password='testpass123')
+        waitlisted = RoomAllocation.objects.create(student=waiting, room=self.closing, status='Waitlisted')
+        plan = evacuation.plan_evacuation([self.closing])
+
+        moved, rejected, unplaced = evacuation.apply_evacuation(
+            [self.closing.id],
+            [(relocation.allocation.student_id, relocation.to_room.id) for relocation in plan.relocations],
+        )
+
+        self.assertEqual((moved, rejected, unplaced), (2, 1, []))
+        self.closing.refresh_from_db()
+        self.assertEqual((self.closing.status, self.closing.current_occupancy), ('Maintenance', 0))
+        self.same_block.refresh_from_db()
+        self.assertEqual((self.same_block.status, self.same_block.current_occupancy), ('Full', 2))
+        waitlisted.refresh_from_db()
+        self.assertEqual(waitlisted.status, 'Rejected')
+
+    def test_stale_plan_changes_nothing(self):
+        """Test a plan whose target filled up in the meantime is refused without closing the room."""
+        plan = evacuation.plan_evacuation([self.closing])
+        for name in ('carol', 'dave'):
+            student = User.objects.create_user(username=name, password='testpass123')
+            RoomAllocation.objects.create(student=student, room=self.same_block).approve()
+
+        with self.assertRaises(transfers.TransferError):
+            evacuation.apply_evacuation(
+                [self.closing.id],
+                [(relocation.allocation.student_id, relocation.to_room.id) for relocation in plan.relocations],
+            )
+        self.closing.refresh_from_db()
+        self.assertEqual((self.closing.status, self.closing.current_occupancy), ('Full', 2))
+
+    def test_unplaced_residents_need_confirmation(self):
+        """Test a plan leaving residents in a closed room is refused unless confirmed, and reports them."""
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.login(username='admin', password='adminpass123')
+        for room in (self.same_block, self.other_block):
+            room.status = 'Maintenance'
+            room.save()
+        url = reverse('evacuate_rooms')
+        preview = self.client.post(url, {'room_numbers': 'A101'})
+        self.assertContains(preview, 'confirm_unplaced')
+        data = {'apply': '1', 'room_ids': preview.context['room_ids'], 'moves': preview.context['moves']}
+
+        response = self.client.post(url, data, follow=True)
+        self.assertContains(response, 'No free bed for bob (A101)')
+        self.closing.refresh_from_db()
+        self.assertEqual(self.closing.status, 'Full')
+
+        response = self.client.post(url, dict(data, confirm_unplaced='1'), follow=True)
+        self.assertContains(response, 'remain in closed rooms: bob (A101)')
+        self.closing.refresh_from_db()
+        self.assertEqual(self.closing.status, 'Maintenance')
+
+    def test_preview_then_apply_through_views(self):
+        """Test an admin previews a floor evacuation and applies it."""
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.login(username='admin', password='adminpass123')
+        url = reverse('evacuate_rooms')
+
+        response = self.client.post(url, {'blocks': ['Block A'], 'floors': '1'})
+        plan = response.context['plan']
+        self.assertEqual({room.room_number for room in plan.rooms}, {'A101', 'A102'})
+        self.assertContains(response, 'Apply Plan')
+
+        response = self.client.post(url, {
+            'apply': '1', 'room_ids': response.context['room_ids'], 'moves': response.context['moves'],
+        })
+        self.assertRedirects(response, reverse('manage_rooms'), fetch_redirect_response=False)
+        self.assertEqual(
+            set(Room.objects.filter(status='Maintenance').values_list('room_number', flat=True)), {'A101', 'A102'}
+        )
+        self.assertEqual(RoomAllocation.objects.filter(room=self.same_block, status='Approved').count(), 2)
+
+
+class OccupancyHistoryTests(TestCase):
+    """Tests for occupancy snapshots and the time-range report."""
+
+    def setUp(self):
+        """Create a half-full double and an empty single in one block."""
+        self.double = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.single = Room.objects.create(room_number='A102', block_name='Block A', floor=1, capacity=1, room_type='Single')
+        self.approve('alice', self.double)
+
+    def approve(self, username, room):
+        """Approve an allocation of `room` for a new student."""
+        student = User.objects.create_user(username=username, password='testpass123')
+        RoomAllocation.objects.create(student=student, room=room).approve()
+
+    def test_snapshot_stores_only_changed_rooms(self):
+        """Test a day's snapshot opens spans only for rooms whose occupancy changed."""
+        self.assertEqual(history.take_snapshot(date(2026, 1, 5)), 2)
+        self.approve('bob', self.single)
+
+        self.assertEqual(history.take_snapshot(date(2026, 1, 6)), 2)
+        self.assertEqual(history.take_snapshot(date(2026, 1, 7)), 0)
+
+        spans = RoomOccupancySpan.objects.filter(room=self.single).order_by('start_date')
+        self.assertEqual(
+            [(span.occupancy, span.start_date, span.end_date) for span in spans],
+            [(0, date(2026, 1, 5), date(2026, 1, 6)), (1, date(2026, 1, 6), None)],
+        )
+        self.assertEqual(RoomOccupancySpan.objects.filter(room=self.double).count(), 1)
+        self.assertEqual(OccupancyDaily.objects.count(), 6)
+
+    def test_same_day_rerun_rewrites_span(self):
+        """Test re-running a day's snapshot corrects that day instead of adding spans."""
+        history.take_snapshot(date(2026, 1, 5))
+        self.approve('bob', self.single)
+
+        history.take_snapshot(date(2026, 1, 5))
+
+        self.assertEqual(RoomOccupancySpan.objects.count(), 2)
+        self.assertEqual(RoomOccupancySpan.objects.get(room=self.single).occupancy, 1)
+        with self.assertRaises(ValueError):
+            history.take_snapshot(date(2026, 1, 4))
+
+    def test_rebuild_daily_matches_snapshots(self):
+        """Test daily totals rebuilt from the spans equal the ones recorded."""
+        history.take_snapshot(date(2026, 1, 5))
+        self.approve('bob', self.single)
+        history.take_snapshot(date(2026, 1, 8))
+        fields = ('date', 'block_name', 'floor', 'room_type', 'rooms', 'beds', 'occupied', 'closed_beds')
+        recorded = set(OccupancyDaily.objects.values_list(*fields))
+
+        self.assertEqual(history.rebuild_daily(date(2026, 1, 5), date(2026, 1, 9)), 8)
+        rebuilt = set(OccupancyDaily.objects.values_list(*fields))
+        self.assertTrue(recorded < rebuilt)
+        self.assertIn((date(2026, 1, 7), 'Block A', 1, 'Single', 1, 1, 0, 0), rebuilt)
+
+    def test_weekly_report(self):
+        """Test the weekly report weighs each day by its open beds."""
+        history.take_snapshot(date(2026, 1, 5))
+        self.approve('bob', self.single)
+        history.take_snapshot(date(2026, 1, 6))
+
+        report = history.occupancy_report(date(2026, 1, 1), date(2026, 2, 1))
+
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['group'], 'Block A')
+        self.assertEqual((report[0]['bed_days'], report[0]['occupied_bed_days'], report[0]['percentage']), (6, 3, 50.0))
+
+    def test_report_view(self):
+        """Test an admin sees the occupancy chart data and table."""
+        history.take_snapshot(date(2026, 1, 5))
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.login(username='admin', password='adminpass123')
+
+        response = self.client.get(reverse('occupancy_history'), {
+            'start': '2026-01-01', 'end': '2026-01-31', 'bucket': 'day', 'group_by': 'room_type',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['chart']['labels'], ['2026-01-05'])
+        self.assertEqual(
+            {dataset['label']: dataset['data'] for dataset in response.context['chart']['datasets']},
+            {'Double': [50.0], 'Single': [0.0]},
+        )
+
+
+class ResidencyTests(TestCase):
+    """Tests for allocation end dates and residency history queries."""
+
+    def setUp(self):
+        """Create two rooms in one block and a student approved into the first."""
+        self.room = Room.objects.create(room_number='B101', block_name='Block B', floor=1, capacity=2, room_type='Double')
+        self.other = Room.objects.create(room_number='B102', block_name='Block B', floor=1, capacity=2, room_type='Double')
+        self.student = User.objects.create_user(username='alice', password='testpass123')
+        self.allocation = RoomAllocation.objects.create(student=self.student, room=self.room)
+        self.allocation.approve()
+
+    def stay(self, student, room, started_at, ended_at=None):
+        """Create a stay labelled with the student's and room's current names."""
+        return Residency.objects.create(
+            student=student, room=room, username=student.username, room_number=room.room_number,
+            block_name=room.block_name, started_at=started_at, ended_at=ended_at,
+        )
+
+    def test_approval_and_removal_record_a_stay(self):
+        """Test removing an approved allocation sets its end date and ends the stay."""
+        stay = Residency.objects.get(student=self.student)
+        self.assertEqual((stay.room, stay.started_at, stay.ended_at), (self.room, self.allocation.allocated_date, None))
+
+        self.allocation.reject('Moved out')
+
+        stay.refresh_from_db()
+        self.assertIsNotNone(self.allocation.ended_date)
+        self.assertEqual(stay.ended_at, self.allocation.ended_date)
+
+    def test_transfer_ends_one_stay_and_starts_another(self):
+        """Test a transfer keeps the old room in the student's history."""
+        transfers.transfer(self.student, self.other)
+
+        stays = Residency.objects.filter(student=self.student).order_by('started_at')
+        self.assertEqual([stay.room for stay in stays], [self.room, self.other])
+        self.assertEqual(stays[0].ended_at, stays[1].started_at)
+        self.assertIsNone(stays[1].ended_at)
+
+    def test_stays_survive_deletion(self):
+        """Test a deleted allocation leaves its ended stay behind."""
+        self.allocation.delete()
+
+        stay = Residency.objects.get(student=self.student)
+        self.assertIsNone(stay.allocation)
+        self.assertIsNotNone(stay.ended_at)
+
+    def test_stays_survive_room_and_user_deletion(self):
+        """Test deleting a room or a user ends and keeps the stays, labelled by name."""
+        transfers.transfer(self.student, self.other)
+        self.room.delete()
+        self.student.delete()
+
+        stays = Residency.objects.order_by('started_at')
+        self.assertEqual([(s.username, s.room_number, s.student, s.room) for s in stays],
+                         [('alice', 'B101', None, None), ('alice', 'B102', None, self.other)])
+        self.assertIsNotNone(stays[1].ended_at)
+        moment = stays[0].started_at
+        self.assertEqual([s.username for s in residency.residents_at(moment, room_number='B101')], ['alice'])
+        self.assertEqual([s.username for s in residency.residents_at(moment, block_name='Block B')], ['alice'])
+
+    def test_point_in_time_and_overlap_queries(self):
+        """Test residents at a moment and during a period, by block."""
+        start = timezone.now() - timedelta(days=30)
+        Residency.objects.all().delete()
+        bob = User.objects.create_user(username='bob', password='testpass123')
+        self.stay(self.student, self.room, start, start + timedelta(days=10))
+        self.stay(bob, self.other, start + timedelta(days=10))
+
+        night = start + timedelta(days=5)
+        self.assertEqual([stay.student for stay in residency.residents_at(night, block_name='Block B')], [self.student])
+        self.assertEqual([stay.student for stay in residency.residents_at(start + timedelta(days=10))], [bob])
+        self.assertEqual(
+            [stay.student for stay in residency.residents_during(night, start + timedelta(days=11), rooms=[self.other])],
+            [bob],
+        )
+        self.assertEqual(residency.residents_at(start - timedelta(days=1)).count(), 0)
+
+    @skipUnless(connection.vendor == 'postgresql', 'tstzrange and GiST are PostgreSQL-only')
+    def test_postgres_range_queries_use_the_gist_index(self):
+        """Test the tstzrange filters match the portable rule and can be served by the GiST index."""
+        start = timezone.now() - timedelta(days=30)
+        Residency.objects.all().delete()
+        bob = User.objects.create_user(username='bob', password='testpass123')
+        self.stay(self.student, self.room, start, start + timedelta(days=10))
+        self.stay(bob, self.other, start + timedelta(days=10))
+
+        self.assertEqual([s.username for s in residency.residents_at(start + timedelta(days=10))], ['bob'])
+        self.assertEqual([s.username for s in residency.residents_at(start + timedelta(days=10) - timedelta(seconds=1))], ['alice'])
+        self.assertEqual(
+            [s.username for s in residency.residents_during(start - timedelta(days=1), start + timedelta(days=11))],
+            ['alice', 'bob'],
+        )
+        self.assertEqual(residency.residents_during(start - timedelta(days=2), start).count(), 0)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = residency.residents_at(start, block_name='Block B').explain()
+        self.assertIn(residency.RANGE_INDEX_NAME, plan)
+
+    def test_backfill_opens_missing_stays(self):
+        """Test allocations approved before tracking get a stay, once."""
+        Residency.objects.all().delete()
+
+        self.assertEqual(residency.backfill(), 1)
+        self.assertEqual(residency.backfill(), 0)
+        self.assertEqual(Residency.objects.get().started_at, self.allocation.allocated_date)
+
+
+class AnalyticsTests(TestCase):
+    """Tests for the vectorized occupancy and complaint reports."""
+
+    def setUp(self):
+        """Create rooms in two blocks, residents from two departments and some complaints."""
+        self.a101 = Room.objects.create(room_number='A101', block_name='Block A', floor=1, capacity=2, room_type='Double')
+        self.a201 = Room.objects.create(room_number='A201', block_name='Block A', floor=2, capacity=1, room_type='Single')
+        self.b101 = Room.objects.create(
+            room_number='B101', block_name='Block B', floor=1, capacity=2, room_type='Double', status='Maintenance'
+        )
+        for name, department, room in (('alice', 'CSE', self.a101), ('bob', 'CSE', self.a101), ('carol', 'ME', self.a201)):
+            student = User.objects.create_user(username=name, password='testpass123')
+            StudentProfile.objects.create(
+                user=student, full_name=name.title(), department=department, year=1,
+                phone_number='9876543210', address='Address', guardian_name='Guardian',
+            )
+            RoomAllocation.objects.create(student=student, room=room).approve()
+        self.student = User.objects.get(username='alice')
+
+    def complain(self, room, priority='Medium', hours=None):
+        """Create a complaint, resolved `hours` after it was raised when given."""
+        complaint = Complaint.objects.create(student=self.student, room=room, subject='Issue', description='Details', priority=priority)
+        if hours is not None:
+            Complaint.objects.filter(pk=complaint.pk).update(
+                status='Resolved', resolved_at=complaint.created_at + timedelta(hours=hours),
+            )
+        return complaint
+
+    def test_occupancy_breakdown(self):
+        """Test occupancy by block counts maintenance beds as closed, not empty."""
+        breakdown = analytics.occupancy_breakdown()
+
+        self.assertEqual(breakdown['block'], [
+            {'group': 'Block A', 'rooms': 2, 'beds': 3, 'occupied': 3, 'closed_beds': 0, 'percentage': 100.0},
+            {'group': 'Block B', 'rooms': 1, 'beds': 0, 'occupied': 0, 'closed_beds': 2, 'percentage': 0},
+        ])
+        self.assertEqual([row['group'] for row in breakdown['floor']], [1, 2])
+        self.assertEqual(
+            [(row['department'], row['residents']) for row in analytics.department_breakdown()],
+            [('Computer Science & Engineering', 2), ('Mechanical Engineering', 1)],
+        )
+
+    def test_complaint_breakdown(self):
+        """Test complaint counts per room and block and resolution percentiles by priority."""
+        for hours in (1, 2, 3, 4):
+            self.complain(self.a101, 'High', hours)
+        self.complain(self.a101, 'High')
+        self.complain(self.a201, 'Low', 10)
+        self.complain(None)
+
+        breakdown = analytics.complaint_breakdown()
+
+        self.assertEqual((breakdown['total'], breakdown['open'], breakdown['unassigned']), (7, 2, 1))
+        self.assertEqual(breakdown['rooms'][0], {
+            'room_number': 'A101', 'block_name': 'Block A', 'complaints': 5, 'open': 1, 'per_bed': 2.5,
+        })
+        self.assertEqual(breakdown['blocks'][0]['complaints'], 6)
+        resolution = {row['priority']: row for row in breakdown['resolution']}
+        self.assertEqual((resolution['High']['resolved'], resolution['High']['mean']), (4, 2.5))
+        self.assertEqual(resolution['High']['percentiles'][0], (50, 2.5))
+        self.assertEqual(resolution['Medium']['percentiles'][0], (50, None))
+
+    def test_reports_computed_by_job_until_tables_change(self):
+        """Test reports are queued once, served from the job's result, and requeued after a change."""
+        stored, job = analytics.reports()
+        self.assertIsNone(stored)
+        self.assertEqual(analytics.reports(), (None, job))
+        self.assertEqual(Job.objects.filter(name='compute_reports').count(), 1)
+
+        jobs.run_job(job)
+        with self.assertNumQueries(5):
+            stored, job = analytics.reports()
+        self.assertIsNone(job)
+        self.assertEqual(stored['complaints']['total'], 0)
+        self.assertEqual(stored['occupancy']['block'][0]['occupied'], 3)
+
+        self.complain(self.a101)
+        stored, job = analytics.reports()
+        self.assertEqual(stored['complaints']['total'], 0)
+        jobs.run_job(job)
+        self.assertEqual(analytics.reports()[0]['complaints']['total'], 1)
+
+    def test_columns_read_in_primary_key_chunks(self):
+        """Test columns spanning several chunks are read completely and in order."""
+        from unittest import mock
+        with mock.patch.object(analytics, 'CHUNK_SIZE', 2):
+            (ids,) = analytics._columns(Room.objects.all(), ['id'], [int])
+        self.assertEqual(ids.tolist(), list(Room.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_reports_page(self):
+        """Test the reports page queues the job, then renders its result for an admin."""
+        self.complain(self.a101, 'High', 5)
+        User.objects.create_superuser(username='admin', email='admin@example.com', password='adminpass123')
+        self.client.login(username='admin', password='adminpass123')
+
+        response = self.client.get(reverse('admin_reports'))
+        self.assertContains(response, 'being computed in the background')
+        self.assertNotContains(response, 'Occupancy by block')
+
+        jobs.run_job(Job.objects.get(name='compute_reports'))
+        response = self.client.get(reverse('admin_reports'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Occupancy by block')
+        self.assertContains(response, 'A101')
+        self.assertNotContains(response, 'being computed in the background')
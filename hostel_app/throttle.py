@@ -0,0 +1,84 @@
+"""
+Token-bucket throttle for the login and registration forms.
+
+Every POST takes one token from a bucket per client IP and one per submitted
+username. Buckets refill at a steady rate up to their capacity and live in the
+cache, so the limit holds across the workers of a host (each web host keeps
+its own buckets with the default per-host SQLite cache). A rejected request is
+answered before any form validation runs: no password hashing and no queries.
+
+Each bucket is kept as a sliding window made of atomic cache counters, so
+concurrent requests from different workers can never share a token: a POST
+`incr`s the counter of the current refill period (`capacity / rate` seconds)
+and is admitted while that count, plus the previous period's count weighted
+by how much of it still overlaps the last period, stays within `capacity`.
+That allows the same burst and the same steady rate as a token bucket. A
+rejected POST gives its count back with `decr`.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def client_ip(request):
+    """Client address, taking THROTTLE_NUM_PROXIES trusted proxies into account."""
+    num_proxies = getattr(settings, 'THROTTLE_NUM_PROXIES', 0)
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    if num_proxies and forwarded:
+        addresses = [address.strip() for address in forwarded.split(',')]
+        return addresses[-min(num_proxies, len(addresses))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def take_token(key, capacity, per_minute):
+    """
+    Take one token from the bucket at `key`.
+
+    Returns 0 if a token was available, otherwise the seconds until one is.
+    """
+    window = capacity * 60 / per_minute
+    index, elapsed = divmod(time.time(), window)
+    current = f'{key}:{int(index)}'
+    # Each period's counter is read as the previous one during the next period
+    cache.add(current, 0, int(2 * window) + 1)
+    try:
+        count = cache.incr(current)
+    except ValueError:
+        # Expired between add and incr
+        cache.add(current, 1, int(2 * window) + 1)
+        count = 1
+    previous = cache.get(f'{key}:{int(index) - 1}', 0)
+    if previous * (1 - elapsed / window) + count <= capacity:
+        return 0
+
+    try:
+        cache.decr(current)
+    except ValueError:
+        pass
+    count -= 1
+    if count < capacity:
+        # Wait for enough of the previous period to slide out of the window
+        return max(window * (1 - (capacity - count - 1) / previous) - elapsed, 0.001)
+    # This period is used up too: wait for it to become the previous one and fade
+    return (window - elapsed) + window * (1 - (capacity - 1) / count)
+
+
+def check(request, scope):
+    """
+    Charge a POST to `scope` ('login' or 'register') against its IP and username buckets.
+
+    Returns 0 if the request may proceed, otherwise seconds to wait before retrying.
+    """
+    if not getattr(settings, 'AUTH_THROTTLE_ENABLED', True):
+        return 0
+    limits = settings.AUTH_THROTTLE_RATES[scope]
+    keys = [f'throttle:{scope}:ip:{client_ip(request)}']
+    username = request.POST.get('username', '').strip().lower()
+    if username:
+        # Hashed so arbitrary submitted text is always a valid cache key
+        digest = hashlib.sha256(username.encode()).hexdigest()[:32]
+        keys.append(f'throttle:{scope}:user:{digest}')
+    return max(take_token(key, limits['capacity'], limits['per_minute']) for key in keys)
@@ -0,0 +1,174 @@
+"""
+Atomic room transfers, roommate swaps and batch moves.
+
+`apply_moves()` moves any number of students with approved allocations to new
+rooms in one transaction: the allocation rows keep their identity and only
+their room changes, so nobody is ever unhoused and no slot is given up
+mid-move. Each move ends the student's Residency and starts a new one.
+Room rows are locked first and allocation rows second, each in id order,
+matching approve(), which locks the room before writing the allocation, so
+batches and approvals cannot deadlock. Capacity is checked against the final
+state, which lets swaps and rotations between full rooms through, and
+occupancy is recomputed once per affected room in a single UPDATE.
+"""
+
+from collections import Counter, namedtuple
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import audit
+from .models import Room, RoomAllocation, Notification, Residency
+from .occupancy import recompute_rooms
+
+
+Move = namedtuple('Move', ['allocation', 'from_room', 'to_room'])
+
+
+class TransferError(Exception):
+    """A batch of moves was refused; nothing was changed."""
+
+
+def apply_moves(moves, notify=True):
+    """
+    Move students to new rooms atomically.
+
+    `moves` is an iterable of (student_id, room_id) pairs; students must have
+    an approved allocation. Moves to the student's current room are ignored.
+    Raises TransferError, changing nothing, if a student has no approved
+    allocation or appears twice, a target room is missing or under
+    maintenance, or a room would end up over capacity.
+
+    Returns the list of Move tuples applied.
+    """
+    targets = {}
+    for student_id, room_id in moves:
+        student_id = getattr(student_id, 'pk', student_id)
+        room_id = getattr(room_id, 'pk', room_id)
+        if student_id in targets:
+            raise TransferError(f'Student #{student_id} is moved more than once.')
+        targets[student_id] = room_id
+    if not targets:
+        return []
+
+    with transaction.atomic():
+        allocations, rooms = lock_allocations(targets, targets.values())
+        missing = set(targets) - {allocation.student_id for allocation in allocations}
+        if missing:
+            raise TransferError(
+                f'No approved allocation for student(s) {", ".join(f"#{pk}" for pk in sorted(missing))}.'
+            )
+        allocations = [a for a in allocations if a.room_id != targets[a.student_id]]
+        if not allocations:
+            return []
+
+        room_ids = {a.room_id for a in allocations} | {targets[a.student_id] for a in allocations}
+        _check(allocations, targets, rooms)
+        # Only rooms that lose more students than they gain get free places for the waitlist
+        net = Counter(targets[a.student_id] for a in allocations)
+        net.subtract(a.room_id for a in allocations)
+
+        # unique_together(student, room) would reject a move back into a room the
+        # student once had a rejected application for; those rows are obsolete now
+        stale = Q()
+        for allocation in allocations:
+            stale |= Q(student_id=allocation.student_id, room_id=targets[allocation.student_id])
+        for old in RoomAllocation.objects.filter(stale).exclude(status__in=RoomAllocation.ACTIVE_STATUSES):
+            old.delete()
+
+        now = timezone.now()
+        applied = []
+        transitions = []
+        for allocation in allocations:
+            from_room, to_room = rooms[allocation.room_id], rooms[targets[allocation.student_id]]
+            allocation.room = to_room
+            allocation.allocated_date = now
+            applied.append(Move(allocation, from_room, to_room))
+            transitions.append(('Allocation', allocation.id, allocation.student_id, from_room.id, 'Approved', 'Transferred'))
+            transitions.append(('Allocation', allocation.id, allocation.student_id, to_room.id, 'Transferred', 'Approved'))
+        RoomAllocation.objects.bulk_update(allocations, ['room', 'allocated_date'])
+        audit.record_many(transitions)
+        Residency.end([allocation.id for allocation in allocations], now)
+        Residency.begin(allocations, now)
+
+        recompute_rooms(room_ids)
+        for room in Room.objects.filter(id__in=[pk for pk, change in net.items() if change < 0]).order_by('id'):
+            room.promote_waitlist()
+
+        if notify:
+            Notification.objects.bulk_create([
+                Notification(
+                    student_id=move.allocation.student_id,
+                    message=f'You have been moved from Room {move.from_room.room_number} '
+                            f'to Room {move.to_room.room_number}.',
+                )
+                for move in applied
+            ])
+
+    return applied
+
+
+def lock_allocations(student_ids, room_ids):
+    """
+    Lock the students' current rooms and `room_ids`, then their approved allocations.
+
+    The rooms come from an unlocked read, so if an allocation has meanwhile
+    moved to a room that is not locked the batch is refused rather than
+    locking that room out of order. Returns (allocations, rooms by id).
+    """
+    approved = RoomAllocation.objects.filter(student_id__in=student_ids, status='Approved')
+    locked = set(approved.values_list('room_id', flat=True)) | set(room_ids)
+    rooms = {room.id: room for room in Room.objects.select_for_update().filter(id__in=locked).order_by('id')}
+    allocations = list(approved.select_for_update().order_by('id'))
+    if any(allocation.room_id not in locked for allocation in allocations):
+        raise TransferError('A student was moved by another change meanwhile; please try again.')
+    return allocations, rooms
+
+
+def _check(allocations, targets, rooms):
+    """Refuse moves into missing or maintenance rooms, or that overfill a room."""
+    incoming = Counter(targets[a.student_id] for a in allocations)
+    outgoing = Counter(a.room_id for a in allocations)
+    for room_id in incoming:
+        room = rooms.get(room_id)
+        if room is None:
+            raise TransferError(f'Room #{room_id} does not exist.')
+        if room.status == 'Maintenance':
+            raise TransferError(f'Room {room.room_number} is under maintenance.')
+
+    approved = _approved_counts(list(incoming))
+    for room_id, count in incoming.items():
+        room = rooms[room_id]
+        final = approved[room_id] - outgoing[room_id] + count
+        if final > room.capacity:
+            raise TransferError(
+                f'Room {room.room_number} would hold {final} students but has {room.capacity} places.'
+            )
+
+
+def _approved_counts(room_ids):
+    """Approved allocations per room, counted from the rows rather than the cached counter."""
+    rows = (
+        RoomAllocation.objects.filter(room_id__in=room_ids, status='Approved')
+        .order_by().values('room_id').annotate(count=Count('id'))
+    )
+    return Counter({row['room_id']: row['count'] for row in rows})
+
+
+def transfer(student, room, notify=True):
+    """Move one student to `room`; returns the Move (None if already there)."""
+    moves = apply_moves([(student, room)], notify=notify)
+    return moves[0] if moves else None
+
+
+def swap(first, second, notify=True):
+    """Swap the rooms of two students with approved allocations."""
+    first_id, second_id = getattr(first, 'pk', first), getattr(second, 'pk', second)
+    with transaction.atomic():
+        # Same locks as apply_moves, which then re-reads the locked rows
+        allocations, _ = lock_allocations([first_id, second_id], [])
+        rooms = {allocation.student_id: allocation.room_id for allocation in allocations}
+        if len(rooms) != 2:
+            raise TransferError('Both students need an approved allocation to swap rooms.')
+        return apply_moves([(first_id, rooms[second_id]), (second_id, rooms[first_id])], notify=notify)
@@ -0,0 +1,77 @@
+"""
+Trigram indexes for the admin's substring searches.
+
+The admin's search_fields are plain `icontains` lookups, which Django
+compiles to `UPPER(col::text) LIKE UPPER('%term%')` on PostgreSQL. No B-tree
+index can serve a leading wildcard, but a pg_trgm GIN index on the same
+`UPPER(col::text)` expression can, for terms of three or more characters.
+`create_trigram_indexes()` (run after migrate) enables the extension and
+adds one such index per searched column.
+
+pg_trgm ships with PostgreSQL's contrib package and needs a role allowed to
+create it; where it cannot be enabled the indexes are skipped with a warning
+and searches scan as before. SQLite has no equivalent and always scans.
+"""
+
+import logging
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connections, transaction
+
+from .models import ArchivedComplaint, ArchivedRoomAllocation, AuditEvent, Complaint, Residency, Room, StudentProfile
+
+
+logger = logging.getLogger(__name__)
+
+# (index name, model, column) for every column an admin search_fields entry reaches
+TRIGRAM_INDEXES = [
+    ('profile_name_trgm_idx', StudentProfile, 'full_name'),
+    ('profile_phone_trgm_idx', StudentProfile, 'phone_number'),
+    ('user_username_trgm_idx', User, 'username'),
+    ('room_number_trgm_idx', Room, 'room_number'),
+    ('room_block_trgm_idx', Room, 'block_name'),
+    ('complaint_subject_trgm_idx', Complaint, 'subject'),
+    ('complaint_description_trgm_idx', Complaint, 'description'),
+    ('archived_alloc_room_trgm_idx', ArchivedRoomAllocation, 'room_number'),
+    ('archived_complaint_subject_trgm_idx', ArchivedComplaint, 'subject'),
+    ('audit_username_trgm_idx', AuditEvent, 'username'),
+    ('residency_username_trgm_idx', Residency, 'username'),
+    ('residency_room_trgm_idx', Residency, 'room_number'),
+]
+
+_INDEX_SQL = 'CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)'
+
+
+def enable_trigrams(using='default'):
+    """Enable pg_trgm on PostgreSQL if it is not already; returns whether it is available."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone():
+            return True
+        try:
+            # In a savepoint, so a refusal does not abort the surrounding migrate
+            with transaction.atomic(using=using):
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError as error:
+            logger.warning('pg_trgm is not available, admin searches will scan: %s', error)
+            return False
+    return True
+
+
+def create_trigram_indexes(using='default'):
+    """Create the admin search trigram indexes where pg_trgm is available; returns how many were ensured."""
+    if not enable_trigrams(using):
+        return 0
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        for index, model, column in TRIGRAM_INDEXES:
+            cursor.execute(_INDEX_SQL.format(
+                index=quote(index),
+                table=quote(model._meta.db_table),
+                column=quote(column),
+            ))
+    return len(TRIGRAM_INDEXES)
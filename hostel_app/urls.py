@@ -27,6 +27,9 @@ urlpatterns = [
     # Room Management
     path('manage-rooms/', views.manage_rooms, name='manage_rooms'),
     path('manage-rooms/add/', views.add_room, name='add_room'),
+    path('manage-rooms/generate-block/', views.generate_block, name='generate_block'),
+    path('manage-rooms/evacuate/', views.evacuate_rooms, name='evacuate_rooms'),
+    path('manage-rooms/occupancy-history/', views.occupancy_history, name='occupancy_history'),
     path('manage-rooms/<int:room_id>/edit/', views.edit_room, name='edit_room'),
     path('manage-rooms/<int:room_id>/delete/', views.delete_room, name='delete_room'),
     
@@ -40,9 +43,24 @@ urlpatterns = [
     # Student Management
     path('manage-students/', views.manage_students, name='manage_students'),
     path('manage-students/<int:student_id>/', views.student_detail, name='student_detail'),
+    path('manage-students/<int:student_id>/transfer/', views.transfer_student, name='transfer_student'),
     
     # Complaint Management
     path('manage-complaints/', views.manage_complaints, name='manage_complaints'),
     path('manage-complaints/<int:complaint_id>/', views.complaint_detail, name='complaint_detail'),
     
+    # Search
+    path('search/typeahead/', views.typeahead, name='typeahead'),
+    
+    # Admission Control
+    path('reports/', views.admin_reports, name='admin_reports'),
+    path('admission/status/', views.admission_status, name='admission_status'),
+    
+    # Background Jobs
+    path('manage-applications/export/', views.export_applications, name='export_applications'),
+    path('manage-applications/bulk-approve/', views.bulk_approve_applications, name='bulk_approve_applications'),
+    path('manage-rooms/recompute-occupancy/', views.recompute_occupancy, name='recompute_occupancy'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
+    path('jobs/<int:job_id>/download/', views.job_download, name='job_download'),
+    
 ]
@@ -2,20 +2,40 @@
 Views for the Hostel Management System.
 """
 
+import hashlib
+import json
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.http import HttpResponse, Http404, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template import engines
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
 from django.contrib import messages
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator
 from django.views.decorators.http import require_http_methods
 from django.urls import reverse
+from django.conf import settings
 
-from .models import StudentProfile, Room, RoomAllocation, Complaint
+from .models import (
+    StudentProfile, Room, RoomAllocation, Complaint, Notification, Job,
+    ArchivedRoomAllocation, ArchivedComplaint
+)
+from . import admission, analytics, evacuation, history, jobs, throttle, transfers
+from .conditional import conditional_page, latest, latest_audit
+from .counters import get_pending_count, invalidate_pending_count
 from .forms import (
     StudentRegistrationForm, StudentLoginForm, RoomAllocationForm,
-    ComplaintForm, RoomForm, RoomAllocationApprovalForm, ComplaintResolutionForm
+    ComplaintForm, RoomForm, RoomAllocationApprovalForm, ComplaintResolutionForm,
+    BlockGeneratorForm, RoomTransferForm, EvacuationForm, OccupancyReportForm
 )
 
 
@@ -31,6 +51,111 @@ def is_student(user):
     return user.is_active and not user.is_staff
 
 
+def is_ajax(request):
+    """Check if the request was made by AjaxRequest in script.js."""
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
+
+
+def request_data(request):
+    """Return POSTed form data, or the decoded body of a JSON request."""
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+    return request.POST
+
+
+def action_response(request, level, message, redirect_to, template=None, context=None, removed=False):
+    """
+    Finish an admin action.
+
+    Normal requests get a flash message and a redirect. XHR requests get JSON
+    with the message, the re-rendered row fragment (or `removed`) and the
+    navbar counters, so the page can update in place.
+    """
+    if not is_ajax(request):
+        getattr(messages, level)(request, message)
+        return redirect(redirect_to)
+    
+    payload = {
+        'ok': level != 'error',
+        'level': level,
+        'message': message,
+        'html': render_to_string(template, context, request=request) if template else None,
+        'removed': removed,
+        'counters': {'pending_count': get_pending_count()},
+    }
+    return JsonResponse(payload, status=200 if payload['ok'] else 409)
+
+
+def throttled_response(request, template, context, retry_after):
+    """
+    Answer a throttled login or registration POST with 429 Too Many Requests.
+
+    The message goes in the context rather than the session so a rejected
+    request causes no database writes.
+    """
+    wait = max(int(retry_after + 0.5), 1)
+    context['throttle_message'] = f'Too many attempts. Please try again in {wait} seconds.'
+    response = render(request, template, context, status=429)
+    response['Retry-After'] = str(wait)
+    return response
+
+
+def busy_response(request, retry_after):
+    """
+    Answer a POST turned away by admission control with 503 Service Unavailable.
+
+    Rendered without the request so no context processor touches the session
+    or the database.
+    """
+    wait = max(int(retry_after + 0.5), 1)
+    message = f'The hostel system is very busy right now. Please try again in {wait} seconds.'
+    if is_ajax(request):
+        response = JsonResponse({'ok': False, 'level': 'warning', 'message': message}, status=503)
+    else:
+        response = HttpResponse(render_to_string('busy.html', {'message': message}), status=503)
+    response['Retry-After'] = str(wait)
+    # admission.py already logs a warning; keep django.request from logging
+    # (and mailing ADMINS) every shed request as a server error
+    response._has_been_logged = True
+    return response
+
+
+def render_fragments(request, context, **templates):
+    """
+    Pre-render a page's list loops with the Jinja2 engine, if it is enabled.
+
+    `templates` maps a fragment name to a template in templates/jinja2/. The
+    results go in context['fragments'], which the Django page template prints
+    in place of its own loop; without Jinja2 the context is left unchanged.
+    """
+    if not settings.JINJA2_LIST_TEMPLATES:
+        return context
+    engine = engines['jinja2']
+    context['fragments'] = {
+        name: mark_safe(engine.get_template(template).render(context, request))
+        for name, template in templates.items()
+    }
+    return context
+
+
+def filter_applications(applications, search_query='', status_filter=''):
+    """Apply the Manage Applications search and status filters to a queryset."""
+    if search_query:
+        applications = applications.filter(
+            Q(student__username__icontains=search_query) |
+            Q(student__student_profile__full_name__icontains=search_query) |
+            Q(room__room_number__icontains=search_query)
+        )
+    
+    if status_filter:
+        applications = applications.filter(status=status_filter)
+    
+    return applications
+
+
 # ==================== Authentication Views ====================
 
 @require_http_methods(["GET", "POST"])
@@ -40,6 +165,9 @@ def register(request):
         return redirect('student_dashboard' if is_student(request.user) else 'admin_dashboard')
     
     if request.method == 'POST':
+        retry_after = throttle.check(request, 'register')
+        if retry_after:
+            return throttled_response(request, 'register.html', {'form': StudentRegistrationForm()}, retry_after)
         form = StudentRegistrationForm(request.POST)
         if form.is_valid():
             user = form.save()
@@ -62,6 +190,9 @@ def login_view(request):
         return redirect('student_dashboard' if is_student(request.user) else 'admin_dashboard')
     
     if request.method == 'POST':
+        retry_after = throttle.check(request, 'login')
+        if retry_after:
+            return throttled_response(request, 'login.html', {'form': StudentLoginForm()}, retry_after)
         form = StudentLoginForm(request, data=request.POST)
         if form.is_valid():
             user = form.get_user()
@@ -120,18 +251,37 @@ def student_dashboard(request):
     # Get available rooms count
     available_rooms = Room.objects.filter(status='Available')
     
+    # Get unread notifications and mark them as read
+    notifications = list(
+        Notification.objects.filter(student=request.user, is_read=False).order_by('-created_at')[:10]
+    )
+    if notifications:
+        Notification.objects.filter(id__in=[n.id for n in notifications]).update(is_read=True)
+    
     context = {
         'student_profile': student_profile,
         'allocated_room': allocated_room,
         'pending_applications': pending_applications,
         'complaints': complaints,
         'available_rooms_count': available_rooms.count(),
+        'notifications': notifications,
     }
     
     return render(request, 'student_dashboard.html', context)
 
 
+def _room_list_validators(request):
+    """Conditional-GET validators: the room catalogue and this student's application history."""
+    if is_admin(request.user):
+        return None
+    return [
+        latest(Room.objects.all(), 'updated_at'),
+        latest_audit(student=request.user, kind='Allocation'),
+    ]
+
+
 @login_required(login_url='login')
+@conditional_page(_room_list_validators)
 def room_list(request):
     """List available rooms for students."""
     if is_admin(request.user):
@@ -165,7 +315,7 @@ def room_list(request):
     # Get student's current application
     student_application = RoomAllocation.objects.filter(
         student=request.user,
-        status__in=['Pending', 'Approved']
+        status__in=RoomAllocation.ACTIVE_STATUSES
     ).first()
     
     context = {
@@ -176,10 +326,12 @@ def room_list(request):
         'room_types': Room.ROOM_TYPE_CHOICES,
         'student_application': student_application,
     }
+    render_fragments(request, context, cards='room_cards.html')
     
     return render(request, 'room_list.html', context)
 
 
+@admission.admission_controlled('apply_room', busy_response)
 @login_required(login_url='login')
 @require_http_methods(["POST"])
 def apply_room(request, room_id):
@@ -188,35 +340,63 @@ def apply_room(request, room_id):
         return redirect('admin_dashboard')
     
     room = get_object_or_404(Room, id=room_id)
+    # Filled in per form by script.js each time the page is shown, so cached
+    # and 304 copies of the room list never carry a key that was already used
+    idempotency_key = request.POST.get('idempotency_key', '')[:64]
     
-    # Check if room is full
-    if room.is_full:
-        messages.error(request, 'This room is currently full.')
-        return redirect('room_list')
-    
-    # Check if student already has a pending or approved allocation
-    existing = RoomAllocation.objects.filter(
-        student=request.user,
-        status__in=['Pending', 'Approved']
-    ).first()
-    
-    if existing:
-        messages.warning(request, f'You already have a {existing.status.lower()} application for {existing.room.room_number}.')
-        return redirect('room_list')
-    
-    # Check if already allocated to this room
-    if RoomAllocation.objects.filter(student=request.user, room=room, status='Approved').exists():
-        messages.info(request, 'You are already allocated to this room.')
-        return redirect('room_list')
+    # Insert directly and let the one-active-application constraint reject
+    # duplicates, rather than checking first and racing a double submit.
+    try:
+        with transaction.atomic():
+            allocation = RoomAllocation.objects.create(
+                student=request.user,
+                room=room,
+                status='Waitlisted' if room.is_full else 'Pending',
+                idempotency_key=idempotency_key,
+            )
+    except IntegrityError:
+        existing = RoomAllocation.objects.select_related('room').filter(
+            student=request.user,
+            status__in=RoomAllocation.ACTIVE_STATUSES
+        ).first()
+        
+        if existing is None:
+            messages.warning(request, f'You have already applied for Room {room.room_number}.')
+            return redirect('room_list')
+        
+        # A retry of the same form submission gets the original outcome
+        if not idempotency_key or existing.idempotency_key != idempotency_key:
+            messages.warning(request, f'You already have a {existing.status.lower()} application for {existing.room.room_number}.')
+            return redirect('room_list')
+        
+        allocation = existing
+    
+    # Joined the room's waitlist because it is full
+    if allocation.status == 'Waitlisted':
+        messages.info(
+            request,
+            f'Room {allocation.room.room_number} is full. You are #{allocation.waitlist_position} on its waitlist '
+            f'and will be notified when a place opens.'
+        )
+        return redirect('my_applications')
     
-    # Create allocation
-    allocation = RoomAllocation.objects.create(student=request.user, room=room)
-    messages.success(request, f'Application for Room {room.room_number} submitted successfully!')
+    messages.success(request, f'Application for Room {allocation.room.room_number} submitted successfully!')
     
     return redirect('student_dashboard')
 
 
+def _my_applications_validators(request):
+    """Conditional-GET validators: this student's applications and their status changes."""
+    if is_admin(request.user):
+        return None
+    return [
+        latest(RoomAllocation.objects.filter(student=request.user), 'applied_date'),
+        latest_audit(student=request.user, kind='Allocation'),
+    ]
+
+
 @login_required(login_url='login')
+@conditional_page(_my_applications_validators)
 def my_applications(request):
     """View student's room applications."""
     if is_admin(request.user):
@@ -237,7 +417,16 @@ def my_applications(request):
     return render(request, 'my_applications.html', context)
 
 
+def _complaints_validators(request):
+    """Conditional-GET validators: this student's complaints."""
+    if is_admin(request.user):
+        return None
+    return [latest(Complaint.objects.filter(student=request.user), 'updated_at')]
+
+
+@admission.admission_controlled('complaints', busy_response)
 @login_required(login_url='login')
+@conditional_page(_complaints_validators)
 def complaints(request):
     """View and submit complaints."""
     if is_admin(request.user):
@@ -295,7 +484,7 @@ def admin_dashboard(request):
     occupied_rooms = Room.objects.filter(status='Full').count()
     maintenance_rooms = Room.objects.filter(status='Maintenance').count()
     
-    pending_applications = RoomAllocation.objects.filter(status='Pending').count()
+    pending_applications = get_pending_count()
     pending_complaints = Complaint.objects.filter(status='Pending').count()
     in_progress_complaints = Complaint.objects.filter(status='In Progress').count()
     
@@ -325,8 +514,14 @@ def admin_dashboard(request):
     return render(request, 'admin_dashboard.html', context)
 
 
+def _manage_rooms_validators(request):
+    """Conditional-GET validators: all rooms."""
+    return [latest(Room.objects.all(), 'updated_at')]
+
+
 @login_required(login_url='login')
 @user_passes_test(is_admin, login_url='student_dashboard')
+@conditional_page(_manage_rooms_validators)
 def manage_rooms(request):
     """Manage rooms (Admin)."""
     search_query = request.GET.get('search', '')
@@ -375,6 +570,94 @@ def add_room(request):
     return render(request, 'admin_add_room.html', {'form': form})
 
 
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["GET", "POST"])
+def generate_block(request):
+    """Generate all rooms of a new block in one step (Admin)."""
+    if request.method == 'POST':
+        form = BlockGeneratorForm(request.POST)
+        if form.is_valid():
+            try:
+                rooms = form.save()
+            except IntegrityError:
+                messages.error(request, 'Some of these room numbers were just created by someone else. Please try again.')
+            else:
+                messages.success(request, f'Created {len(rooms)} rooms in {form.cleaned_data["block_name"]}.')
+                return redirect('manage_rooms')
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, error if field == '__all__' else f'{field}: {error}')
+    else:
+        form = BlockGeneratorForm()
+    
+    return render(request, 'admin_generate_block.html', {'form': form})
+
+
+def _parse_ids(value):
+    """Integers from a comma-separated hidden field; ValueError if malformed."""
+    return [int(part) for part in value.split(',') if part]
+
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["GET", "POST"])
+def evacuate_rooms(request):
+    """Plan new beds for everyone in rooms going into maintenance, then apply the plan (Admin)."""
+    if request.method == 'POST' and 'apply' in request.POST:
+        try:
+            room_ids = _parse_ids(request.POST.get('room_ids', ''))
+            moves = [
+                tuple(int(part) for part in pair.split(':'))
+                for pair in request.POST.get('moves', '').split(',') if pair
+            ]
+            moved, rejected, unplaced = evacuation.apply_evacuation(
+                room_ids, moves, allow_unplaced=request.POST.get('confirm_unplaced') == '1'
+            )
+        except ValueError:
+            messages.error(request, 'The evacuation plan was malformed. Please plan it again.')
+        except evacuation.UnplacedResidents as e:
+            messages.error(
+                request,
+                f'Nothing was changed: {e} Confirm that they stay in the closed rooms, or free beds and plan again.'
+            )
+        except transfers.TransferError as e:
+            messages.error(request, f'The plan is out of date and nothing was changed: {e} Please plan it again.')
+        else:
+            messages.success(
+                request,
+                f'Closed {len(room_ids)} rooms for maintenance, moved {moved} students '
+                f'and rejected {rejected} open applications.'
+            )
+            if unplaced:
+                messages.warning(
+                    request,
+                    f'{len(unplaced)} students had no free bed and remain in closed rooms: '
+                    f'{evacuation.describe(unplaced)}.'
+                )
+            return redirect('manage_rooms')
+        return redirect('evacuate_rooms')
+    
+    form = EvacuationForm(request.POST or None)
+    plan = None
+    if request.method == 'POST':
+        if form.is_valid():
+            plan = evacuation.plan_evacuation(form.cleaned_data['rooms'])
+        else:
+            for field, errors in form.errors.items():
+                for error in errors:
+                    messages.error(request, error if field == '__all__' else f'{field}: {error}')
+    
+    context = {'form': form, 'plan': plan}
+    if plan is not None:
+        context['room_ids'] = ','.join(str(room.id) for room in plan.rooms)
+        context['moves'] = ','.join(
+            f'{relocation.allocation.student_id}:{relocation.to_room.id}' for relocation in plan.relocations
+        )
+    return render(request, 'admin_evacuate_rooms.html', context)
+
+
 @login_required(login_url='login')
 @user_passes_test(is_admin, login_url='student_dashboard')
 @require_http_methods(["GET", "POST"])
@@ -385,7 +668,9 @@ def edit_room(request, room_id):
     if request.method == 'POST':
         form = RoomForm(request.POST, instance=room)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                room = form.save()
+                room.promote_waitlist()
             messages.success(request, 'Room updated successfully!')
             return redirect('manage_rooms')
         else:
@@ -407,34 +692,30 @@ def delete_room(request, room_id):
     
     # Check if room has allocations
     if room.room_allocations.filter(status='Approved').exists():
-        messages.error(request, 'Cannot delete a room with active allocations.')
-        return redirect('manage_rooms')
+        return action_response(request, 'error', 'Cannot delete a room with active allocations.', 'manage_rooms')
     
     room.delete()
-    messages.success(request, 'Room deleted successfully!')
-    return redirect('manage_rooms')
+    return action_response(request, 'success', 'Room deleted successfully!', 'manage_rooms', removed=True)
+
+
+def _manage_applications_validators(request):
+    """Conditional-GET validators: all applications and their status changes."""
+    return [
+        latest(RoomAllocation.objects.all(), 'applied_date'),
+        latest_audit(kind='Allocation'),
+    ]
 
 
 @login_required(login_url='login')
 @user_passes_test(is_admin, login_url='student_dashboard')
+@conditional_page(_manage_applications_validators)
 def manage_applications(request):
     """Manage room applications (Admin)."""
     search_query = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
     
-    applications = RoomAllocation.objects.all()
-    
-    if search_query:
-        applications = applications.filter(
-            Q(student__username__icontains=search_query) |
-            Q(student__student_profile__full_name__icontains=search_query) |
-            Q(room__room_number__icontains=search_query)
-        )
-    
-    if status_filter:
-        applications = applications.filter(status=status_filter)
-    
-    applications = applications.order_by('-applied_date')
+    applications = filter_applications(RoomAllocation.objects.all(), search_query, status_filter)
+    applications = applications.select_related('student__student_profile', 'room').order_by('-applied_date')
     
     # Pagination
     paginator = Paginator(applications, 15)
@@ -448,6 +729,10 @@ def manage_applications(request):
         'status_filter': status_filter,
         'status_choices': RoomAllocation.STATUS_CHOICES,
     }
+    render_fragments(
+        request, context,
+        rows='admin_application_rows.html', modals='admin_application_reject_modals.html',
+    )
     
     return render(request, 'admin_manage_applications.html', context)
 
@@ -460,11 +745,14 @@ def approve_application(request, allocation_id):
     allocation = get_object_or_404(RoomAllocation, id=allocation_id)
     
     if allocation.approve():
-        messages.success(request, f'Application approved! Room {allocation.room.room_number} allocated to {allocation.student.username}.')
+        level, message = 'success', f'Application approved! Room {allocation.room.room_number} allocated to {allocation.student.username}.'
     else:
-        messages.error(request, 'Cannot approve: Room is full.')
+        level, message = 'error', 'Cannot approve: Room is full.'
     
-    return redirect('manage_applications')
+    return action_response(
+        request, level, message, 'manage_applications',
+        'admin_application_row.html', {'app': allocation}
+    )
 
 
 @login_required(login_url='login')
@@ -474,15 +762,26 @@ def reject_application(request, allocation_id):
     """Reject a room application (Admin)."""
     allocation = get_object_or_404(RoomAllocation, id=allocation_id)
     
-    reason = request.POST.get('reason', '')
+    reason = request_data(request).get('reason', '')
     allocation.reject(reason)
     
-    messages.success(request, f'Application rejected.')
-    return redirect('manage_applications')
+    return action_response(
+        request, 'success', 'Application rejected.', 'manage_applications',
+        'admin_application_row.html', {'app': allocation}
+    )
+
+
+def _manage_students_validators(request):
+    """Conditional-GET validators: student profiles and allocation changes (allocated room column)."""
+    return [
+        latest(StudentProfile.objects.all(), 'updated_at'),
+        latest_audit(kind='Allocation'),
+    ]
 
 
 @login_required(login_url='login')
 @user_passes_test(is_admin, login_url='student_dashboard')
+@conditional_page(_manage_students_validators)
 def manage_students(request):
     """Manage students (Admin)."""
     search_query = request.GET.get('search', '')
@@ -512,24 +811,126 @@ def manage_students(request):
     return render(request, 'admin_manage_students.html', context)
 
 
+STUDENT_DETAIL_PAGE_SIZE = 10
+
+
+def _student_count(queryset):
+    """Correlated COUNT of `queryset` rows belonging to the outer StudentProfile's user."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(student_id=OuterRef('user_id'))
+            .order_by()
+            .values('student_id')
+            .annotate(count=Count('id'))
+            .values('count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _paginate_known_count(queryset, count, page_number):
+    """Page through `queryset` using an already known row count instead of a COUNT(*)."""
+    paginator = Paginator(queryset, STUDENT_DETAIL_PAGE_SIZE)
+    paginator.count = count
+    return paginator.get_page(page_number)
+
+
+def _query_without(request, param):
+    """The current query string minus `param`, for links that change only that parameter."""
+    query = request.GET.copy()
+    query.pop(param, None)
+    return query.urlencode()
+
+
 @login_required(login_url='login')
 @user_passes_test(is_admin, login_url='student_dashboard')
 def student_detail(request, student_id):
     """View student details (Admin)."""
-    student_profile = get_object_or_404(StudentProfile, user_id=student_id)
-    
-    allocations = RoomAllocation.objects.filter(student_id=student_id).order_by('-applied_date')
-    complaints = Complaint.objects.filter(student_id=student_id).order_by('-created_at')
+    student_profile = get_object_or_404(
+        StudentProfile.objects.annotate(
+            allocation_count=_student_count(RoomAllocation.objects.all()),
+            complaint_count=_student_count(Complaint.objects.all()),
+            open_complaint_count=_student_count(Complaint.objects.exclude(status='Resolved')),
+        ),
+        user_id=student_id,
+    )
+    
+    allocations = RoomAllocation.objects.filter(
+        student_id=student_id
+    ).select_related('room').order_by('-applied_date')
+    complaints = Complaint.objects.filter(student_id=student_id).only(
+        'id', 'subject', 'priority', 'status', 'created_at'
+    ).order_by('-created_at')
+    
+    alloc_page = _paginate_known_count(
+        allocations, student_profile.allocation_count, request.GET.get('alloc_page', 1)
+    )
+    complaint_page = _paginate_known_count(
+        complaints, student_profile.complaint_count, request.GET.get('complaint_page', 1)
+    )
+    
+    # Archived semesters are only read when explicitly requested
+    show_history = request.GET.get('history') == '1'
     
     context = {
         'student': student_profile,
-        'allocations': allocations,
-        'complaints': complaints,
+        'current_allocation': RoomAllocation.objects.filter(
+            student_id=student_id, status='Approved'
+        ).select_related('room').first(),
+        'transfer_form': RoomTransferForm(),
+        'alloc_page': alloc_page,
+        'allocations': alloc_page.object_list,
+        'alloc_query': _query_without(request, 'alloc_page'),
+        'complaint_page': complaint_page,
+        'complaints': complaint_page.object_list,
+        'complaint_query': _query_without(request, 'complaint_page'),
+        'show_history': show_history,
     }
     
+    if show_history:
+        context['archived_allocations'] = ArchivedRoomAllocation.objects.filter(
+            student_id=student_id
+        ).order_by('-applied_date')
+        context['archived_complaints'] = ArchivedComplaint.objects.filter(
+            student_id=student_id
+        ).order_by('-created_at')
+    
     return render(request, 'admin_student_detail.html', context)
 
 
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["POST"])
+def transfer_student(request, student_id):
+    """Move a housed student to another room, or swap rooms with another student (Admin)."""
+    student = get_object_or_404(User, id=student_id, is_staff=False)
+    form = RoomTransferForm(request.POST)
+    
+    if not form.is_valid():
+        for error in form.non_field_errors():
+            messages.error(request, error)
+        return redirect('student_detail', student_id=student.id)
+    
+    try:
+        if 'room' in form.cleaned_data:
+            moves = transfers.apply_moves([(student, form.cleaned_data['room'])])
+        else:
+            moves = transfers.swap(student, form.cleaned_data['other_student'])
+    except transfers.TransferError as e:
+        messages.error(request, str(e))
+    else:
+        if moves:
+            summary = ', '.join(
+                f'{move.allocation.student.username} to Room {move.to_room.room_number}' for move in moves
+            )
+            messages.success(request, f'Moved {summary}.')
+        else:
+            messages.info(request, 'The student is already in that room.')
+    
+    return redirect('student_detail', student_id=student.id)
+
+
 @login_required(login_url='login')
 @user_passes_test(is_admin, login_url='student_dashboard')
 @require_http_methods(["POST"])
@@ -537,21 +938,37 @@ def remove_allocation(request, allocation_id):
     """Remove a room allocation (Admin)."""
     allocation = get_object_or_404(RoomAllocation, id=allocation_id)
     
-    if allocation.status == 'Approved':
-        allocation.status = 'Rejected'
-        allocation.rejection_reason = 'Removed by admin'
-        allocation.save()
-        allocation.room.update_occupancy()
-        messages.success(request, f'Allocation for Room {allocation.room.room_number} removed.')
-    else:
-        allocation.delete()
-        messages.success(request, 'Application removed.')
-    
-    return redirect('manage_applications')
+    # Respond after the block so the counters include the on_commit count updates
+    with transaction.atomic():
+        was_approved = allocation.status == 'Approved'
+        if was_approved:
+            allocation.status = 'Rejected'
+            allocation.rejection_reason = 'Removed by admin'
+            allocation.save()
+            allocation.room.update_occupancy()
+            allocation.room.promote_waitlist()
+        else:
+            was_pending = allocation.status == 'Pending'
+            allocation.delete()
+            if was_pending:
+                allocation.room.promote_waitlist()
+    
+    if was_approved:
+        return action_response(
+            request, 'success', f'Allocation for Room {allocation.room.room_number} removed.',
+            'manage_applications', 'admin_student_allocation_row.html', {'alloc': allocation}
+        )
+    return action_response(request, 'success', 'Application removed.', 'manage_applications', removed=True)
+
+
+def _manage_complaints_validators(request):
+    """Conditional-GET validators: all complaints."""
+    return [latest(Complaint.objects.all(), 'updated_at')]
 
 
 @login_required(login_url='login')
 @user_passes_test(is_admin, login_url='student_dashboard')
+@conditional_page(_manage_complaints_validators)
 def manage_complaints(request):
     """Manage complaints (Admin)."""
     search_query = request.GET.get('search', '')
@@ -574,7 +991,7 @@ def manage_complaints(request):
     if priority_filter:
         complaints = complaints.filter(priority=priority_filter)
     
-    complaints = complaints.order_by('-created_at')
+    complaints = complaints.select_related('student__student_profile').order_by('-created_at')
     
     # Pagination
     paginator = Paginator(complaints, 15)
@@ -590,6 +1007,7 @@ def manage_complaints(request):
         'status_choices': Complaint.STATUS_CHOICES,
         'priority_choices': Complaint.PRIORITY_CHOICES,
     }
+    render_fragments(request, context, rows='admin_complaint_rows.html')
     
     return render(request, 'admin_manage_complaints.html', context)
 
@@ -601,11 +1019,13 @@ def complaint_detail(request, complaint_id):
     complaint = get_object_or_404(Complaint, id=complaint_id)
     
     if request.method == 'POST':
-        form = ComplaintResolutionForm(request.POST, instance=complaint)
+        form = ComplaintResolutionForm(request_data(request), instance=complaint)
         if form.is_valid():
             form.save()
-            messages.success(request, 'Complaint updated successfully!')
-            return redirect('manage_complaints')
+            return action_response(
+                request, 'success', 'Complaint updated successfully!', 'manage_complaints',
+                'admin_complaint_row.html', {'complaint': complaint}
+            )
     else:
         form = ComplaintResolutionForm(instance=complaint)
     
@@ -614,9 +1034,243 @@ def complaint_detail(request, complaint_id):
         'form': form,
     }
     
+    # XHR requests get just the status form in a modal
+    if is_ajax(request):
+        context['ajax_target'] = f'#complaint-row-{complaint.id}'
+        payload = {'ok': not form.is_bound, 'modal': render_to_string('admin_complaint_modal.html', context, request=request)}
+        if form.is_bound:
+            # Only an invalid POST reaches this point
+            payload.update(level='error', message='Please correct the errors in the form.')
+        return JsonResponse(payload, status=200 if payload['ok'] else 400)
+    
     return render(request, 'admin_complaint_detail.html', context)
 
 
+# ==================== Typeahead Search ====================
+
+TYPEAHEAD_LIMIT = 8
+
+
+# Every lookup below is istartswith on a column with a prefix index (see
+# prefix_indexes.py), so each keystroke is an index range scan.
+
+def _room_suggestions(query, admin):
+    rooms = Room.objects.filter(
+        Q(room_number__istartswith=query) |
+        Q(block_name__istartswith=query)
+    )
+    if not admin:
+        rooms = rooms.exclude(status='Maintenance')
+    rooms = rooms.order_by('room_number').values('id', 'room_number', 'block_name', 'floor', 'status')
+    
+    return [
+        {
+            'label': f"Room {room['room_number']}",
+            'detail': f"Block {room['block_name']}, Floor {room['floor']} - {room['status']}",
+            'url': reverse('edit_room', args=[room['id']]) if admin
+                   else f"{reverse('room_list')}?search={room['room_number']}",
+        }
+        for room in rooms[:TYPEAHEAD_LIMIT]
+    ]
+
+
+def _student_suggestions(query):
+    # One indexed query per column, combined with UNION: an OR spanning the
+    # profile and user tables could not use either table's index
+    matches = StudentProfile.objects.order_by().filter(full_name__istartswith=query).values('pk').union(
+        StudentProfile.objects.order_by().filter(phone_number__istartswith=query).values('pk'),
+        StudentProfile.objects.order_by().filter(user__username__istartswith=query).values('pk'),
+    )
+    students = StudentProfile.objects.filter(pk__in=matches).order_by('full_name').values(
+        'user_id', 'full_name', 'user__username', 'phone_number'
+    )
+    
+    return [
+        {
+            'label': student['full_name'],
+            'detail': f"{student['user__username']} - {student['phone_number']}",
+            'url': reverse('student_detail', args=[student['user_id']]),
+        }
+        for student in students[:TYPEAHEAD_LIMIT]
+    ]
+
+
+@login_required(login_url='login')
+@require_http_methods(["GET"])
+def typeahead(request):
+    """Return prefix-matched rooms or students as JSON for search-as-you-type."""
+    query = request.GET.get('q', '').strip()[:50]
+    scope = request.GET.get('scope', 'rooms')
+    admin = is_admin(request.user)
+    
+    if scope not in ('rooms', 'students') or (scope == 'students' and not admin):
+        return JsonResponse({'error': 'Invalid scope.'}, status=400)
+    
+    if not query:
+        return JsonResponse({'results': []})
+    
+    # Admins and students see different room links, so cache them separately;
+    # the query is hashed as raw text (spaces and all) is not a safe cache key
+    digest = hashlib.sha1(query.lower().encode()).hexdigest()
+    cache_key = f"typeahead:{scope}:{'admin' if admin else 'student'}:{digest}"
+    results = cache.get(cache_key)
+    if results is None:
+        if scope == 'rooms':
+            results = _room_suggestions(query, admin)
+        else:
+            results = _student_suggestions(query)
+        cache.set(cache_key, results, settings.TYPEAHEAD_CACHE_TIMEOUT)
+    
+    response = JsonResponse({'results': results})
+    response['Cache-Control'] = f'private, max-age={settings.TYPEAHEAD_CACHE_TIMEOUT}'
+    return response
+
+
+# ==================== Occupancy History ====================
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["GET"])
+def occupancy_history(request):
+    """Chart and table of occupancy over time by block, floor or room type (Admin)."""
+    today = timezone.localdate()
+    form = OccupancyReportForm(request.GET or {
+        'start': today - timedelta(days=180), 'end': today, 'bucket': 'week', 'group_by': 'block',
+    })
+    
+    report = []
+    if form.is_valid():
+        data = form.cleaned_data
+        report = history.occupancy_report(
+            data['start'], data['end'] + timedelta(days=1), data['group_by'], data['bucket'],
+            block_name=data['block_name'], room_type=data['room_type'],
+        )
+    
+    # One line per group, one point per period
+    periods = sorted({row['period'] for row in report})
+    series = {}
+    for row in report:
+        series.setdefault(str(row['group']), {})[row['period']] = row['percentage']
+    chart = {
+        'labels': [period.isoformat() for period in periods],
+        'datasets': [
+            {'label': group, 'data': [values.get(period) for period in periods]}
+            for group, values in series.items()
+        ],
+    }
+    
+    context = {
+        'form': form,
+        'report': report,
+        'chart': chart,
+    }
+    return render(request, 'admin_occupancy_history.html', context)
+
+
+# ==================== Reports ====================
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["GET"])
+def admin_reports(request):
+    """Occupancy and complaint breakdowns, computed by a background job (Admin)."""
+    reports, job = analytics.reports(request.user)
+    context = {
+        'reports': reports,
+        'job': job,
+        'occupancy_tables': [
+            ('block', reports['occupancy']['block']),
+            ('floor', reports['occupancy']['floor']),
+            ('room type', reports['occupancy']['room_type']),
+        ] if reports else [],
+    }
+    return render(request, 'admin_reports.html', context)
+
+
+# ==================== Admission Control ====================
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["GET"])
+def admission_status(request):
+    """Slots in use, queue depth, admitted/rejected counts and mean wait of each admission-controlled endpoint (Admin)."""
+    payload = {
+        'enabled': settings.ADMISSION_CONTROL_ENABLED,
+        'endpoints': {scope: admission.stats(scope) for scope in settings.ADMISSION_LIMITS},
+    }
+    response = JsonResponse(payload)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+# ==================== Background Job Views ====================
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["POST"])
+def export_applications(request):
+    """Queue a CSV export of the filtered applications (Admin)."""
+    job = jobs.enqueue('export_applications', {
+        'search': request.POST.get('search', ''),
+        'status': request.POST.get('status', ''),
+    }, user=request.user)
+    messages.info(request, f'Export queued as job #{job.id}.')
+    return redirect('job_status', job_id=job.id)
+
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["POST"])
+def bulk_approve_applications(request):
+    """Queue approval of all pending applications matching the search (Admin)."""
+    job = jobs.enqueue('bulk_approve_applications', {
+        'search': request.POST.get('search', ''),
+    }, user=request.user)
+    messages.info(request, f'Bulk approval queued as job #{job.id}.')
+    return redirect('job_status', job_id=job.id)
+
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+@require_http_methods(["POST"])
+def recompute_occupancy(request):
+    """Queue an occupancy recomputation for all rooms (Admin)."""
+    job = jobs.enqueue('recompute_occupancy', user=request.user)
+    messages.info(request, f'Occupancy recomputation queued as job #{job.id}.')
+    return redirect('job_status', job_id=job.id)
+
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+def job_status(request, job_id):
+    """View the status of a background job (Admin)."""
+    job = get_object_or_404(Job, id=job_id)
+    # The job ran on the worker host, whose cache updates never reach this one
+    if job.is_finished and job.name in jobs.PENDING_COUNT_TASKS:
+        invalidate_pending_count()
+    
+    context = {
+        'job': job,
+        'is_export': job.name == 'export_applications',
+        'is_report': job.name == 'compute_reports',
+    }
+    
+    return render(request, 'admin_job_status.html', context)
+
+
+@login_required(login_url='login')
+@user_passes_test(is_admin, login_url='student_dashboard')
+def job_download(request, job_id):
+    """Download the CSV produced by a finished export job (Admin)."""
+    job = get_object_or_404(Job, id=job_id, name='export_applications')
+    if job.status != 'Succeeded':
+        raise Http404('Export is not ready.')
+    
+    response = HttpResponse(job.result, content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="applications-{job.id}.csv"'
+    return response
+
+
 # ==================== Home View ====================
 
 def home(request):
@@ -0,0 +1,79 @@
+"""
+Warm-up for cold starts.
+
+`warm_up()` does the work the first request would otherwise pay for: URL
+resolver compilation, template compilation, the first database connection and
+the cached counters shown on every page. gunicorn.conf.py runs it in the
+master process with preload_app, so forked workers inherit the warmed state
+copy-on-write.
+"""
+
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+from .counters import get_pending_count
+
+
+def _resolve_urls():
+    """Compile every URL pattern and build the reverse lookup tables."""
+    resolver = get_resolver()
+    resolver.resolve('/')
+    return len(resolver.reverse_dict)
+
+
+def _compile_templates():
+    """Load every project template so the cached loader holds it compiled."""
+    count = 0
+    for engine in settings.TEMPLATES:
+        for directory in engine.get('DIRS', []):
+            for path in sorted(Path(directory).rglob('*.html')):
+                try:
+                    get_template(path.relative_to(directory).as_posix())
+                except (TemplateDoesNotExist, TemplateSyntaxError):
+                    continue
+                count += 1
+    return count
+
+
+def _connect_databases():
+    """Open (and check) a connection to every configured database."""
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def _prime_caches():
+    """Fill the counters every admin page reads."""
+    return get_pending_count()
+
+
+WARMUP_STEPS = [
+    ('urls', _resolve_urls),
+    ('templates', _compile_templates),
+    ('database', _connect_databases),
+    ('caches', _prime_caches),
+]
+
+
+def warm_up():
+    """
+    Run each warm-up step and return {step: (seconds, result)}.
+
+    A failing step is reported as its exception rather than raised, so a
+    database that is still waking up never stops the server from starting.
+    """
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        try:
+            result = step()
+        except Exception as exc:
+            result = exc
+        timings[name] = (time.perf_counter() - started, result)
+    return timings
@@ -3,6 +3,8 @@ Django settings for hostel_project project.
 """
 
 import os
+import sys
+import tempfile
 from pathlib import Path
 from decouple import config
 
@@ -31,11 +33,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'hostel_app.middleware.AuditMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -52,11 +56,44 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'hostel_app.context_processors.pending_count',
             ],
         },
     },
 ]
 
+# Production keeps compiled templates in memory for the life of the worker
+if not DEBUG:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
+# Optional Jinja2 fast path for the big list loops (templates/jinja2/); needs `pip install Jinja2`
+try:
+    import jinja2  # noqa: F401
+except ImportError:
+    JINJA2_LIST_TEMPLATES = False
+else:
+    JINJA2_LIST_TEMPLATES = config('JINJA2_LIST_TEMPLATES', default=False, cast=bool)
+
+if JINJA2_LIST_TEMPLATES:
+    TEMPLATES.append({
+        'NAME': 'jinja2',
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [BASE_DIR / 'templates' / 'jinja2'],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'hostel_app.jinja2_env.environment',
+            'autoescape': True,
+            # Templates never change while a worker runs
+            'auto_reload': DEBUG,
+        },
+    })
+
 WSGI_APPLICATION = 'hostel_project.wsgi.application'
 
 # Database Configuration - Supabase PostgreSQL
@@ -68,6 +105,12 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default=''),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Keep connections open between requests so the one opened at warm-up is reused
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # The Supabase transaction pooler (port 6543) may hand each statement to a
+        # different server connection, so a cursor declared by one is gone for the next
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=True, cast=bool),
     }
 }
 
@@ -90,6 +133,22 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# In production collectstatic minifies, hashes and gzip/brotli-compresses assets
+# (hostel_app/storage.py); WhiteNoise serves the hashed names as immutable.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+            else 'hostel_app.storage.MinifiedManifestStaticFilesStorage'
+        ),
+    },
+}
+# Unhashed names (e.g. a stale reference) are still cached, just not forever
+WHITENOISE_MAX_AGE = 3600
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -110,3 +169,87 @@ CSRF_COOKIE_SECURE = False  # Set to True in production
 
 # Messages configuration
 MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
+
+# Cache shared by the gunicorn workers of one host (see hostel_app/sqlite_cache.py).
+# The default file is local to the host: the run_workers service in render.yaml
+# runs on another host and gets a cache of its own, so anything both must see
+# lives in the database, and limits kept here (throttle, admission) are per host.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='hostel_app.sqlite_cache.SQLiteCache'),
+        'LOCATION': config('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'hostel_cache.sqlite3')),
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=5000, cast=int),
+            'CULL_FREQUENCY': 3,
+        },
+    }
+}
+# Tests clear the cache, so they get their own file rather than a running server's
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    CACHES['default'] = {
+        'BACKEND': 'hostel_app.sqlite_cache.SQLiteCache',
+        'LOCATION': config('TEST_CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'hostel_test_cache.sqlite3')),
+    }
+
+# Token-bucket throttle for login/registration POSTs, per client IP and per username
+AUTH_THROTTLE_ENABLED = config('AUTH_THROTTLE_ENABLED', default=True, cast=bool)
+AUTH_THROTTLE_RATES = {
+    'login': {
+        'capacity': config('LOGIN_THROTTLE_BURST', default=10, cast=int),
+        'per_minute': config('LOGIN_THROTTLE_PER_MINUTE', default=5, cast=int),
+    },
+    'register': {
+        'capacity': config('REGISTER_THROTTLE_BURST', default=5, cast=int),
+        'per_minute': config('REGISTER_THROTTLE_PER_MINUTE', default=2, cast=int),
+    },
+}
+# Reverse proxies in front of the app (Render's router is one); 0 trusts REMOTE_ADDR only
+THROTTLE_NUM_PROXIES = config('THROTTLE_NUM_PROXIES', default=1, cast=int)
+
+# Gunicorn sync workers per web host; gunicorn.conf.py reads the same variable
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=2, cast=int)
+
+# Admission control for write-heavy student POSTs: at most `concurrency` run at
+# once across the gunicorn workers of a web host; the rest wait up to `max_wait`
+# seconds for a slot and then get 503 with Retry-After. A sync worker serves one
+# request at a time, so by default each endpoint may hold half the workers (at
+# least one) and the others stay free for everything else. With the default two
+# workers that is one apply_room at a time per host: a second student applying
+# at the same moment waits for it (an application takes milliseconds) rather
+# than getting a 503. Raise WEB_CONCURRENCY, or APPLY_ROOM_CONCURRENCY, for
+# intake. The slots live in the per-host cache, so each web host admits its own
+# `concurrency`.
+ADMISSION_CONTROL_ENABLED = config('ADMISSION_CONTROL_ENABLED', default=True, cast=bool)
+ADMISSION_LIMITS = {
+    'apply_room': {
+        'concurrency': config('APPLY_ROOM_CONCURRENCY', default=max(WEB_CONCURRENCY // 2, 1), cast=int),
+        'max_wait': config('APPLY_ROOM_MAX_WAIT', default=0.25, cast=float),
+        'retry_after': config('APPLY_ROOM_RETRY_AFTER', default=5, cast=int),
+        'hold': 60,
+    },
+    'complaints': {
+        'concurrency': config('COMPLAINTS_CONCURRENCY', default=max(WEB_CONCURRENCY // 2, 1), cast=int),
+        'max_wait': config('COMPLAINTS_MAX_WAIT', default=0.25, cast=float),
+        'retry_after': config('COMPLAINTS_RETRY_AFTER', default=10, cast=int),
+        'hold': 60,
+    },
+}
+
+# Background job queue (see hostel_app/jobs.py and `manage.py run_workers`)
+JOB_WORKERS = config('JOB_WORKERS', default=2, cast=int)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=3, cast=int)
+JOB_RETRY_BACKOFF = config('JOB_RETRY_BACKOFF', default=5, cast=int)  # seconds, doubled per attempt
+JOB_HEARTBEAT_INTERVAL = config('JOB_HEARTBEAT_INTERVAL', default=30, cast=int)  # seconds; keep well under --stale-after
+
+# Jobs queued automatically by run_workers: task name -> interval in seconds
+PERIODIC_JOBS = {
+    'recompute_occupancy': config('OCCUPANCY_RECONCILE_INTERVAL', default=3600, cast=int),
+    # Re-runs on the same day are harmless; twice a day means no calendar day is skipped
+    'snapshot_occupancy': 12 * 3600,
+}
+
+# Seconds the cached navbar pending-applications count lives before a rebuild
+PENDING_COUNT_CACHE_TIMEOUT = config('PENDING_COUNT_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds a typeahead result list is cached per search prefix
+TYPEAHEAD_CACHE_TIMEOUT = config('TYPEAHEAD_CACHE_TIMEOUT', default=30, cast=int)
@@ -12,8 +12,27 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialize animations
     initializeAnimations();
+    
+    // Initialize server-side typeahead on search inputs
+    initializeTypeahead();
+    
+    // Submit row actions over XHR and update the page in place
+    initializeAjaxActions();
+});
+
+// Give every idempotent form a fresh key each time the page is shown,
+// including pages restored from the back/forward cache or revalidated with 304
+window.addEventListener('pageshow', function() {
+    document.querySelectorAll('input[data-idempotency-key]').forEach(input => {
+        input.value = newIdempotencyKey();
+    });
 });
 
+function newIdempotencyKey() {
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, byte => byte.toString(16).padStart(2, '0')).join('');
+}
+
 // Initialize Bootstrap tooltips
 function initializeTooltips() {
     const tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
@@ -222,6 +241,7 @@ async function AjaxRequest(url, method = 'GET', data = null) {
         method: method,
         headers: {
             'X-CSRFToken': getCSRFToken(),
+            'X-Requested-With': 'XMLHttpRequest',
             'Content-Type': 'application/json',
         }
     };
@@ -240,6 +260,81 @@ async function AjaxRequest(url, method = 'GET', data = null) {
     }
 }
 
+// Submit forms marked with data-ajax-target over XHR and swap in the returned fragment
+function initializeAjaxActions() {
+    document.addEventListener('submit', async function(event) {
+        const form = event.target;
+        if (!form.matches('form[data-ajax-target]')) return;
+        event.preventDefault();
+
+        const data = Object.fromEntries(new FormData(form).entries());
+        const result = await AjaxRequest(form.action, 'POST', data);
+        if (result) {
+            applyAjaxResult(result, form.getAttribute('data-ajax-target'), form.closest('.modal'));
+        }
+    });
+
+    document.addEventListener('click', async function(event) {
+        const trigger = event.target.closest('[data-ajax-modal]');
+        if (!trigger) return;
+        event.preventDefault();
+
+        const result = await AjaxRequest(trigger.getAttribute('data-ajax-modal'));
+        if (result && result.modal) {
+            showAjaxModal(result.modal);
+        }
+    });
+}
+
+// Show a modal fragment returned by the server
+function showAjaxModal(html) {
+    const container = document.createElement('div');
+    container.innerHTML = html.trim();
+    const modalElement = container.querySelector('.modal');
+    document.body.appendChild(modalElement);
+
+    modalElement.addEventListener('hidden.bs.modal', function() {
+        modalElement.remove();
+    });
+
+    bootstrap.Modal.getOrCreateInstance(modalElement).show();
+}
+
+// Apply an XHR action result: toast, row swap, modal and counter updates
+function applyAjaxResult(result, targetSelector, modalElement) {
+    if (result.message) {
+        showToast(result.message, result.level === 'error' ? 'danger' : result.level);
+    }
+
+    // Invalid modal forms come back re-rendered with their errors
+    if (!result.ok && result.modal && modalElement) {
+        const container = document.createElement('div');
+        container.innerHTML = result.modal.trim();
+        modalElement.querySelector('.modal-body').innerHTML = container.querySelector('.modal-body').innerHTML;
+        return;
+    }
+
+    if (modalElement) {
+        bootstrap.Modal.getOrCreateInstance(modalElement).hide();
+    }
+
+    const target = document.querySelector(targetSelector);
+    if (target) {
+        if (result.removed) {
+            target.remove();
+        } else if (result.html) {
+            target.outerHTML = result.html;
+        }
+    }
+
+    Object.entries(result.counters || {}).forEach(([name, value]) => {
+        document.querySelectorAll(`[data-counter="${name}"]`).forEach(el => {
+            el.textContent = value;
+            el.classList.toggle('d-none', !value);
+        });
+    });
+}
+
 // Print page
 function printPage() {
     window.print();
@@ -357,6 +452,59 @@ function setupLiveSearch(inputId, tableId, columnIndex = 0) {
     });
 }
 
+// Server-side typeahead for inputs with a data-typeahead endpoint URL
+function initializeTypeahead(delay = 250) {
+    document.querySelectorAll('input[data-typeahead]').forEach(input => {
+        const endpoint = input.getAttribute('data-typeahead');
+        const container = input.parentElement;
+        container.classList.add('position-relative');
+
+        const menu = document.createElement('div');
+        menu.className = 'list-group typeahead-menu shadow-sm d-none';
+        container.appendChild(menu);
+
+        let lastQuery = '';
+
+        const hideMenu = () => menu.classList.add('d-none');
+
+        const search = debounce(async () => {
+            const query = input.value.trim();
+            if (query === lastQuery) return;
+            lastQuery = query;
+
+            if (!query) {
+                hideMenu();
+                return;
+            }
+
+            const separator = endpoint.includes('?') ? '&' : '?';
+            const data = await AjaxRequest(`${endpoint}${separator}q=${encodeURIComponent(query)}`);
+            // Ignore responses for queries the user has already typed past
+            if (!data || query !== input.value.trim()) return;
+
+            menu.innerHTML = '';
+            data.results.forEach(result => {
+                const item = document.createElement('a');
+                item.className = 'list-group-item list-group-item-action';
+                item.href = result.url;
+                item.innerHTML = '<strong></strong><br><small class="text-muted"></small>';
+                item.querySelector('strong').textContent = result.label;
+                item.querySelector('small').textContent = result.detail;
+                menu.appendChild(item);
+            });
+            menu.classList.toggle('d-none', data.results.length === 0);
+        }, delay);
+
+        input.addEventListener('input', search);
+        input.addEventListener('keydown', event => {
+            if (event.key === 'Escape') hideMenu();
+        });
+        document.addEventListener('click', event => {
+            if (!container.contains(event.target)) hideMenu();
+        });
+    });
+}
+
 // Initialize all charts and components on page load
 window.addEventListener('load', function() {
     // Auto-initialize components with data attributes